@@ -0,0 +1,216 @@
+"""Render several posters from one set of loaded tracks"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import copy
+import json
+import logging
+import multiprocessing
+from typing import TYPE_CHECKING, Any
+
+from gpxtrackposter import memory, metrics, trace
+from gpxtrackposter.exceptions import ParameterError, PosterError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from gpxtrackposter.track import Track
+
+log = logging.getLogger("gpxtrackposter")
+
+# options needed to load the tracks, to run the batch or the server, shared by all jobs and requests
+SHARED_OPTIONS = [
+    "gpx_dir",
+    "from_strava",
+    "clear_cache",
+    "jobs",
+    "workers",
+    "verbose",
+    "logfile",
+    "timings_json",
+    "profile",
+    "trace",
+    "memory_report",
+    "metrics",
+    "host",
+    "port",
+    "socket",
+    "watch",
+]
+
+
+def load_job_file(file_name: str) -> list[dict[str, Any]]:
+    """Load the poster jobs of a JSON or TOML job file.
+
+    The file contains a list "jobs" with the options of every poster and optional "defaults" for all
+    posters. Options are named like the long command line options without the leading dashes, e.g.
+    {"defaults": {"athlete": "Jane Doe"}, "jobs": [{"type": "calendar", "year": "2020", "output": "2020.svg"}]}.
+
+    Args:
+        file_name: Name of the job file; files ending with ".toml" are read as TOML, others as JSON.
+
+    Returns:
+        list[dict[str, Any]]: Options of every job, including the defaults.
+
+    Raises:
+        ParameterError: The file cannot be read or has the wrong structure.
+
+    """
+    try:
+        if file_name.lower().endswith(".toml"):
+            try:
+                import tomllib  # noqa: PLC0415 - Python >= 3.11
+            except ImportError as e:
+                msg = "TOML job files need Python 3.11 or newer; please use a JSON job file instead"
+                raise ParameterError(msg) from e
+            with open(file_name, "rb") as f:
+                data = tomllib.load(f)
+        else:
+            with open(file_name, encoding="utf8") as f:
+                data = json.load(f)
+    except (OSError, ValueError) as e:
+        msg = f"Cannot read job file {file_name}: {e}"
+        raise ParameterError(msg) from e
+    if not isinstance(data, dict):
+        msg = f"Job file {file_name} must contain an object with a list of jobs"
+        raise ParameterError(msg)
+    defaults = data.get("defaults", {})
+    jobs = data.get("jobs")
+    if (
+        not isinstance(defaults, dict)
+        or not isinstance(jobs, list)
+        or not jobs
+        or not all(isinstance(job, dict) for job in jobs)
+    ):
+        msg = f'Job file {file_name} must contain a non-empty list "jobs" of objects and optional "defaults"'
+        raise ParameterError(msg)
+    return [{**defaults, **job} for job in jobs]
+
+
+def job_arguments(
+    args_parser: argparse.ArgumentParser, args: argparse.Namespace, job: dict[str, Any]
+) -> argparse.Namespace:
+    """Return the command line options of a job.
+
+    The options of the job override the options given on the command line. Flags are switched on with true
+    and left as they are with false, lists give repeated options (e.g. "special").
+
+    Args:
+        args_parser: Argument parser of the command line.
+        args: Options given on the command line.
+        job: Options of the job.
+
+    Returns:
+        argparse.Namespace: Options of the job.
+
+    Raises:
+        ParameterError: The job contains an unknown or invalid option or an option shared by all jobs.
+
+    """
+    argv = []
+    for name, value in job.items():
+        option = f"--{name.replace('_', '-')}"
+        if isinstance(value, bool):
+            if value:
+                argv.append(option)
+            continue
+        for item in value if isinstance(value, list) else [value]:
+            argv.extend([option, str(item)])
+    # raise instead of exiting the process, e.g. in a request thread of the poster server
+    job_parser = copy.copy(args_parser)
+    job_parser.exit_on_error = False
+    try:
+        job_args, unknown = job_parser.parse_known_args(argv, namespace=copy.deepcopy(args))
+    except argparse.ArgumentError as e:
+        msg = f"Invalid job option: {e}"
+        raise ParameterError(msg) from e
+    if unknown:
+        msg = f"Unknown job options: {' '.join(unknown)}"
+        raise ParameterError(msg)
+    for name in SHARED_OPTIONS:
+        if getattr(job_args, name, None) != getattr(args, name, None):
+            msg = f"The option {name} is shared by all jobs and must be given on the command line"
+            raise ParameterError(msg)
+    return job_args
+
+
+# tracks of a worker process rendering jobs in parallel
+_worker_tracks: list[Track] = []
+
+
+def _init_job_worker(tracks: list[Track]) -> None:
+    global _worker_tracks  # noqa: PLW0603 - state of the worker process
+    _worker_tracks = tracks
+    # forked workers inherit the trace events, the metrics and the memory tracing of the main process
+    trace.recorder().collect()
+    metrics.metrics().reset()
+    memory.stop_in_worker()
+
+
+def _run_job(
+    render: Callable[[list[Track], argparse.Namespace], None], tracks: list[Track], job: argparse.Namespace
+) -> bool:
+    try:
+        render(tracks, job)
+    except PosterError as e:
+        log.error("%s: %s", job.output, e)  # noqa: TRY400 - the message is enough
+        return False
+    return True
+
+
+def _run_job_worker(
+    render: Callable[[list[Track], argparse.Namespace], None], job: argparse.Namespace
+) -> tuple[bool, list[dict[str, Any]], list[tuple[str, str, float]]]:
+    with trace.span("render job", "job", output=job.output):
+        result = _run_job(render, _worker_tracks, job)
+    return result, trace.recorder().collect(), metrics.metrics().collect()
+
+
+def run_jobs(
+    render: Callable[[list[Track], argparse.Namespace], None],
+    tracks: list[Track],
+    jobs: list[argparse.Namespace],
+    workers: int,
+) -> list[bool]:
+    """Render several jobs from the same tracks, in a process pool if more than one worker is allowed.
+
+    A job failing with a PosterError is logged and does not stop the other jobs.
+
+    Args:
+        render: Module level function rendering the poster of a job from all tracks.
+        tracks: All loaded tracks.
+        jobs: Options of the jobs.
+        workers: Maximum number of processes.
+
+    Returns:
+        list[bool]: Whether each job succeeded.
+
+    """
+    workers = min(workers, len(jobs))
+    if workers <= 1:
+        return [_run_job(render, tracks, job) for job in jobs]
+    log.info("Rendering %d posters with %d workers", len(jobs), workers)
+    # forked workers inherit the tracks without pickling them
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=_init_job_worker, initargs=(tracks,)
+    ) as executor:
+        # the jobs already run in parallel, so every job draws its years sequentially
+        futures = [
+            executor.submit(_run_job_worker, render, argparse.Namespace(**{**vars(job), "workers": 1})) for job in jobs
+        ]
+    results = []
+    for future in futures:
+        result, events, values = future.result()
+        trace.recorder().extend(events)
+        metrics.metrics().merge(values)
+        results.append(result)
+    return results
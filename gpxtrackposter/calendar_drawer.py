@@ -13,9 +13,8 @@ import svgwrite  # type: ignore[import-untyped]
 
 from gpxtrackposter import utils
 from gpxtrackposter.exceptions import PosterError
-from gpxtrackposter.localization import localized_day_of_week_name
 from gpxtrackposter.poster import Poster
-from gpxtrackposter.tracks_drawer import TracksDrawer
+from gpxtrackposter.tracks_drawer import TracksDrawer, YearGroup
 from gpxtrackposter.xy import XY
 
 
@@ -27,6 +26,8 @@ class CalendarDrawer(TracksDrawer):
 
     """
 
+    parallel_years = True
+
     def __init__(self, the_poster: Poster) -> None:
         """Initialize the CalendarDrawer class."""
         super().__init__(the_poster)
@@ -59,14 +60,23 @@ class CalendarDrawer(TracksDrawer):
             margin.y = 0
         sub_size = cell_size - 2 * margin
 
+        groups = []
         for year in self.poster.years.iter():
-            g_year = dr.g(id=f"year{year}")
-            g.add(g_year)
-            self._draw(dr, g_year, sub_size, offset + margin + cell_size * XY(x, y), year)
+            year_offset = offset + margin + cell_size * XY(x, y)
+            groups.append(
+                YearGroup(
+                    year,
+                    [tr for tr in self.poster.tracks if tr.start_time().year == year],
+                    [sub_size, year_offset],
+                    "_draw",
+                    {"size": sub_size, "offset": year_offset, "year": year},
+                )
+            )
             x += 1
             if x >= count_x:
                 x = 0
                 y += 1
+        self.draw_year_groups(dr, g, groups)
 
     def _draw(self, dr: svgwrite.Drawing, g: svgwrite.container.Group, size: XY, offset: XY, year: int) -> None:
         """Create a calendar for the given year.
@@ -81,22 +91,36 @@ class CalendarDrawer(TracksDrawer):
         """
         min_size = min(size.x, size.y)
         year_size = min_size * 4.0 / 80.0
-        year_style = f"font-size:{year_size}px; font-family:Arial;"
-        month_style = f"font-size:{min_size * 3.0 / 80.0}px; font-family:Arial;"
-        day_style = f"dominant-baseline: central; font-size:{min_size * 1.0 / 80.0}px; font-family:Arial;"
-        day_length_style = f"font-size:{min_size * 1.0 / 80.0}px; font-family:Arial;"
+        styles = self.poster.styles
+        text_color = self.poster.colors["text"]
+        year_class = styles.class_name(
+            style=f"font-size:{year_size}px; font-family:Arial;", fill=text_color, alignment_baseline="hanging"
+        )
+        month_class = styles.class_name(
+            style=f"font-size:{min_size * 3.0 / 80.0}px; font-family:Arial;",
+            fill=text_color,
+            alignment_baseline="hanging",
+        )
+        day_class = styles.class_name(
+            style=f"dominant-baseline: central; font-size:{min_size * 1.0 / 80.0}px; font-family:Arial;",
+            text_anchor="middle",
+            alignment_baseline="middle",
+        )
+        day_length_class = styles.class_name(
+            style=f"font-size:{min_size * 1.0 / 80.0}px; font-family:Arial;", fill=text_color, text_anchor="middle"
+        )
+        empty_day_class = styles.class_name(fill="#444444")
 
         g.add(
             dr.text(
                 f"{year}",
                 insert=offset.tuple(),
-                fill=self.poster.colors["text"],
-                alignment_baseline="hanging",
-                style=year_style,
+                class_=year_class,
             )
         )
-        offset.y += year_size
-        size.y -= year_size
+        # new objects, the size is shared by all years
+        offset = offset + XY(0, year_size)
+        size = size - XY(0, year_size)
         count_x = 31
         for month in range(1, 13):
             date = datetime.date(year, month, 1)
@@ -117,9 +141,7 @@ class CalendarDrawer(TracksDrawer):
                 dr.text(
                     self.poster.month_name(month),
                     insert=(offset.x, y_pos - 2),
-                    fill=self.poster.colors["text"],
-                    alignment_baseline="hanging",
-                    style=month_style,
+                    class_=month_class,
                 )
             )
 
@@ -138,29 +160,25 @@ class CalendarDrawer(TracksDrawer):
                     g.add(dr.rect(pos, dim, fill=color))
                     g.add(
                         dr.text(
-                            utils.format_float(self.poster.m2u(length)),
+                            self.poster.locale_data.format_float(self.poster.m2u(length)),
                             insert=(
                                 pos[0] + cell_size / 2,
                                 pos[1] + cell_size + cell_size / 2,
                             ),
-                            text_anchor="middle",
-                            style=day_length_style,
-                            fill=self.poster.colors["text"],
+                            class_=day_length_class,
                         )
                     )
                 else:
-                    g.add(dr.rect(pos, dim, fill="#444444"))
+                    g.add(dr.rect(pos, dim, class_=empty_day_class))
 
                 g.add(
                     dr.text(
-                        localized_day_of_week_name(date.weekday(), short=True),
+                        self.poster.locale_data.day_of_week_name(date.weekday(), short=True),
                         insert=(
                             offset.x + (day_offset + x) * cell_size + cell_size / 2,
                             pos[1] + cell_size / 2,
                         ),
-                        text_anchor="middle",
-                        alignment_baseline="middle",
-                        style=day_style,
+                        class_=day_class,
                     )
                 )
                 date += datetime.timedelta(1)
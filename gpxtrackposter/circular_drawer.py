@@ -10,14 +10,14 @@ from __future__ import annotations
 import calendar
 import datetime
 import math
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import pint  # type: ignore[import-untyped]
 import svgwrite  # type: ignore[import-untyped]
 
-from gpxtrackposter import utils
+from gpxtrackposter import drawer_options, utils
 from gpxtrackposter.exceptions import PosterError
-from gpxtrackposter.tracks_drawer import TracksDrawer
+from gpxtrackposter.tracks_drawer import TracksDrawer, YearGroup
 from gpxtrackposter.units import Units
 from gpxtrackposter.value_range import ValueRange
 from gpxtrackposter.xy import XY
@@ -41,10 +41,13 @@ class CircularDrawer(TracksDrawer):
     Methods:
         create_args: Set up an argparser for circular poster options.
         fetch_args: Get args from argparser.
+        state_key: Return the drawer settings the drawn year groups depend on.
         draw: Draw each year on the Poster.
 
     """
 
+    parallel_years = True
+
     def __init__(self, the_poster: Poster) -> None:
         """Init the CircularDrawer with default values for _rings and _ring_color
 
@@ -63,29 +66,7 @@ class CircularDrawer(TracksDrawer):
             args_parser: Argument parser
 
         """
-        group = args_parser.add_argument_group("Circular Type Options")
-        group.add_argument(
-            "--circular-rings",
-            dest="circular_rings",
-            action="store_true",
-            help="Draw distance rings.",
-        )
-        group.add_argument(
-            "--circular-ring-color",
-            dest="circular_ring_color",
-            metavar="COLOR",
-            type=str,
-            default="darkgrey",
-            help="Color of distance rings.",
-        )
-        group.add_argument(
-            "--circular-ring-max-distance",
-            dest="circular_ring_max_distance",
-            metavar="DISTANCE",
-            type=float,
-            help="Maximum distance for scaling the track lengths "
-            "(in unit system given with command line option --units).",
-        )
+        drawer_options.circular_args(args_parser)
 
     def fetch_args(self, args: argparse.Namespace) -> None:
         """Get arguments from the parser
@@ -104,6 +85,15 @@ class CircularDrawer(TracksDrawer):
         if self._max_distance:
             self._max_distance = self._max_distance * self._unit
 
+    def state_key(self) -> list[Any]:
+        """Return the drawer settings the drawn year groups depend on.
+
+        Returns:
+            list[Any]: JSON serializable settings.
+
+        """
+        return [*super().state_key(), self._rings, self._ring_color, str(self._max_distance), str(self._unit)]
+
     def draw(self, dr: svgwrite.Drawing, g: svgwrite.container.Group, size: XY, offset: XY) -> None:
         """Draw the circular Poster using distances broken down by time.
 
@@ -134,14 +124,23 @@ class CircularDrawer(TracksDrawer):
         if count_y <= 1:
             margin.y = 0
         sub_size = cell_size - 2 * margin
+        groups = []
         for year in self.poster.years.iter():
-            g_year = dr.g(id=f"year{year}")
-            g.add(g_year)
-            self._draw_year(dr, g_year, sub_size, offset + margin + cell_size * XY(x, y), year)
+            year_offset = offset + margin + cell_size * XY(x, y)
+            groups.append(
+                YearGroup(
+                    year,
+                    [tr for tr in self.poster.tracks if tr.start_time().year == year],
+                    [sub_size, year_offset],
+                    "_draw_year",
+                    {"size": sub_size, "offset": year_offset, "year": year},
+                )
+            )
             x += 1
             if x >= count_x:
                 x = 0
                 y += 1
+        self.draw_year_groups(dr, g, groups)
 
     def _draw_year(self, dr: svgwrite.Drawing, g: svgwrite.container.Group, size: XY, offset: XY, year: int) -> None:
         min_size = min(size.x, size.y)
@@ -152,17 +151,25 @@ class CircularDrawer(TracksDrawer):
         if self._rings:
             self._draw_rings(dr, g, center, radius_range)
 
-        year_style = f"dominant-baseline: central; font-size:{min_size * 4.0 / 80.0}px; font-family:Arial;"
-        month_style = f"font-size:{min_size * 3.0 / 80.0}px; font-family:Arial;"
+        styles = self.poster.styles
+        text_color = self.poster.colors["text"]
+        year_class = styles.class_name(
+            style=f"dominant-baseline: central; font-size:{min_size * 4.0 / 80.0}px; font-family:Arial;",
+            fill=text_color,
+            text_anchor="middle",
+            alignment_baseline="middle",
+        )
+        month_class = styles.class_name(
+            style=f"font-size:{min_size * 3.0 / 80.0}px; font-family:Arial;", fill=text_color, text_anchor="middle"
+        )
+        month_tick_class = styles.class_name(stroke=text_color, stroke_width=0.3)
+        month_path_class = styles.class_name(fill="none", stroke="none")
 
         g.add(
             dr.text(
                 f"{year}",
                 insert=center.tuple(),
-                fill=self.poster.colors["text"],
-                text_anchor="middle",
-                alignment_baseline="middle",
-                style=year_style,
+                class_=year_class,
             )
         )
         df = 360.0 / (366 if calendar.isleap(year) else 365)
@@ -185,26 +192,21 @@ class CircularDrawer(TracksDrawer):
                     dr.line(
                         start=(center + r1 * XY(sin_a1, -cos_a1)).tuple(),
                         end=(center + r2 * XY(sin_a1, -cos_a1)).tuple(),
-                        stroke=self.poster.colors["text"],
-                        stroke_width=0.3,
+                        class_=month_tick_class,
                     )
                 )
+                # explicit id instead of a drawing-wide counter, so the year can be drawn on its own
                 path = dr.path(
                     d=("M", center.x + r3 * sin_a1, center.y - r3 * cos_a1),
-                    fill="none",
-                    stroke="none",
+                    class_=month_path_class,
+                    id=f"year{year}-month{date.month}",
                 )
                 path.push(f"a{r3},{r3} 0 0,1 {r3 * (sin_a3 - sin_a1)},{r3 * (cos_a1 - cos_a3)}")
                 g.add(path)
                 tpath = svgwrite.text.TextPath(
                     path, self.poster.month_name(date.month), startOffset=(0.5 * r3 * (a3 - a1))
                 )
-                text = dr.text(
-                    "",
-                    fill=self.poster.colors["text"],
-                    text_anchor="middle",
-                    style=month_style,
-                )
+                text = dr.text("", class_=month_class)
                 text.add(tpath)
                 g.add(text)
             year_count = self.poster.year_tracks_date_count_dict[year]
@@ -254,6 +256,9 @@ class CircularDrawer(TracksDrawer):
         ring_distance = self._determine_ring_distance(max_length)
         if ring_distance is None:
             return
+        ring_class = self.poster.styles.class_name(
+            stroke=self._ring_color, stroke_opacity="0.2", fill="none", stroke_width=0.3
+        )
         distance = ring_distance
         while distance < max_length:
             radius = radius_range.interpolate((distance / max_length).magnitude)
@@ -261,10 +266,7 @@ class CircularDrawer(TracksDrawer):
                 dr.circle(
                     center=center.tuple(),
                     r=radius,
-                    stroke=self._ring_color,
-                    stroke_opacity="0.2",
-                    fill="none",
-                    stroke_width=0.3,
+                    class_=ring_class,
                 )
             )
             distance += ring_distance  # type: ignore[misc]
@@ -296,13 +298,13 @@ class CircularDrawer(TracksDrawer):
         path = dr.path(
             d=("M", center.x + r1 * sin_a1, center.y - r1 * cos_a1),
             fill=color,
-            stroke="none",
+            class_=self.poster.styles.class_name(stroke="none"),
         )
         path.push("l", (r2 - r1) * sin_a1, (r1 - r2) * cos_a1)
         path.push(f"a{r2},{r2} 0 0,0 {r2 * (sin_a2 - sin_a1)},{r2 * (cos_a1 - cos_a2)}")
         path.push("l", (r1 - r2) * sin_a2, (r2 - r1) * cos_a2)
         date_title = str(tracks[0].start_time().date())
-        str_length = utils.format_float(self.poster.m2u(length))
+        str_length = self.poster.locale_data.format_float(self.poster.m2u(length))
         path.set_desc(title=f"{date_title} {str_length} {self.poster.u()}")
         if self.poster.with_animation:
             path.add(
@@ -9,6 +9,9 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import cProfile
+import json
 import logging
 import os
 import sys
@@ -16,65 +19,326 @@ import sys
 import appdirs  # type: ignore[import-untyped]
 
 from gpxtrackposter import (
-    calendar_drawer,
-    circular_drawer,
-    github_drawer,
-    grid_drawer,
-    heatmap_drawer,
-    poster,
+    batch,
+    drawer_registry,
+    fingerprint,
+    memory,
+    metrics,
+    poster_job,
+    timings,
+    trace,
     track_loader,
+    utils,
+    watch,
 )
 from gpxtrackposter.exceptions import ParameterError, PosterError
+from gpxtrackposter.poster_job import setup_track_filters
 from gpxtrackposter.units import Units
 
 __app_name__ = "create_poster"
 __app_author__ = "flopp.net"
 
-p = poster.Poster()
-drawers = {
-    "grid": grid_drawer.GridDrawer(p),
-    "calendar": calendar_drawer.CalendarDrawer(p),
-    "heatmap": heatmap_drawer.HeatmapDrawer(p),
-    "circular": circular_drawer.CircularDrawer(p),
-    "github": github_drawer.GithubDrawer(p),
-}
-
 
 def main() -> None:
     """Handle command line arguments and call other modules as needed."""
+    timings.timings().reset()
+    metrics.metrics().reset()
+    # "create_poster serve ..." answers render requests instead of rendering one poster
+    argv = sys.argv[1:]
+    serve_mode = argv[:1] == ["serve"]
+    if serve_mode:
+        argv = argv[1:]
+
     # create basic args parser
     args_parser = create_parser()
 
-    # add command line options for every single drawer type
-    for drawer in drawers.values():
-        drawer.create_args(args_parser)
+    # add command line options of all drawer types
+    add_drawer_args(args_parser)
+    if serve_mode:
+        add_server_args(args_parser)
 
     # parse all arguments
-    args = parse_args(args_parser, sys.argv[1:])
-
-    # fetch all arguments
-    for drawer in drawers.values():
-        drawer.fetch_args(args)
+    args = parse_args(args_parser, argv)
 
     # setup logging
-    setup_logging(args.verbose, args.logfile)
+    setup_logging(args.logfile, args.verbose)
+
+    if args.trace:
+        trace.recorder().enable()
+    if args.memory_report:
+        memory.report().reset()
+        memory.report().enable()
+    profiler = None
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        run(args_parser, args, serve_mode)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+        report_timings(args)
+        report_metrics(args)
+        report_memory(args)
+        if args.trace:
+            trace.recorder().write(args.trace)
+
+
+def run(args_parser: argparse.ArgumentParser, args: argparse.Namespace, serve_mode: bool = False) -> None:
+    """Render the poster, the posters of a job file or answer render requests.
+
+    Args:
+        args_parser: Argument parser
+        args: Command line options
+        serve_mode: Answer render requests, see run_server
+
+    Raises:
+        ParameterError: An option is not valid.
+
+    """
+    if args.watch and args.from_strava:
+        msg = "--watch needs GPX files and cannot be used with --from-strava"
+        raise ParameterError(msg)
+
+    # create the poster and the drawer of the selected type and check the drawer options
+    job = poster_job.PosterJob(args, appdirs.user_cache_dir(__app_name__, __app_author__))
+
+    if serve_mode:
+        run_server(args_parser, args)
+        return
+
+    if args.jobs:
+        run_batch(args_parser, args)
+        return
 
     # setup loader
     loader = setup_loader(args)
+    if not args.watch:
+        render_poster(job, args, loader)
+        return
+    # watch before the first rendering, so that GPX files added meanwhile cause an update
+    with contextlib.closing(watch.DirectoryWatcher(args.gpx_dir)) as watcher:
+        render_poster(job, args, loader)
+        # a new job for every update, the poster keeps the state of the previous one
+        cache_dir = appdirs.user_cache_dir(__app_name__, __app_author__)
+        watch.watch(
+            args.gpx_dir, lambda: render_poster(poster_job.PosterJob(args, cache_dir), args, loader), watcher=watcher
+        )
+
+
+def report_timings(args: argparse.Namespace) -> None:
+    """Log the time spent in the phases of the run with --verbose and write it to the --timings-json file
+
+    Args:
+        args: Command line options
+
+    """
+    run_timings = timings.timings()
+    if args.verbose:
+        logging.getLogger("gpxtrackposter").info("Timings:\n%s", run_timings.table())
+    if args.timings_json:
+        with open(args.timings_json, "w", encoding="utf8") as f:
+            json.dump(run_timings.report(), f, indent=2)
+
+
+def report_metrics(args: argparse.Namespace) -> None:
+    """Write the counters of the run, its phase timings and peak memory to the --metrics file
+
+    Args:
+        args: Command line options
+
+    """
+    if args.metrics:
+        metrics.finish_run(timings.timings().report())
+        metrics.metrics().write(args.metrics)
+
+
+def report_memory(args: argparse.Namespace) -> None:
+    """Write the memory used by the phases of the run to the --memory-report file and log it with --verbose
+
+    Args:
+        args: Command line options
+
+    """
+    if not args.memory_report:
+        return
+    run_memory = memory.report()
+    run_memory.disable()
+    if args.verbose:
+        logging.getLogger("gpxtrackposter").info("Memory:\n%s", run_memory.table())
+    with open(args.memory_report, "w", encoding="utf8") as f:
+        json.dump(run_memory.report(), f, indent=2)
+
+
+def render_poster(job: poster_job.PosterJob, args: argparse.Namespace, loader: track_loader.TrackLoader) -> None:
+    """Load the tracks and render the poster, unless it is up to date.
+
+    GPX files are read with TrackLoader.update_tracks, so that calling this again with the same loader only reads
+    the files changed in between.
+
+    Args:
+        job: Poster job of the command line options
+        args: Command line options
+        loader: Loader of the tracks
+
+    """
+    log = logging.getLogger("gpxtrackposter")
+    # skip rendering if the output was created from the same inputs; strava tracks are only known after loading
+    input_fingerprint = None
+    if not args.from_strava:
+        input_fingerprint = fingerprint.input_fingerprint(args, loader.fingerprint(args.gpx_dir))
+        if not args.force and fingerprint.is_up_to_date(args.output, input_fingerprint):
+            log.info("%s is up to date.", args.output)
+            return
 
     # setup tracks
-    tracks = loader.load_strava_tracks(args.from_strava) if args.from_strava else loader.load_tracks(args.gpx_dir)
+    tracks = loader.load_strava_tracks(args.from_strava) if args.from_strava else loader.update_tracks(args.gpx_dir)
     if not tracks:
         if not args.clear_cache:
-            log = logging.getLogger("gpxtrackposter")
             log.info("No tracks found.")
         return
 
-    # setup poster
-    pstr = setup_poster(tracks, args)
-
     # draw poster
-    pstr.draw(drawers[args.type], args.output)
+    job.render(tracks)
+    if input_fingerprint is not None:
+        fingerprint.store_fingerprint(args.output, input_fingerprint)
+
+
+def run_batch(args_parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Render the posters of a job file from tracks loaded once.
+
+    The tracks are loaded without year, length and activity filters, every job selects its own tracks.
+    Jobs whose output is up to date are skipped unless forced.
+
+    Args:
+        args_parser: Argument parser
+        args: Command line options, the defaults of all jobs
+
+    Raises:
+        ParameterError: The job file is not valid.
+        PosterError: At least one poster could not be rendered.
+
+    """
+    jobs = [batch.job_arguments(args_parser, args, job) for job in batch.load_job_file(args.jobs)]
+    outputs = [job.output for job in jobs]
+    if len(set(outputs)) != len(outputs):
+        msg = f"Every job of {args.jobs} needs its own output file"
+        raise ParameterError(msg)
+    for job in jobs:
+        setup_track_filters(track_loader.TrackLoader(1), job)
+
+    loader = setup_loader(args)
+    clear_track_filters(loader)
+    if not args.watch:
+        render_batch(jobs, args, loader)
+        return
+    # watch before the first rendering, so that GPX files added meanwhile cause an update
+    with contextlib.closing(watch.DirectoryWatcher(args.gpx_dir)) as watcher:
+        render_batch(jobs, args, loader)
+        watch.watch(args.gpx_dir, lambda: render_batch(jobs, args, loader), watcher=watcher)
+
+
+def render_batch(jobs: list[argparse.Namespace], args: argparse.Namespace, loader: track_loader.TrackLoader) -> None:
+    """Load the tracks and render the posters of the jobs which are not up to date.
+
+    Args:
+        jobs: Options of the jobs
+        args: Command line options
+        loader: Loader of the tracks, without year, length and activity filters
+
+    Raises:
+        PosterError: At least one poster could not be rendered.
+
+    """
+    log = logging.getLogger("gpxtrackposter")
+    fingerprints = {}
+    if not args.from_strava:
+        tracks_hash = loader.fingerprint(args.gpx_dir)
+        fingerprints = {job.output: fingerprint.input_fingerprint(job, tracks_hash) for job in jobs}
+    pending = []
+    for job in jobs:
+        if (
+            job.output in fingerprints
+            and not job.force
+            and fingerprint.is_up_to_date(job.output, fingerprints[job.output])
+        ):
+            log.info("%s is up to date.", job.output)
+        else:
+            pending.append(job)
+    if not pending:
+        return
+
+    tracks = loader.load_strava_tracks(args.from_strava) if args.from_strava else loader.update_tracks(args.gpx_dir)
+    # the phases of jobs rendered in worker processes are not measured, so measure all jobs as one phase
+    with timings.phase("render jobs"):
+        results = batch.run_jobs(render_job, tracks, pending, args.workers or os.cpu_count() or 1)
+    for job, succeeded in zip(pending, results, strict=True):
+        if succeeded and job.output in fingerprints and os.path.isfile(job.output):
+            fingerprint.store_fingerprint(job.output, fingerprints[job.output])
+    if not all(results):
+        msg = f"{results.count(False)} of {len(results)} posters could not be rendered"
+        raise PosterError(msg)
+
+
+def run_server(args_parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Load the tracks once and render posters on request until interrupted.
+
+    Args:
+        args_parser: Argument parser
+        args: Command line options, the defaults of all requests
+
+    """
+    # only needed by the serve command
+    from gpxtrackposter import server
+
+    loader = setup_loader(args)
+    clear_track_filters(loader)
+    store = server.TrackStore(loader, args.gpx_dir, args.from_strava)
+    store.tracks()
+    poster_server = server.PosterServer(store, args_parser, args, appdirs.user_cache_dir(__app_name__, __app_author__))
+    server.serve(poster_server, args.host, args.port, args.socket)
+
+
+def render_job(tracks: list[track_loader.Track], args: argparse.Namespace) -> None:
+    """Render the poster of a batch job with its own poster and drawer.
+
+    Args:
+        tracks: All tracks loaded for the batch
+        args: Options of the job
+
+    """
+    job = poster_job.PosterJob(args, appdirs.user_cache_dir(__app_name__, __app_author__))
+    job_tracks = job.select_tracks(tracks)
+    if not job_tracks:
+        logging.getLogger("gpxtrackposter").info("%s: No tracks found.", args.output)
+        return
+    job.render(job_tracks)
+
+
+def add_drawer_args(args_parser: argparse.ArgumentParser) -> None:
+    """Add the options of all drawer types, without importing the drawers
+
+    Args:
+        args_parser: Argument parser
+
+    """
+    for plugin in drawer_registry.drawer_plugins().values():
+        plugin.add_args(args_parser)
+
+
+def add_server_args(args_parser: argparse.ArgumentParser) -> None:
+    """Add the options of the serve command
+
+    Args:
+        args_parser: Argument parser
+
+    """
+    # only needed by the serve command
+    from gpxtrackposter import server
+
+    args_parser.prog = f"{__app_name__} serve"
+    server.add_server_args(args_parser)
 
 
 def parse_args(args_parser: argparse.ArgumentParser, args: list) -> argparse.Namespace:
@@ -112,7 +376,7 @@ def create_parser() -> argparse.ArgumentParser:
         metavar="FILE",
         type=str,
         default="poster.svg",
-        help='Name of generated SVG image file (default: "poster.svg").',
+        help='Name of generated SVG image file; use the extension ".png" for a PNG image (default: "poster.svg").',
     )
     args_parser.add_argument(
         "--language",
@@ -149,12 +413,13 @@ def create_parser() -> argparse.ArgumentParser:
         default=[],
         help="Mark track file from the GPX directory as special; use multiple times to mark multiple tracks.",
     )
-    types = '", "'.join(drawers.keys())
+    plugins = drawer_registry.drawer_plugins()
+    types = '", "'.join(plugins.keys())
     args_parser.add_argument(
         "--type",
         metavar="TYPE",
         default="grid",
-        choices=drawers.keys(),
+        choices=plugins.keys(),
         help=f'Type of poster to create (default: "grid", available: "{types}").',
     )
     args_parser.add_argument(
@@ -216,12 +481,33 @@ def create_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Clear the track cache.",
     )
+    args_parser.add_argument(
+        "--force",
+        dest="force",
+        action="store_true",
+        help="Render the poster even if the GPX files and options did not change since the last run.",
+    )
     args_parser.add_argument(
         "--workers",
         dest="workers",
         metavar="NUMBER_OF_WORKERS",
         type=int,
-        help="Number of parallel track loading workers (default: number of CPU cores)",
+        help="Number of parallel workers loading tracks and drawing years (default: number of CPU cores)",
+    )
+    args_parser.add_argument(
+        "--jobs",
+        dest="jobs",
+        metavar="FILE",
+        type=str,
+        help="JSON or TOML file listing posters to render from the same tracks; every job sets its own options, "
+        "e.g. type, year, activity and output.",
+    )
+    args_parser.add_argument(
+        "--watch",
+        dest="watch",
+        action="store_true",
+        help="Keep running and render again when GPX files of the GPX directory are added, changed or removed; "
+        "only these files are loaded again.",
     )
     args_parser.add_argument(
         "--from-strava",
@@ -230,8 +516,48 @@ def create_parser() -> argparse.ArgumentParser:
         type=str,
         help="JSON file containing config used to get activities from strava",
     )
-    args_parser.add_argument("--verbose", dest="verbose", action="store_true", help="Verbose logging.")
+    args_parser.add_argument(
+        "--verbose", dest="verbose", action="store_true", help="Verbose logging, including the time of every phase."
+    )
     args_parser.add_argument("--logfile", dest="logfile", metavar="FILE", type=str)
+    args_parser.add_argument(
+        "--timings-json",
+        dest="timings_json",
+        metavar="FILE",
+        type=str,
+        help="Write the time spent in every phase of the run, e.g. loading tracks and drawing, to a JSON file.",
+    )
+    args_parser.add_argument(
+        "--profile",
+        dest="profile",
+        metavar="FILE",
+        type=str,
+        help="Write a cProfile dump of the run to FILE, e.g. for python -m pstats or snakeviz.",
+    )
+    args_parser.add_argument(
+        "--trace",
+        dest="trace",
+        metavar="FILE",
+        type=str,
+        help="Write a Chrome trace of the phases and the work on every file in all worker processes to FILE, "
+        "e.g. trace.json for https://ui.perfetto.dev.",
+    )
+    args_parser.add_argument(
+        "--metrics",
+        dest="metrics",
+        metavar="FILE",
+        type=str,
+        help="Write counters of the run, e.g. files scanned, cache hits, points drawn and peak memory, to FILE: "
+        "a Prometheus textfile if FILE ends with .prom, otherwise append a line to a JSON lines file.",
+    )
+    args_parser.add_argument(
+        "--memory-report",
+        dest="memory_report",
+        metavar="FILE",
+        type=str,
+        help="Trace memory allocations and write the peak memory and RSS of every phase and the largest allocation "
+        "sites to a JSON file; slows down the run.",
+    )
     args_parser.add_argument(
         "--special-distance",
         dest="special_distance",
@@ -278,6 +604,28 @@ def create_parser() -> argparse.ArgumentParser:
         default=30,
         help="animation duration (default: 30s)",
     )
+    args_parser.add_argument(
+        "--dpi",
+        dest="dpi",
+        metavar="DPI",
+        type=int,
+        default=utils.DEFAULT_DPI,
+        help=f"Print resolution used to choose the coordinate precision and the size of PNG images "
+        f"(default: {utils.DEFAULT_DPI}).",
+    )
+    args_parser.add_argument(
+        "--precision",
+        dest="precision",
+        metavar="DIGITS",
+        type=int,
+        help="Number of decimals of track coordinates in the SVG output (default: automatic, based on --dpi).",
+    )
+    args_parser.add_argument(
+        "--svg-paths",
+        dest="svg_paths",
+        action="store_true",
+        help="Write track lines as relative path data instead of polylines (smaller SVG files).",
+    )
     return args_parser
 
 
@@ -288,6 +636,9 @@ def setup_logging(logfile: str | None = None, verbose: bool = False) -> logging.
     if logfile:
         handler = logging.FileHandler(logfile)
         log.addHandler(handler)
+    # without a handler, only warnings and errors would be shown
+    if verbose and not any(type(handler) is logging.StreamHandler for handler in log.handlers):
+        log.addHandler(logging.StreamHandler())
     return log
 
 
@@ -295,13 +646,7 @@ def setup_loader(args: argparse.Namespace) -> track_loader.TrackLoader:
     """Set up the tracks loader"""
     loader = track_loader.TrackLoader(args.workers)
     loader.set_cache_dir(os.path.join(appdirs.user_cache_dir(__app_name__, __app_author__), "tracks"))
-    if not loader.year_range.parse(args.year):
-        msg = f"Bad year range: {args.year}."
-        raise ParameterError(msg)
-
-    loader.special_file_names = args.special
-    loader.set_min_length(args.min_distance * Units().km)
-    loader.set_activity(args.activity_type)
+    setup_track_filters(loader, args)
     if args.clear_cache:
         log = logging.getLogger("gpxtrackposter")
         log.info("Clearing track cache")
@@ -309,35 +654,11 @@ def setup_loader(args: argparse.Namespace) -> track_loader.TrackLoader:
     return loader
 
 
-def setup_poster(tracks: list[track_loader.Track], args: argparse.Namespace) -> poster.Poster:
-    """Set up the poster"""
-    msg = f"Creating poster of type {args.type} with {len(tracks)} tracks and storing it in file {args.output}..."
-    log = logging.getLogger("gpxtrackposter")
-    log.info(msg)
-    p.set_language(args.language, args.localedir)
-    p.set_athlete(args.athlete)
-    p.set_title(args.title if args.title else p.translate("MY TRACKS"))
-    p.set_with_animation(args.with_animation)
-    p.set_animation_time(args.animation_time)
-
-    p.special_distance = {
-        "special_distance": args.special_distance * Units().km,
-        "special_distance2": args.special_distance2 * Units().km,
-    }
-
-    p.colors = {
-        "background": args.background_color,
-        "track": args.track_color,
-        "track2": args.track_color2 or args.track_color,
-        "special": args.special_color,
-        "special2": args.special_color2 or args.special_color,
-        "text": args.text_color,
-    }
-    p.units = args.units
-    p.set_tracks(tracks)
-    if args.type == "github":
-        p.height = 55 + p.years.count() * 43
-    return p
+def clear_track_filters(loader: track_loader.TrackLoader) -> None:
+    """Remove the year, length and activity filters of a loader, e.g. to load the tracks of several posters"""
+    loader.year_range.parse("all")
+    loader.set_min_length(0 * Units().km)
+    loader.set_activity("all")
 
 
 if __name__ == "__main__":
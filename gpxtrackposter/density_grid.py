@@ -0,0 +1,228 @@
+"""Accumulate track visits per pixel for density heatmaps"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import hashlib
+import io
+import math
+import os
+import struct
+from typing import TYPE_CHECKING
+
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw  # type: ignore[import-untyped]
+
+from gpxtrackposter.drawer_options import TONE_MAPS
+from gpxtrackposter.exceptions import ParameterError
+
+if TYPE_CHECKING:
+    import s2sphere  # type: ignore[import-untyped]
+
+    from gpxtrackposter.track import Track
+    from gpxtrackposter.xy import XY
+
+# alpha of the least visited pixels, so that single tracks stay visible
+MIN_ALPHA = 64
+
+
+def density_key(
+    bbox: s2sphere.LatLngRect, size: XY, offset: XY, scale: float, line_width: int, tracks: list[Track]
+) -> str:
+    """Return a key identifying the density grid of tracks projected to a boundary box.
+
+    Args:
+        bbox: Boundary box of the projection.
+        size: Size of the projected area.
+        offset: Offset of the projected area.
+        scale: Pixels per poster unit.
+        line_width: Line width in pixels.
+        tracks: Tracks to accumulate.
+
+    Returns:
+        str: Hex digest over the projection parameters and all track points.
+
+    """
+    h = hashlib.sha256()
+    h.update(
+        struct.pack(
+            "<7d",
+            bbox.lat_lo().degrees,
+            bbox.lng_lo().degrees,
+            bbox.lat_hi().degrees,
+            bbox.lng_hi().degrees,
+            size.x,
+            size.y,
+            scale,
+        )
+    )
+    h.update(struct.pack("<2di", offset.x, offset.y, line_width))
+    for tr in tracks:
+        h.update(tr.polylines_hash().encode())
+    return h.hexdigest()
+
+
+class DensityGrid:
+    """Count the number of tracks passing through every pixel.
+
+    Every track adds at most one visit per pixel, no matter how often it crosses it. The grid only
+    depends on the tracks and the projection, so it can be cached and re-colored without rasterizing
+    the tracks again.
+
+    Attributes:
+        counts: Visit counts with shape (height, width).
+
+    Methods:
+        add_track: Rasterize the projected lines of one track into the grid.
+        tone_map: Map the visit counts to values between 0 and 1.
+        to_image: Color the grid with a color gradient.
+        to_png: Return the colored grid as PNG data.
+        save: Store the grid in a file.
+        load: Load a grid from a file.
+
+    """
+
+    def __init__(self, width: int, height: int) -> None:
+        """Initialize the DensityGrid class."""
+        self.counts: np.ndarray = np.zeros((height, width), dtype=np.uint32)
+
+    @property
+    def width(self) -> int:
+        """Return the width of the grid in pixels."""
+        return int(self.counts.shape[1])
+
+    @property
+    def height(self) -> int:
+        """Return the height of the grid in pixels."""
+        return int(self.counts.shape[0])
+
+    def add_track(self, lines: list[list[tuple[float, float]]], line_width: int = 1) -> None:
+        """Rasterize the lines of one track (in pixel coordinates) into the grid.
+
+        Only the bounding box of the track is drawn and added, so adding a track is cheap compared to the
+        size of the whole grid.
+
+        Args:
+            lines: Lines of the track in pixel coordinates.
+            line_width: Width of the lines in pixels.
+
+        """
+        points = [p for line in lines for p in line]
+        if not points:
+            return
+        margin = math.ceil(line_width / 2) + 1
+        x0 = max(0, math.floor(min(p[0] for p in points)) - margin)
+        y0 = max(0, math.floor(min(p[1] for p in points)) - margin)
+        x1 = min(self.width, math.ceil(max(p[0] for p in points)) + margin)
+        y1 = min(self.height, math.ceil(max(p[1] for p in points)) + margin)
+        if x0 >= x1 or y0 >= y1:
+            return
+        mask = Image.new("L", (x1 - x0, y1 - y0))
+        draw = ImageDraw.Draw(mask)
+        for line in lines:
+            shifted = [(x - x0, y - y0) for x, y in line]
+            if len(shifted) == 1:
+                shifted.append(shifted[0])
+            draw.line(shifted, fill=1, width=line_width, joint="curve")
+        self.counts[y0:y1, x0:x1] += np.asarray(mask, dtype=np.uint32)
+
+    def tone_map(self, method: str = "log", percentile: float = 99.0) -> np.ndarray:
+        """Map the visit counts to values between 0 and 1.
+
+        Args:
+            method: "log" scales logarithmically up to the maximum count, "percentile" scales linearly up to
+                the given percentile of the visited pixels and saturates above it.
+            percentile: Percentile used by the "percentile" method.
+
+        Returns:
+            np.ndarray: Values between 0 and 1, with the shape of the grid.
+
+        Raises:
+            ParameterError: Unknown tone map method.
+
+        """
+        counts = self.counts.astype(np.float64)
+        visited = counts[counts > 0]
+        if visited.size == 0:
+            return counts
+        if method == "log":
+            return np.log1p(counts) / np.log1p(visited.max())
+        if method == "percentile":
+            limit = max(float(np.percentile(visited, percentile)), 1.0)
+            return np.minimum(counts / limit, 1.0)
+        msg = f"Not a valid tone map: {method} (must be one of {', '.join(TONE_MAPS)})"
+        raise ParameterError(msg)
+
+    def to_image(self, gradient: tuple[str, ...], method: str = "log", percentile: float = 99.0) -> Image.Image:
+        """Color the grid with a color gradient.
+
+        Unvisited pixels are transparent, visited pixels get the gradient color of their tone mapped value and
+        an alpha value rising with it.
+
+        Args:
+            gradient: Colors as returned by utils.color_gradient.
+            method: Tone map method, see tone_map.
+            percentile: Percentile used by the "percentile" tone map.
+
+        Returns:
+            Image.Image: RGBA image with the size of the grid.
+
+        """
+        values = self.tone_map(method, percentile)
+        lut = np.array([ImageColor.getrgb(c)[:3] for c in gradient], dtype=np.uint8)
+        index = np.rint(values * (len(gradient) - 1)).astype(np.intp)
+        rgba = np.zeros((self.height, self.width, 4), dtype=np.uint8)
+        rgba[..., :3] = lut[index]
+        alpha = np.rint(MIN_ALPHA + (255 - MIN_ALPHA) * values).astype(np.uint8)
+        rgba[..., 3] = np.where(self.counts > 0, alpha, 0)
+        return Image.fromarray(rgba, "RGBA")
+
+    def to_png(self, gradient: tuple[str, ...], method: str = "log", percentile: float = 99.0) -> bytes:
+        """Return the colored grid as PNG data.
+
+        Args:
+            gradient: Colors as returned by utils.color_gradient.
+            method: Tone map method, see tone_map.
+            percentile: Percentile used by the "percentile" tone map.
+
+        Returns:
+            bytes: PNG data.
+
+        """
+        buffer = io.BytesIO()
+        self.to_image(gradient, method, percentile).save(buffer, format="PNG", optimize=True)
+        return buffer.getvalue()
+
+    def save(self, file_name: str) -> None:
+        """Store the grid in a compressed file.
+
+        Args:
+            file_name: Name of the file.
+
+        """
+        directory = os.path.dirname(file_name)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(file_name, "wb") as f:
+            np.savez_compressed(f, counts=self.counts)
+
+    @classmethod
+    def load(cls, file_name: str) -> DensityGrid:
+        """Load a grid stored with save.
+
+        Args:
+            file_name: Name of the file.
+
+        Returns:
+            DensityGrid: Loaded grid.
+
+        """
+        with np.load(file_name) as data:
+            counts = data["counts"]
+        grid = cls(int(counts.shape[1]), int(counts.shape[0]))
+        grid.counts = counts.astype(np.uint32)
+        return grid
@@ -0,0 +1,183 @@
+"""Command line options of the built-in drawers, available without importing the drawers"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import argparse
+
+BACKGROUND_FORMATS = {"png": "image/png", "jpeg": "image/jpeg", "webp": "image/webp"}
+DEFAULT_BACKGROUND_QUALITY = 85
+DEFAULT_TILE_CACHE_SIZE = 512  # MB
+DEFAULT_TILE_WORKERS = 8
+TONE_MAPS = ["log", "percentile"]
+
+
+def circular_args(args_parser: argparse.ArgumentParser) -> None:
+    """Add the options of the circular drawer to the parser
+
+    Args:
+        args_parser: Argument parser
+
+    """
+    group = args_parser.add_argument_group("Circular Type Options")
+    group.add_argument(
+        "--circular-rings",
+        dest="circular_rings",
+        action="store_true",
+        help="Draw distance rings.",
+    )
+    group.add_argument(
+        "--circular-ring-color",
+        dest="circular_ring_color",
+        metavar="COLOR",
+        type=str,
+        default="darkgrey",
+        help="Color of distance rings.",
+    )
+    group.add_argument(
+        "--circular-ring-max-distance",
+        dest="circular_ring_max_distance",
+        metavar="DISTANCE",
+        type=float,
+        help="Maximum distance for scaling the track lengths (in unit system given with command line option --units).",
+    )
+
+
+def heatmap_args(args_parser: argparse.ArgumentParser) -> None:
+    """Add the options of the heatmap drawer to the parser
+
+    The tile provider is checked by the drawer, so that the parser does not need to import staticmaps.
+
+    Args:
+        args_parser: Argument parser
+
+    """
+    group = args_parser.add_argument_group("Heatmap Type Options")
+    group.add_argument(
+        "--heatmap-center",
+        dest="heatmap_center",
+        metavar="LAT,LNG",
+        type=str,
+        help="Center of the heatmap (default: automatic).",
+    )
+    group.add_argument(
+        "--heatmap-radius",
+        dest="heatmap_radius",
+        metavar="RADIUS_KM",
+        type=float,
+        help="Scale the heatmap such that at least a circle with radius=RADIUS_KM is visible (default: automatic).",
+    )
+    group.add_argument(
+        "--heatmap-line-transparency-width",
+        dest="heatmap_line_width",
+        metavar="TRANSP_1,WIDTH_1, TRANSP_2,WIDTH_2, TRANSP_3,WIDTH_3",
+        type=str,
+        help="Define three transparency and width tuples for the heatmap lines or set it to "
+        "`automatic` for automatic calculation (default: 0.1,5.0, 0.2,2.0, 1.0,0.3).",
+    )
+    group.add_argument(
+        "--heatmap-tile-provider",
+        dest="heatmap_tile_provider",
+        metavar="TILE_PROVIDER",
+        type=str,
+        help="Optionally, choose a tile provider of py-staticmaps for a background map image, "
+        "e.g. osm, carto or carto-dark. (Default: None)",
+    )
+    group.add_argument(
+        "--heatmap-tile-dir",
+        dest="heatmap_tile_dir",
+        metavar="DIR",
+        type=str,
+        help="Use map tiles from a local directory with the layout DIR/ZOOM/X/Y.png instead of a tile provider "
+        "for the background map image (default: none).",
+    )
+    group.add_argument(
+        "--heatmap-tile-cache-size",
+        dest="heatmap_tile_cache_size",
+        metavar="MB",
+        type=int,
+        default=DEFAULT_TILE_CACHE_SIZE,
+        help="Maximum size of the map tile cache; least recently used tiles are removed "
+        f"(default: {DEFAULT_TILE_CACHE_SIZE} MB).",
+    )
+    group.add_argument(
+        "--heatmap-tile-workers",
+        dest="heatmap_tile_workers",
+        metavar="NUMBER_OF_WORKERS",
+        type=int,
+        default=DEFAULT_TILE_WORKERS,
+        help=f"Number of parallel map tile downloads (default: {DEFAULT_TILE_WORKERS}).",
+    )
+    group.add_argument(
+        "--heatmap-tile-max-size",
+        dest="heatmap_tile_max_size",
+        metavar="PIXEL",
+        type=int,
+        default=1200,
+        help="Set the maximum background image size (which is afterwards scaled to the poster size). "
+        "This setting defines how much details will be shown on the map. "
+        "Be sure to choose a reasonable value! (default: 1200 px)",
+    )
+    bg_renderer = ["pillow", "cairo"]
+    group.add_argument(
+        "--heatmap-tile-renderer",
+        dest="heatmap_renderer",
+        metavar="RENDERER",
+        choices=bg_renderer,
+        default=bg_renderer[0],
+        help=f"Choose a renderer for generating the background image, one of {', '.join(bg_renderer)}. "
+        f"(default: {bg_renderer[0]})",
+    )
+    group.add_argument(
+        "--heatmap-tile-format",
+        dest="heatmap_tile_format",
+        metavar="FORMAT",
+        choices=BACKGROUND_FORMATS.keys(),
+        default="png",
+        help=f"Image format of the embedded background image, one of {', '.join(BACKGROUND_FORMATS)}; "
+        "jpeg and webp result in much smaller files. (default: png)",
+    )
+    group.add_argument(
+        "--heatmap-tile-quality",
+        dest="heatmap_tile_quality",
+        metavar="QUALITY",
+        type=int,
+        default=DEFAULT_BACKGROUND_QUALITY,
+        help=f"Quality (1-100) of jpeg and webp background images. (default: {DEFAULT_BACKGROUND_QUALITY})",
+    )
+    modes = ["lines", "density"]
+    group.add_argument(
+        "--heatmap-mode",
+        dest="heatmap_mode",
+        metavar="MODE",
+        choices=modes,
+        default=modes[0],
+        help=f"Draw tracks as semi-transparent lines or as a single image of the number of tracks per pixel, "
+        f"colored from track color to secondary track color, special tracks from special color to secondary "
+        f"special color; one of {', '.join(modes)}. "
+        f"(default: {modes[0]})",
+    )
+    group.add_argument(
+        "--heatmap-tone-map",
+        dest="heatmap_tone_map",
+        metavar="TONE_MAP",
+        choices=TONE_MAPS,
+        default=TONE_MAPS[0],
+        help=f"Mapping of track counts to colors in density mode, one of {', '.join(TONE_MAPS)}. "
+        f"(default: {TONE_MAPS[0]})",
+    )
+    group.add_argument(
+        "--heatmap-density-cache",
+        dest="heatmap_density_cache",
+        metavar="DIR",
+        type=str,
+        help="Directory to cache density grids in, so that changing colors or tone map does not "
+        "rasterize the tracks again (default: no cache).",
+    )
@@ -0,0 +1,154 @@
+"""Registry of the drawers of the poster types, including drawers of other packages"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import functools
+import importlib
+import importlib.metadata
+import logging
+from typing import TYPE_CHECKING
+
+from gpxtrackposter import drawer_options
+from gpxtrackposter.exceptions import PosterError
+
+if TYPE_CHECKING:
+    import argparse
+    from collections.abc import Callable
+
+    from gpxtrackposter.tracks_drawer import TracksDrawer
+
+log = logging.getLogger("gpxtrackposter")
+
+# entry point group of drawers provided by other packages
+ENTRY_POINT_GROUP = "gpxtrackposter.drawers"
+
+
+class DrawerPlugin:
+    """Describe the drawer of a poster type without importing it.
+
+    Other packages register a drawer with an entry point in the group "gpxtrackposter.drawers" referring to a
+    DrawerPlugin, which should be defined in a module that does not import the drawer itself.
+
+    Attributes:
+        name: Poster type, the value of the command line option --type.
+        drawer_class: Drawer class as "module:Class", imported when the poster type is used.
+        description: Short description of the poster type.
+        create_args: Function adding the command line options of the drawer to a parser, or None.
+
+    Methods:
+        load: Import and return the drawer class.
+        add_args: Add the command line options of the drawer to a parser.
+
+    """
+
+    def __init__(
+        self,
+        name: str,
+        drawer_class: str,
+        description: str = "",
+        create_args: Callable[[argparse.ArgumentParser], None] | None = None,
+    ) -> None:
+        """Initialize the plugin.
+
+        Args:
+            name: Poster type.
+            drawer_class: Drawer class as "module:Class".
+            description: Short description of the poster type.
+            create_args: Function adding the command line options of the drawer to a parser.
+
+        """
+        self.name = name
+        self.drawer_class = drawer_class
+        self.description = description
+        self.create_args = create_args
+
+    def load(self) -> type[TracksDrawer]:
+        """Import and return the drawer class.
+
+        Returns:
+            type[TracksDrawer]: Drawer class.
+
+        Raises:
+            PosterError: The drawer class cannot be imported or is not a TracksDrawer.
+
+        """
+        from gpxtrackposter.tracks_drawer import TracksDrawer  # noqa: PLC0415 - imports svgwrite and pint
+
+        module_name, _, class_name = self.drawer_class.partition(":")
+        try:
+            cls = getattr(importlib.import_module(module_name), class_name)
+        except (ImportError, AttributeError) as e:
+            msg = f"Cannot load the drawer of poster type {self.name}: {e}"
+            raise PosterError(msg) from e
+        if not isinstance(cls, type) or not issubclass(cls, TracksDrawer):
+            msg = f"The drawer of poster type {self.name} is not a TracksDrawer: {self.drawer_class}"
+            raise PosterError(msg)
+        return cls
+
+    def add_args(self, args_parser: argparse.ArgumentParser) -> None:
+        """Add the command line options of the drawer to a parser.
+
+        Args:
+            args_parser: Argument parser.
+
+        """
+        if self.create_args is not None:
+            self.create_args(args_parser)
+
+
+BUILTIN_DRAWERS = [
+    DrawerPlugin("grid", "gpxtrackposter.grid_drawer:GridDrawer", "all tracks side by side"),
+    DrawerPlugin("calendar", "gpxtrackposter.calendar_drawer:CalendarDrawer", "one calendar per year"),
+    DrawerPlugin(
+        "heatmap",
+        "gpxtrackposter.heatmap_drawer:HeatmapDrawer",
+        "all tracks on top of each other, optionally on a map",
+        drawer_options.heatmap_args,
+    ),
+    DrawerPlugin(
+        "circular",
+        "gpxtrackposter.circular_drawer:CircularDrawer",
+        "the days of a year on a circle",
+        drawer_options.circular_args,
+    ),
+    DrawerPlugin("github", "gpxtrackposter.github_drawer:GithubDrawer", "a contribution graph per year"),
+]
+
+
+def _entry_point_plugins() -> list[DrawerPlugin]:
+    plugins = []
+    for entry_point in importlib.metadata.entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            plugin = entry_point.load()
+        except Exception:
+            log.exception("Failed to load drawer plugin %s", entry_point.value)
+            continue
+        if not isinstance(plugin, DrawerPlugin):
+            log.warning("Ignoring drawer plugin %s: not a DrawerPlugin", entry_point.value)
+            continue
+        plugins.append(plugin)
+    return plugins
+
+
+@functools.cache
+def drawer_plugins() -> dict[str, DrawerPlugin]:
+    """Return the drawers of all poster types, the built-in ones first.
+
+    Drawers of other packages cannot replace a built-in poster type or a type registered before.
+
+    Returns:
+        dict[str, DrawerPlugin]: Drawer plugins by poster type.
+
+    """
+    plugins = {plugin.name: plugin for plugin in BUILTIN_DRAWERS}
+    for plugin in _entry_point_plugins():
+        if plugin.name in plugins:
+            log.warning("Ignoring drawer plugin for poster type %s: the type already exists", plugin.name)
+            continue
+        plugins[plugin.name] = plugin
+    return plugins
@@ -0,0 +1,129 @@
+"""Skip rendering a poster whose inputs and options did not change"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import hashlib
+import importlib.metadata
+import json
+import locale
+import logging
+from typing import TYPE_CHECKING
+
+from gpxtrackposter import utils
+
+if TYPE_CHECKING:
+    import argparse
+
+log = logging.getLogger("gpxtrackposter")
+
+SIDECAR_SUFFIX = ".fingerprint.json"
+# options that do not change the poster
+IGNORED_OPTIONS = {
+    "clear_cache",
+    "force",
+    "host",
+    "jobs",
+    "logfile",
+    "memory_report",
+    "metrics",
+    "port",
+    "profile",
+    "socket",
+    "timings_json",
+    "trace",
+    "verbose",
+    "watch",
+    "workers",
+}
+
+
+def package_version() -> str:
+    """Return the version of the installed package.
+
+    Returns:
+        str: Version, or "unknown" if the package is not installed.
+
+    """
+    try:
+        return importlib.metadata.version("gpxtrackposter")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def input_fingerprint(args: argparse.Namespace, tracks_hash: str) -> str:
+    """Return a fingerprint of everything a poster depends on.
+
+    Args:
+        args: Command line options.
+        tracks_hash: Hash of the track files, see TrackLoader.fingerprint.
+
+    Returns:
+        str: Hex digest over options, tracks, locale and package version.
+
+    """
+    options = {name: value for name, value in vars(args).items() if name not in IGNORED_OPTIONS}
+    data = [package_version(), locale.setlocale(locale.LC_ALL), tracks_hash, options]
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf8")).hexdigest()
+
+
+def sidecar_file_name(output: str) -> str:
+    """Return the name of the file recording the fingerprint of an output file.
+
+    Args:
+        output: Name of the poster file.
+
+    Returns:
+        str: Name of the sidecar file.
+
+    """
+    return output + SIDECAR_SUFFIX
+
+
+def _file_hash(file_name: str) -> str | None:
+    try:
+        with open(file_name, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def is_up_to_date(output: str, fingerprint: str) -> bool:
+    """Check whether an output file was created from inputs with the given fingerprint and was not modified since.
+
+    Args:
+        output: Name of the poster file.
+        fingerprint: Fingerprint of the current inputs.
+
+    Returns:
+        bool: True if the output does not need to be rendered again.
+
+    """
+    try:
+        with open(sidecar_file_name(output), encoding="utf8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if not isinstance(data, dict) or data.get("fingerprint") != fingerprint:
+        return False
+    output_hash = _file_hash(output)
+    return output_hash is not None and data.get("output") == output_hash
+
+
+def store_fingerprint(output: str, fingerprint: str) -> None:
+    """Record the fingerprint of the inputs of a newly written output file.
+
+    Args:
+        output: Name of the poster file.
+        fingerprint: Fingerprint of the inputs.
+
+    """
+    data = {"fingerprint": fingerprint, "output": _file_hash(output)}
+    try:
+        utils.write_file_atomic(sidecar_file_name(output), json.dumps(data).encode("utf8"))
+    except OSError:
+        log.warning("Failed to store fingerprint of %s", output)
@@ -0,0 +1,163 @@
+"""Cache serialized SVG fragments between runs"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import json
+import logging
+import xml.etree.ElementTree as ET
+from typing import Any
+
+import svgwrite  # type: ignore[import-untyped]
+
+from gpxtrackposter import utils
+
+log = logging.getLogger("gpxtrackposter")
+
+# increase when the structure of cached fragments changes
+FRAGMENT_CACHE_VERSION = 2
+# number of flushes a fragment is kept without being used
+MAX_UNUSED_FLUSHES = 5
+# prefixes svgwrite writes into attribute names, declared on the drawing only
+NAMESPACES = {"xlink": "http://www.w3.org/1999/xlink", "ev": "http://www.w3.org/2001/xml-events"}
+
+
+class FragmentGroup(svgwrite.container.Group):
+    """SVG group restored from a serialized fragment.
+
+    Attributes:
+        fragment: Serialized `<g>` element.
+
+    Methods:
+        get_xml: Return the XML element of the fragment.
+
+    """
+
+    def __init__(self, fragment: str) -> None:
+        """Initialize the FragmentGroup class."""
+        super().__init__()
+        self.fragment: str = fragment
+
+    def get_xml(self) -> ET.Element:
+        """Return the XML element of the fragment.
+
+        Returns:
+            ET.Element: Parsed fragment.
+
+        """
+        declarations = " ".join(f'xmlns:{prefix}="{uri}"' for prefix, uri in NAMESPACES.items())
+        wrapper = ET.fromstring(f"<wrapper {declarations}>{self.fragment}</wrapper>")  # noqa: S314 - written by us
+        element = wrapper[0]
+        # restore prefixed attribute names as svgwrite writes them
+        prefixes = {f"{{{uri}}}": f"{prefix}:" for prefix, uri in NAMESPACES.items()}
+        for child in element.iter():
+            for name in [name for name in child.attrib if name.startswith("{")]:
+                uri, local = name[1:].split("}", 1)
+                child.attrib[prefixes[f"{{{uri}}}"] + local] = child.attrib.pop(name)
+        return element
+
+
+def serialize(element: svgwrite.base.BaseElement) -> str:
+    """Serialize an SVG element for a FragmentCache.
+
+    Args:
+        element: SVG element.
+
+    Returns:
+        str: XML text of the element.
+
+    """
+    return ET.tostring(element.get_xml(), encoding="unicode")
+
+
+class FragmentCache:
+    """Persistent cache of serialized SVG fragments (or other JSON data describing them) by key.
+
+    Keys must cover everything the fragment depends on, e.g. a content hash of the drawn tracks, the
+    style and the precision. Fragments that were not used in the last MAX_UNUSED_FLUSHES flushes are
+    dropped when the cache is stored, so the cache does not grow much beyond the size of one poster.
+
+    Attributes:
+        file_name: JSON file the cache is stored in, or None for an in-memory cache.
+        _fragments: Fragments and number of flushes since their last use by key.
+        _used: Fragments used or added since the last flush by key.
+
+    Methods:
+        get: Return a cached fragment.
+        put: Add a fragment.
+        flush: Store the used fragments.
+
+    """
+
+    def __init__(self, file_name: str | None = None) -> None:
+        """Initialize the FragmentCache class."""
+        self.file_name: str | None = file_name
+        self._fragments: dict[str, tuple[int, Any]] = {}
+        self._used: dict[str, Any] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if self.file_name is None:
+            return
+        try:
+            with open(self.file_name, encoding="utf8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            log.warning("Ignoring broken fragment cache %s", self.file_name)
+            return
+        if not isinstance(data, dict) or data.get("version") != FRAGMENT_CACHE_VERSION:
+            return
+        try:
+            self._fragments = {str(key): (int(age), value) for key, (age, value) in data["fragments"].items()}
+        except (KeyError, TypeError, ValueError, AttributeError):
+            log.warning("Ignoring broken fragment cache %s", self.file_name)
+
+    def get(self, key: str) -> Any:  # noqa: ANN401
+        """Return a cached fragment.
+
+        Args:
+            key: Key of the fragment.
+
+        Returns:
+            Any: Serialized fragment, or None if it is not cached.
+
+        """
+        if key in self._used:
+            return self._used[key]
+        if key not in self._fragments:
+            return None
+        fragment = self._fragments[key][1]
+        self._used[key] = fragment
+        return fragment
+
+    def put(self, key: str, fragment: Any) -> None:  # noqa: ANN401
+        """Add a fragment.
+
+        Args:
+            key: Key of the fragment.
+            fragment: Serialized fragment, must be JSON serializable.
+
+        """
+        self._used[key] = fragment
+
+    def flush(self) -> None:
+        """Store the fragments, forgetting those that were not used for MAX_UNUSED_FLUSHES flushes."""
+        fragments = {key: (0, fragment) for key, fragment in self._used.items()}
+        for key, (age, fragment) in self._fragments.items():
+            if key not in fragments and age + 1 < MAX_UNUSED_FLUSHES:
+                fragments[key] = (age + 1, fragment)
+        changed = bool(fragments) or bool(self._fragments)
+        self._fragments, self._used = fragments, {}
+        if self.file_name is None or not changed:
+            return
+        data = {"version": FRAGMENT_CACHE_VERSION, "fragments": self._fragments}
+        try:
+            utils.write_file_atomic(self.file_name, json.dumps(data).encode("utf8"))
+        except OSError:
+            log.warning("Failed to store fragment cache %s", self.file_name)
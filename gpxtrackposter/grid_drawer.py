@@ -5,27 +5,46 @@
 # Use of this source code is governed by a MIT-style
 # license that can be found in the LICENSE file.
 
+import math
+import os
+import weakref
+
 import svgwrite  # type: ignore[import-untyped]
 
 from gpxtrackposter import utils
 from gpxtrackposter.exceptions import PosterError
+from gpxtrackposter.fragment_cache import FragmentCache, FragmentGroup, serialize
 from gpxtrackposter.poster import Poster
 from gpxtrackposter.track import Track
-from gpxtrackposter.tracks_drawer import TracksDrawer
+from gpxtrackposter.tracks_drawer import TracksDrawer, YearGroup
 from gpxtrackposter.xy import XY
 
 
 class GridDrawer(TracksDrawer):
     """Drawer used to draw a grid poster
 
+    Every track is projected once into the unit square. A cell places it with a translate and scale
+    transform, so a different layout, poster size or padding does not project the tracks again.
+    With a cache directory, the serialized lines of every track are cached between runs by track content and
+    precision.
+
+    Attributes:
+        _unit_lines: Lines of tracks projected into the unit square by track.
+        _fragments: Cache of serialized track lines.
+
     Methods:
         draw: For each track, draw it on the poster.
+        unit_lines: Return the lines of a track projected into the unit square.
 
     """
 
     def __init__(self, the_poster: Poster) -> None:
         """Initialize the GridDrawer class."""
         super().__init__(the_poster)
+        self._unit_lines: weakref.WeakKeyDictionary[Track, list[list[tuple[float, float]]]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._fragments: FragmentCache | None = None
 
     def draw(self, dr: svgwrite.Drawing, g: svgwrite.container.Group, size: XY, offset: XY) -> None:
         """For each track, draw it on the poster.
@@ -49,47 +68,121 @@ class GridDrawer(TracksDrawer):
         spacing_y = 0 if count_y <= 1 else (size.y - cell_size * count_y) / (count_y - 1)
         offset.x += (size.x - count_x * cell_size - (count_x - 1) * spacing_x) / 2
         offset.y += (size.y - count_y * cell_size - (count_y - 1) * spacing_y) / 2
-        year_groups: dict[int, svgwrite.container.Group] = {}
+        scale = 0.9 * cell_size
+        # decimals needed in unit space to keep the poster's precision after scaling
+        precision = max(0, self.poster.coordinate_precision() + math.ceil(math.log10(scale)))
+        line_class = self.poster.styles.class_name(
+            fill="none", stroke_width=utils.format_number(0.5 / scale), stroke_linejoin="round", stroke_linecap="round"
+        )
+        fragments = self._get_fragment_cache() if self.cache_dir else None
+        year_cells: dict[int, list[tuple[Track, XY]]] = {}
         for index, tr in enumerate(self.poster.tracks):
-            year = tr.start_time().year
-            if year not in year_groups:
-                g_year = dr.g(id=f"year{year}")
-                g.add(g_year)
-                year_groups[year] = g_year
-            else:
-                g_year = year_groups[year]
             p = XY(index % count_x, index // count_x) * XY(cell_size + spacing_x, cell_size + spacing_y)
-            self._draw_track(
-                dr,
-                g_year,
-                tr,
-                0.9 * XY(cell_size, cell_size),
-                offset + 0.05 * XY(cell_size, cell_size) + p,
+            year_cells.setdefault(tr.start_time().year, []).append((tr, offset + 0.05 * XY(cell_size, cell_size) + p))
+        groups = [
+            YearGroup(
+                year,
+                [tr for tr, _ in cells],
+                [[cell_offset for _, cell_offset in cells], scale, precision, line_class],
+                "_draw_cells",
+                {
+                    "cells": cells,
+                    "scale": scale,
+                    "precision": precision,
+                    "line_class": line_class,
+                    "fragments": fragments,
+                },
+            )
+            for year, cells in year_cells.items()
+        ]
+        self.draw_year_groups(dr, g, groups)
+        if fragments is not None:
+            fragments.flush()
+
+    def _draw_cells(
+        self,
+        dr: svgwrite.Drawing,
+        g_year: svgwrite.container.Group,
+        cells: list[tuple[Track, XY]],
+        scale: float,
+        precision: int,
+        line_class: str,
+        fragments: FragmentCache | None,
+    ) -> None:
+        for tr, cell_offset in cells:
+            g_cell = dr.g(
+                transform=f"translate({utils.format_number(cell_offset.x)},{utils.format_number(cell_offset.y)}) "
+                f"scale({utils.format_number(scale)})"
             )
+            g_year.add(g_cell)
+            self._draw_track(dr, g_cell, tr, precision, line_class, fragments)
+
+    def _get_fragment_cache(self) -> FragmentCache:
+        assert self.cache_dir is not None
+        file_name = os.path.join(self.cache_dir, "grid_fragments.json")
+        if self._fragments is None or self._fragments.file_name != file_name:
+            self._fragments = FragmentCache(file_name)
+        return self._fragments
+
+    def unit_lines(self, tr: Track) -> list[list[tuple[float, float]]]:
+        """Return the lines of a track projected into the unit square, projecting each track only once.
+
+        Args:
+            tr: track
+
+        Returns:
+            list[list[tuple[float, float]]]: Lines with coordinates between 0 and 1.
+
+        """
+        lines = self._unit_lines.get(tr)
+        if lines is None:
+            lines = utils.project(tr.bbox(), XY(1, 1), XY(0, 0), tr.polylines)
+            self._unit_lines[tr] = lines
+        return lines
+
+    def _draw_track(
+        self,
+        dr: svgwrite.Drawing,
+        g: svgwrite.container.Group,
+        tr: Track,
+        precision: int,
+        line_class: str,
+        fragments: FragmentCache | None,
+    ) -> None:
+        """Draw a single track into a cell group scaling the unit square to the cell.
 
-    def _draw_track(self, dr: svgwrite.Drawing, g: svgwrite.container.Group, tr: Track, size: XY, offset: XY) -> None:
-        """Draw a single track.
+        Color and style are set on the cell group, so the lines only depend on the track and the
+        precision and can be taken from the fragment cache.
 
         Args:
             dr: svg drawing
-            g: svg group
+            g: svg group of the cell
             tr: track
-            size: Size
-            offset: Offset
+            precision: Number of decimals in unit space
+            line_class: CSS class of the track lines
+            fragments: Cache of serialized track lines, None without cache directory
 
         """
         color = self.color(self.poster.length_range, tr.length(), tr.special)
-        str_length = utils.format_float(self.poster.m2u(tr.length()))
+        str_length = self.poster.locale_data.format_float(self.poster.m2u(tr.length()))
 
         date_title = str(tr.start_time().date())
-        for line in utils.project(tr.bbox(), size, offset, tr.polylines):
-            polyline = dr.polyline(
-                points=line,
-                stroke=color,
-                fill="none",
-                stroke_width=0.5,
-                stroke_linejoin="round",
-                stroke_linecap="round",
-            )
-            polyline.set_desc(title=f"{date_title} {str_length} {self.poster.u()}")
-            g.add(polyline)
+        g.set_desc(title=f"{date_title} {str_length} {self.poster.u()}")
+        g["stroke"] = color
+        g["class"] = line_class
+        key = ""
+        fragment = None
+        if fragments is not None:
+            key = f"{tr.polylines_hash()}:{precision}:{'path' if self.poster.svg_paths else 'polyline'}"
+            fragment = fragments.get(key)
+        if fragment is not None:
+            g.add(FragmentGroup(fragment["svg"]))
+            self.count_points(fragment["points"])
+            return
+        g_lines = dr.g()
+        lines = self.unit_lines(tr)
+        for line in lines:
+            g_lines.add(self.polyline(dr, line, precision))
+        if fragments is not None:
+            fragments.put(key, {"svg": serialize(g_lines), "points": sum(len(line) for line in lines)})
+        g.add(g_lines)
@@ -7,11 +7,14 @@
 
 from __future__ import annotations
 
+import base64
+import hashlib
+import io
+import json
 import logging
 import math
 import os
 import sys
-import uuid
 from operator import itemgetter
 from typing import TYPE_CHECKING
 
@@ -20,9 +23,17 @@ import staticmaps  # type: ignore[import-untyped]
 from geopy.distance import distance  # type: ignore[import-untyped]
 from PIL import Image  # type: ignore[import-untyped]
 
-from gpxtrackposter import utils
+from gpxtrackposter import drawer_options, utils
+from gpxtrackposter.density_grid import DensityGrid, density_key
+from gpxtrackposter.drawer_options import (
+    BACKGROUND_FORMATS,
+    DEFAULT_BACKGROUND_QUALITY,
+    DEFAULT_TILE_CACHE_SIZE,
+    DEFAULT_TILE_WORKERS,
+)
 from gpxtrackposter.exceptions import ParameterError, PosterError
-from gpxtrackposter.tracks_drawer import TracksDrawer
+from gpxtrackposter.tile_cache import CachingTileDownloader, TileCache, TileDirectoryProvider
+from gpxtrackposter.tracks_drawer import TracksDrawer, YearGroup
 from gpxtrackposter.xy import XY
 
 if TYPE_CHECKING:
@@ -31,10 +42,33 @@ if TYPE_CHECKING:
     import svgwrite  # type: ignore[import-untyped]
 
     from gpxtrackposter.poster import Poster
+    from gpxtrackposter.track import Track
 
 log = logging.getLogger("gpxtrackposter")
 
 
+def encode_image(image: Image.Image, image_format: str = "png", quality: int = DEFAULT_BACKGROUND_QUALITY) -> bytes:
+    """Encode an image in memory.
+
+    Args:
+        image: Image to encode.
+        image_format: One of the keys of BACKGROUND_FORMATS.
+        quality: Quality of lossy formats (1-100); ignored for PNG.
+
+    Returns:
+        bytes: Encoded image data.
+
+    """
+    buffer = io.BytesIO()
+    if image_format == "png":
+        image.save(buffer, format="PNG", optimize=True)
+    elif image_format == "jpeg":
+        image.convert("RGB").save(buffer, format="JPEG", quality=quality, optimize=True)
+    else:
+        image.save(buffer, format="WEBP", quality=quality)
+    return buffer.getvalue()
+
+
 class HeatmapDrawer(TracksDrawer):
     """Draw a heatmap Poster based on the tracks.
 
@@ -46,6 +80,14 @@ class HeatmapDrawer(TracksDrawer):
         _heatmap_line_width_lower: List of Tuples with line transparency and width for lower border.
         _heatmap_line_width_upper: List of Tuples with line transparency and width for higher border.
         _heatmap_line_width: List of Tuples with line transparency and width.
+        _heatmap_mode: "lines" draws every track as SVG lines, "density" embeds a density image.
+        _heatmap_tone_map: Tone map of the density image, one of drawer_options.TONE_MAPS.
+        _density_cache_dir: Directory used to store density grids.
+        _tile_dir: Local XYZ tile directory used instead of a tile provider.
+        _tile_cache_size: Size limit of the tile cache in MB.
+        _tile_workers: Maximum number of concurrent tile downloads.
+        _bg_format: Image format of the embedded background map, one of BACKGROUND_FORMATS.
+        _bg_quality: Quality of lossy background image formats.
 
     Methods:
         create_args: Create arguments for heatmap.
@@ -66,10 +108,18 @@ class HeatmapDrawer(TracksDrawer):
         self._heatmap_line_width_upper: list[tuple[float, float]] = [(0.02, 0.5), (0.05, 0.2), (1.0, 0.05)]
         self._heatmap_line_width: list[tuple[float, float]] | None = None
         self._heatmap_renderer: str = "pillow"
-        self._tile_provider: staticmaps.TileProvider | None = None
+        self._tile_provider: str | None = None
+        self._tile_dir: str | None = None
+        self._tile_cache_size: int = DEFAULT_TILE_CACHE_SIZE
+        self._tile_workers: int = DEFAULT_TILE_WORKERS
         self._tile_context: staticmaps.Context = staticmaps.Context()
         self._bg_max_size: int = 1200
+        self._bg_format: str = "png"
+        self._bg_quality: int = DEFAULT_BACKGROUND_QUALITY
         self._transformer: staticmaps.Transformer | None = None
+        self._heatmap_mode: str = "lines"
+        self._heatmap_tone_map: str = "log"
+        self._density_cache_dir: str | None = None
 
     def create_args(self, args_parser: argparse.ArgumentParser) -> None:
         """Add arguments to the parser
@@ -78,59 +128,7 @@ class HeatmapDrawer(TracksDrawer):
             args_parser: ArgumentParser
 
         """
-        group = args_parser.add_argument_group("Heatmap Type Options")
-        group.add_argument(
-            "--heatmap-center",
-            dest="heatmap_center",
-            metavar="LAT,LNG",
-            type=str,
-            help="Center of the heatmap (default: automatic).",
-        )
-        group.add_argument(
-            "--heatmap-radius",
-            dest="heatmap_radius",
-            metavar="RADIUS_KM",
-            type=float,
-            help="Scale the heatmap such that at least a circle with radius=RADIUS_KM is visible (default: automatic).",
-        )
-        group.add_argument(
-            "--heatmap-line-transparency-width",
-            dest="heatmap_line_width",
-            metavar="TRANSP_1,WIDTH_1, TRANSP_2,WIDTH_2, TRANSP_3,WIDTH_3",
-            type=str,
-            help="Define three transparency and width tuples for the heatmap lines or set it to "
-            "`automatic` for automatic calculation (default: 0.1,5.0, 0.2,2.0, 1.0,0.3).",
-        )
-        tile_provider = staticmaps.default_tile_providers.keys()
-        group.add_argument(
-            "--heatmap-tile-provider",
-            dest="heatmap_tile_provider",
-            metavar="TILE_PROVIDER",
-            type=str,
-            choices=tile_provider,
-            help="Optionally, choose a tile provider from the list for a background map image: "
-            f"{', '.join(tile_provider)}. (Default: None)",
-        )
-        group.add_argument(
-            "--heatmap-tile-max-size",
-            dest="heatmap_tile_max_size",
-            metavar="PIXEL",
-            type=int,
-            default=1200,
-            help="Set the maximum background image size (which is afterwards scaled to the poster size). "
-            "This setting defines how much details will be shown on the map. "
-            "Be sure to choose a reasonable value! (default: 1200 px)",
-        )
-        bg_renderer = ["pillow", "cairo"]
-        group.add_argument(
-            "--heatmap-tile-renderer",
-            dest="heatmap_renderer",
-            metavar="RENDERER",
-            choices=bg_renderer,
-            default=self._heatmap_renderer,
-            help=f"Choose a renderer for generating the background image, one of {', '.join(bg_renderer)}. "
-            f"(default: {self._heatmap_renderer})",
-        )
+        drawer_options.heatmap_args(args_parser)
 
     def fetch_args(self, args: argparse.Namespace) -> None:
         """Get arguments that were passed, and also perform basic validation on them.
@@ -150,7 +148,26 @@ class HeatmapDrawer(TracksDrawer):
         self._heatmap_line_width = self.validate_heatmap_line_width(args.heatmap_line_width)
 
         if args.heatmap_tile_provider:
+            if args.heatmap_tile_provider not in staticmaps.default_tile_providers:
+                msg = (
+                    f"Not a valid tile provider: {args.heatmap_tile_provider} "
+                    f"(must be one of {', '.join(staticmaps.default_tile_providers)})"
+                )
+                raise ParameterError(msg)
             self._tile_provider = args.heatmap_tile_provider
+        if args.heatmap_tile_dir:
+            if not os.path.isdir(args.heatmap_tile_dir):
+                msg = f"Not a directory: {args.heatmap_tile_dir}"
+                raise ParameterError(msg)
+            self._tile_dir = args.heatmap_tile_dir
+        if args.heatmap_tile_cache_size < 0:
+            msg = f"Not a valid tile cache size: {args.heatmap_tile_cache_size} (must be >= 0)"
+            raise ParameterError(msg)
+        self._tile_cache_size = args.heatmap_tile_cache_size
+        if args.heatmap_tile_workers < 1:
+            msg = f"Not a valid number of tile workers: {args.heatmap_tile_workers} (must be > 0)"
+            raise ParameterError(msg)
+        self._tile_workers = args.heatmap_tile_workers
         if args.heatmap_tile_max_size:
             self._bg_max_size = args.heatmap_tile_max_size
             if args.heatmap_tile_max_size > 4800:
@@ -160,8 +177,16 @@ class HeatmapDrawer(TracksDrawer):
                     "Consider choosing a smaller size!"
                 )
                 log.warning(msg)
-        # set background image renderer
+        # set background image renderer and format
         self._heatmap_renderer = args.heatmap_renderer
+        self._bg_format = args.heatmap_tile_format
+        if not 1 <= args.heatmap_tile_quality <= 100:
+            msg = f"Not a valid image quality: {args.heatmap_tile_quality} (must be between 1 and 100)"
+            raise ParameterError(msg)
+        self._bg_quality = args.heatmap_tile_quality
+        self._heatmap_mode = args.heatmap_mode
+        self._heatmap_tone_map = args.heatmap_tone_map
+        self._density_cache_dir = args.heatmap_density_cache
 
     def get_line_transparencies_and_widths(self, bbox: s2sphere.sphere.LatLngRect) -> list[tuple[float, float]]:
         """Get a list of tuples of line widths and transparencies
@@ -247,30 +272,114 @@ class HeatmapDrawer(TracksDrawer):
             raise PosterError(msg)
         bbox = self._determine_bbox()
         size, offset = self._get_tracks_size_offset(bbox, size, offset)
-        line_transparencies_and_widths = self.get_line_transparencies_and_widths(bbox)
-        year_groups: dict[int, svgwrite.container.Group] = {}
+        if self._heatmap_mode == "density":
+            self._draw_density(dr, g, bbox, size, offset)
+            return
+        line_classes = [
+            self.poster.styles.class_name(
+                stroke_opacity=opacity,
+                fill="none",
+                stroke_width=width,
+                stroke_linejoin="round",
+                stroke_linecap="round",
+            )
+            for opacity, width in self.get_line_transparencies_and_widths(bbox)
+        ]
+        year_tracks: dict[int, list[Track]] = {}
         for tr in self.poster.tracks:
-            year = tr.start_time().year
-            if year not in year_groups:
-                g_year = dr.g(id=f"year{year}")
-                g.add(g_year)
-                year_groups[year] = g_year
-            else:
-                g_year = year_groups[year]
+            year_tracks.setdefault(tr.start_time().year, []).append(tr)
+        bbox_degrees = [bbox.lat_lo().degrees, bbox.lng_lo().degrees, bbox.lat_hi().degrees, bbox.lng_hi().degrees]
+        groups = [
+            YearGroup(
+                year,
+                tracks,
+                [bbox_degrees, size, offset, line_classes],
+                "_draw_tracks",
+                {
+                    "tracks": tracks,
+                    "bbox": bbox,
+                    "size": size,
+                    "offset": offset,
+                    "line_classes": line_classes,
+                },
+            )
+            for year, tracks in year_tracks.items()
+        ]
+        self.draw_year_groups(dr, g, groups)
+
+    def _draw_tracks(
+        self,
+        dr: svgwrite.Drawing,
+        g_year: svgwrite.container.Group,
+        tracks: list[Track],
+        bbox: s2sphere.LatLngRect,
+        size: XY,
+        offset: XY,
+        line_classes: list[str],
+    ) -> None:
+        for tr in tracks:
             color = self.color(self.poster.length_range, tr.length(), tr.special)
             for line in utils.project(bbox, size, offset, tr.polylines):
-                for opacity, width in line_transparencies_and_widths:
-                    g_year.add(
-                        dr.polyline(
-                            points=line,
-                            stroke=color,
-                            stroke_opacity=opacity,
-                            fill="none",
-                            stroke_width=width,
-                            stroke_linejoin="round",
-                            stroke_linecap="round",
-                        )
-                    )
+                for line_class in line_classes:
+                    g_year.add(self.polyline(dr, line, stroke=color, class_=line_class))
+
+    def _draw_density(
+        self, dr: svgwrite.Drawing, g: svgwrite.container.Group, bbox: s2sphere.LatLngRect, size: XY, offset: XY
+    ) -> None:
+        scale = self.poster.dpi / 25.4
+        line_width = max(1, round(scale * min(width for _, width in self.get_line_transparencies_and_widths(bbox))))
+        # special tracks are counted in a second grid, drawn above the other tracks with the special colors
+        layers = [
+            ([tr for tr in self.poster.tracks if not tr.special], "track", "track2"),
+            ([tr for tr in self.poster.tracks if tr.special], "special", "special2"),
+        ]
+        for tracks, color, color2 in layers:
+            if not tracks:
+                continue
+            grid = self._density_grid(tracks, bbox, size, offset, scale, line_width)
+            gradient = utils.color_gradient(self.poster.colors[color], self.poster.colors[color2])
+            img_inl = staticmaps.SvgRenderer.create_inline_image(grid.to_png(gradient, self._heatmap_tone_map))
+            g.add(dr.image(img_inl, insert=offset.tuple(), size=size.tuple()))
+
+    def _density_grid(
+        self, tracks: list[Track], bbox: s2sphere.LatLngRect, size: XY, offset: XY, scale: float, line_width: int
+    ) -> DensityGrid:
+        # the key hashes all track points, so only compute it if the grid can be cached
+        key = density_key(bbox, size, offset, scale, line_width, tracks) if self._density_cache_dir else None
+        grid = self._load_density_grid(key) if key is not None else None
+        if grid is None:
+            grid = DensityGrid(max(1, math.ceil(size.x * scale)), max(1, math.ceil(size.y * scale)))
+            for tr in tracks:
+                lines = utils.project(bbox, size, offset, tr.polylines)
+                grid.add_track(
+                    [[((x - offset.x) * scale, (y - offset.y) * scale) for x, y in line] for line in lines], line_width
+                )
+            if key is not None:
+                self._store_density_grid(key, grid)
+        return grid
+
+    def _load_density_grid(self, key: str) -> DensityGrid | None:
+        if not self._density_cache_dir:
+            return None
+        file_name = os.path.join(self._density_cache_dir, f"{key}.npz")
+        if not os.path.isfile(file_name):
+            return None
+        try:
+            grid = DensityGrid.load(file_name)
+        except (OSError, ValueError, KeyError):
+            log.warning("Failed to load density grid from cache file %s", file_name)
+            return None
+        log.info("Loaded density grid from cache file %s", file_name)
+        return grid
+
+    def _store_density_grid(self, key: str, grid: DensityGrid) -> None:
+        if not self._density_cache_dir:
+            return
+        file_name = os.path.join(self._density_cache_dir, f"{key}.npz")
+        try:
+            grid.save(file_name)
+        except OSError:
+            log.warning("Failed to store density grid to cache file %s", file_name)
 
     def validate_heatmap_center(self, heatmap_center: str | None = None) -> s2sphere.LatLng:
         """Validate and return the Heatmap center.
@@ -375,12 +484,15 @@ class HeatmapDrawer(TracksDrawer):
 
         """
         super().draw_background(dr, g, size, offset)
-        if not self._tile_provider:
+        provider = self._get_tile_provider()
+        if provider is None:
             return
 
         # retrieve static map
         bbox = self._determine_bbox()
-        self._tile_context.set_tile_provider(staticmaps.default_tile_providers[self._tile_provider])
+        self._tile_context.set_tile_provider(provider)
+        downloader = CachingTileDownloader(self._get_tile_cache(provider), self._tile_workers)
+        self._tile_context.set_tile_downloader(downloader)
         self._tile_context.set_center(bbox.get_center())
         # remove padding from poster size to retrieve background image size
         size = size - XY(
@@ -406,9 +518,20 @@ class HeatmapDrawer(TracksDrawer):
             bg_size.y,
             zoom,
             center,
-            staticmaps.default_tile_providers[self._tile_provider].tile_size(),
+            provider.tile_size(),
         )
-
+        key = self._background_key(provider, bbox, bg_size, half_stroke)
+        image_data = self._load_background(key)
+        if image_data is None:
+            downloader.prefetch(provider, self._transformer)
+            image_data = self._render_background(bbox, bg_size)
+            if image_data is None:
+                return
+            self._store_background(key, image_data)
+        img_inl = f"data:{BACKGROUND_FORMATS[self._bg_format]};base64,{base64.b64encode(image_data).decode('utf-8')}"
+        dr.add(dr.image(img_inl, insert=(offset.x, offset.y), size=(size.x, size.y)))
+
+    def _render_background(self, bbox: s2sphere.LatLngRect, bg_size: XY) -> bytes | None:
         # TODO: remove testing code
         from staticmaps.color import BLACK, RED  # type: ignore[import-untyped]
 
@@ -428,9 +551,6 @@ class HeatmapDrawer(TracksDrawer):
         )
 
         try:
-            # generate a unique filename
-            tmp_file = f"{uuid.uuid4()}.png"
-
             # render background image based on command line argument
             if self._heatmap_renderer == "cairo":
                 try:
@@ -441,20 +561,78 @@ class HeatmapDrawer(TracksDrawer):
                         "Please consider choosing 'pillow' as background image renderer instead!"
                     )
                     sys.exit(msg)
-                image = self._tile_context.render_cairo(bg_size.x, bg_size.y)
-                image.write_to_png(tmp_file)
+                surface = self._tile_context.render_cairo(bg_size.x, bg_size.y)
+                buffer = io.BytesIO()
+                surface.write_to_png(buffer)
+                buffer.seek(0)
+                image = Image.open(buffer)
             else:
                 image = self._tile_context.render_pillow(bg_size.x, bg_size.y)
-                image.save(tmp_file)
-            with open(tmp_file, "rb") as f:
-                img_inl = staticmaps.SvgRenderer.create_inline_image(f.read())
-                dr.add(dr.image(img_inl, insert=(offset.x, offset.y), size=(size.x, size.y)))
-            os.remove(tmp_file)
-        except (Image.DecompressionBombError, FileNotFoundError):
+            return encode_image(image, self._bg_format, self._bg_quality)
+        except (Image.DecompressionBombError, OSError):
             log.info("Something went wrong generating the background image!")
+            return None
+
+    def _background_key(
+        self, provider: staticmaps.TileProvider, bbox: s2sphere.LatLngRect, bg_size: XY, half_stroke: int
+    ) -> str:
+        data = [
+            provider.name(),
+            bbox.lo().lat().degrees,
+            bbox.lo().lng().degrees,
+            bbox.hi().lat().degrees,
+            bbox.hi().lng().degrees,
+            bg_size.x,
+            bg_size.y,
+            self._bg_max_size,
+            self._heatmap_renderer,
+            half_stroke,
+            self._bg_format,
+            self._bg_quality,
+        ]
+        return hashlib.sha256(json.dumps(data).encode("utf8")).hexdigest()
+
+    def _background_file_name(self, key: str) -> str | None:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, "backgrounds", f"{key}.{self._bg_format}")
+
+    def _load_background(self, key: str) -> bytes | None:
+        file_name = self._background_file_name(key)
+        if file_name is None or not os.path.isfile(file_name):
+            return None
+        try:
+            with open(file_name, "rb") as f:
+                data = f.read()
+        except OSError:
+            log.warning("Failed to load background image from cache file %s", file_name)
+            return None
+        log.info("Loaded background image from cache file %s", file_name)
+        return data
+
+    def _store_background(self, key: str, data: bytes) -> None:
+        file_name = self._background_file_name(key)
+        if file_name is None:
+            return
+        try:
+            utils.write_file_atomic(file_name, data)
+        except OSError:
+            log.warning("Failed to store background image to cache file %s", file_name)
+
+    def _get_tile_provider(self) -> staticmaps.TileProvider | None:
+        if self._tile_dir:
+            return TileDirectoryProvider(self._tile_dir)
+        if self._tile_provider:
+            return staticmaps.default_tile_providers[self._tile_provider]
+        return None
+
+    def _get_tile_cache(self, provider: staticmaps.TileProvider) -> TileCache | None:
+        if not self.cache_dir or isinstance(provider, TileDirectoryProvider):
+            return None
+        return TileCache(os.path.join(self.cache_dir, "tiles"), self._tile_cache_size * 1024 * 1024)
 
     def _get_tracks_size_offset(self, bbox: s2sphere.LatLngRect, size: XY, offset: XY) -> tuple[XY, XY]:
-        if not self._tile_provider:
+        if not self._tile_provider and not self._tile_dir:
             return size, offset
 
         # background image size
@@ -5,14 +5,142 @@
 # Use of this source code is governed by a MIT-style
 # license that can be found in the LICENSE file.
 
+from __future__ import annotations
+
+import functools
 import locale
+import threading
+
+# serializes the short switches of the process locale in locale_data
+_locale_lock = threading.Lock()
+
+
+class LocaleData:
+    """Names and number format of a locale, captured once so that rendering does not depend on the process locale.
+
+    Attributes:
+        name: Locale name, e.g. "de_DE", or None.
+        day_names: Full names of the weekdays, starting with Monday.
+        month_names: Full names of the months, starting with January.
+        decimal_point: Decimal point of numbers.
+
+    Methods:
+        day_of_week_name: Return the full or short name of a weekday.
+        format_float: Format a float value with one decimal.
+
+    """
+
+    def __init__(self, name: str | None, day_names: list[str], month_names: list[str], decimal_point: str) -> None:
+        """Initialize the LocaleData class."""
+        self.name = name
+        self.day_names = day_names
+        self.month_names = month_names
+        self.decimal_point = decimal_point
+
+    def day_of_week_name(self, day_of_week: int, short: bool) -> str:
+        """Return a localized name for a given weekday
+
+        Args:
+            day_of_week: integer representing the weekday (0-6, 0=Monday)
+            short: if True, return the shortest possible abbreviation (e.g. the first letter)
+
+        Returns:
+            str: full or short localized name of weekday
+
+        """
+        assert 0 <= day_of_week <= 6
+
+        name = self.day_names[day_of_week]
+        if short:
+            # special case for chinese: chinese weekday key number is the third
+            if self.name == "zh_CN":
+                return name[2].upper()
+            return name[0].upper()
+        return name
+
+    def format_float(self, f: float) -> str:
+        """Format a float value to a one digit str, like locale.format_string("%.1f", f).
+
+        Args:
+            f: float value.
+
+        Returns:
+            str: Formatted value.
+
+        """
+        return f"{f:.1f}".replace(".", self.decimal_point)
+
+
+def process_locale_data() -> LocaleData:
+    """Return the names and number format of the current process locale.
+
+    Waits while locale_data switches the process locale in another thread, so that the data is never read
+    from the locale of another language.
+
+    Returns:
+        LocaleData: Locale data.
+
+    """
+    with _locale_lock:
+        return _read_locale_data()
+
+
+def _read_locale_data() -> LocaleData:
+    # the caller holds _locale_lock
+    days = [locale.DAY_2, locale.DAY_3, locale.DAY_4, locale.DAY_5, locale.DAY_6, locale.DAY_7, locale.DAY_1]
+    months = [
+        locale.MON_1,
+        locale.MON_2,
+        locale.MON_3,
+        locale.MON_4,
+        locale.MON_5,
+        locale.MON_6,
+        locale.MON_7,
+        locale.MON_8,
+        locale.MON_9,
+        locale.MON_10,
+        locale.MON_11,
+        locale.MON_12,
+    ]
+    return LocaleData(
+        locale.getlocale()[0],
+        [locale.nl_langinfo(day) for day in days],
+        [locale.nl_langinfo(month) for month in months],
+        str(locale.localeconv()["decimal_point"]),
+    )
+
+
+@functools.cache
+def locale_data(language: str) -> LocaleData:
+    """Return the names and number format of a language.
+
+    The data is read once per language by switching the process locale for a moment; the previous locale is
+    restored afterwards.
+
+    Args:
+        language: Locale name, e.g. "de_DE".
+
+    Returns:
+        LocaleData: Locale data.
+
+    Raises:
+        locale.Error: The locale is not available.
+
+    """
+    with _locale_lock:
+        previous_locale = locale.setlocale(locale.LC_ALL)
+        try:
+            locale.setlocale(locale.LC_ALL, f"{language}.utf8")
+            return _read_locale_data()
+        finally:
+            locale.setlocale(locale.LC_ALL, previous_locale)
 
 
 # day_of_week: 0-6 (0=Monday)
 # If short is False return the full day name, otherwise return the shortest
 # possible abbreviation (e.g. the first letter)
 def localized_day_of_week_name(day_of_week: int, short: bool) -> str:
-    """Return a localized name gor a given weekday
+    """Return a localized name gor a given weekday of the process locale
 
     Args:
         day_of_week: integer representing the weekday (0-6)
@@ -22,24 +150,4 @@ def localized_day_of_week_name(day_of_week: int, short: bool) -> str:
         str: full or short localized name of weekday
 
     """
-    assert 0 <= day_of_week <= 6
-
-    locale_name = locale.getlocale()[0]
-
-    name = locale.nl_langinfo(
-        [
-            locale.DAY_2,
-            locale.DAY_3,
-            locale.DAY_4,
-            locale.DAY_5,
-            locale.DAY_6,
-            locale.DAY_7,
-            locale.DAY_1,
-        ][day_of_week]
-    )
-    if short:
-        # special case for chinese: chinese weekday key number is the third
-        if locale_name == "zh_CN":
-            return name[2].upper()
-        return name[0].upper()
-    return name
+    return process_locale_data().day_of_week_name(day_of_week, short)
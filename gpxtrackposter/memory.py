@@ -0,0 +1,229 @@
+"""Measure the memory used by the phases of a run"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import contextlib
+import itertools
+import os
+import threading
+import tracemalloc
+from typing import TYPE_CHECKING, Any
+
+from gpxtrackposter import metrics
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# number of allocation sites reported after every top level phase
+DEFAULT_TOP = 10
+
+_MB = 1024 * 1024
+
+# allocations of the memory report itself and of imports
+_IGNORED_FILES = {tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>"}
+
+
+class MemoryReport:
+    """Memory used by the phases of a run, measured with tracemalloc and the resident set size (RSS).
+
+    While the report is enabled, every phase (see timings) records the peak of the memory allocated by Python
+    during the phase, the memory still allocated and the RSS at its end. After every top level phase, e.g.
+    loading the tracks, preparing the poster (set tracks), drawing and saving, a tracemalloc snapshot gives
+    the source lines holding the most memory. Allocations are traced in the main process only; worker processes
+    are covered by the peak RSS of the largest worker.
+
+    Attributes:
+        enabled: Whether phases are measured.
+        top: Number of allocation sites reported after every top level phase.
+
+    Methods:
+        enable: Start tracing allocations and measuring phases.
+        disable: Stop tracing allocations.
+        phase: Measure the memory used by a phase.
+        reset: Remove all phases.
+        report: Return the phases as JSON serializable dictionary.
+        table: Return the phases and allocation sites as text table.
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize the MemoryReport class."""
+        self.enabled = False
+        self.top = DEFAULT_TOP
+        self._phases: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def enable(self, top: int = DEFAULT_TOP) -> None:
+        """Start tracing allocations and measuring phases.
+
+        Args:
+            top: Number of allocation sites reported after every top level phase.
+
+        """
+        self.top = top
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop tracing allocations; the measured phases are kept."""
+        self.enabled = False
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def phase(self, path: str) -> Iterator[None]:
+        """Measure the memory used by a phase.
+
+        Args:
+            path: Name of the phase, including the names of the enclosing phases, e.g. "load tracks/parse GPX".
+
+        Yields:
+            None
+
+        """
+        if not self.enabled or not tracemalloc.is_tracing():
+            yield
+            return
+        if not hasattr(self._local, "peaks"):
+            self._local.peaks = []
+        # peak of every enclosing phase so far; tracemalloc has a single peak, which every phase resets
+        peaks: list[int] = self._local.peaks
+        if peaks:
+            peaks[-1] = max(peaks[-1], tracemalloc.get_traced_memory()[1])
+        with self._lock:
+            # phases in the order they started, nested phases below the enclosing phase
+            self._phases.setdefault(path, {"calls": 0, "peak_bytes": 0})
+        tracemalloc.reset_peak()
+        peaks.append(0)
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peaks.pop(), peak)
+            if peaks:
+                peaks[-1] = max(peaks[-1], peak)
+            # the snapshot raises the RSS, so measure it first
+            rss = current_rss()
+            top_allocations = self._top_allocations() if "/" not in path else None
+            with self._lock:
+                entry = self._phases[path]
+                entry["calls"] += 1
+                entry["peak_bytes"] = max(entry["peak_bytes"], peak)
+                entry["traced_bytes"] = current
+                entry["rss_bytes"] = rss
+                if top_allocations is not None:
+                    entry["top_allocations"] = top_allocations
+
+    def _top_allocations(self) -> list[dict[str, Any]]:
+        # filtering the statistics is much faster than filtering the traces of the snapshot
+        statistics = (
+            stat
+            for stat in tracemalloc.take_snapshot().statistics("lineno")
+            if stat.traceback[0].filename not in _IGNORED_FILES
+        )
+        return [
+            {
+                "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "bytes": stat.size,
+                "count": stat.count,
+            }
+            for stat in itertools.islice(statistics, self.top)
+        ]
+
+    def reset(self) -> None:
+        """Remove all phases."""
+        with self._lock:
+            self._phases.clear()
+
+    def report(self) -> dict[str, Any]:
+        """Return the phases as JSON serializable dictionary.
+
+        Returns:
+            dict[str, Any]: Peak RSS of the main process and of the largest worker process, and for every phase
+                the number of calls, the peak of the traced memory, the traced memory and the RSS at its end, and
+                for top level phases the allocation sites holding the most memory at its end.
+
+        """
+        with self._lock:
+            phases = [{"name": path, **entry} for path, entry in self._phases.items() if entry["calls"]]
+        return {"peak_rss_bytes": metrics.peak_rss(), "phases": phases}
+
+    def table(self) -> str:
+        """Return the phases as text table, followed by the allocation sites of the top level phases.
+
+        Returns:
+            str: Table with the peak and traced memory and the RSS of every phase in MB.
+
+        """
+        report = self.report()
+        lines = [f"{'Phase':<40} {'Peak MB':>9} {'Traced MB':>10} {'RSS MB':>9}"]
+        for p in report["phases"]:
+            *parents, name = p["name"].split("/")
+            rss = f"{p['rss_bytes'] / _MB:>9.1f}" if p["rss_bytes"] is not None else f"{'-':>9}"
+            lines.append(
+                f"{'  ' * len(parents) + name:<40} {p['peak_bytes'] / _MB:>9.1f} {p['traced_bytes'] / _MB:>10.1f} {rss}"
+            )
+        for process, rss_bytes in report["peak_rss_bytes"].items():
+            lines.append(f"peak RSS {process:<31} {rss_bytes / _MB:>9.1f}")
+        for p in report["phases"]:
+            if p.get("top_allocations"):
+                lines.append(f"Largest allocations after {p['name']}:")
+                lines.extend(
+                    f"  {a['bytes'] / _MB:>9.1f} MB {a['count']:>9} blocks  {a['site']}" for a in p["top_allocations"]
+                )
+        return "\n".join(lines)
+
+
+def current_rss() -> int | None:
+    """Return the current resident set size of the process.
+
+    Returns:
+        int | None: Bytes, None if not available, e.g. on systems without /proc.
+
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def stop_in_worker() -> None:
+    """Stop tracing allocations in a forked worker process, whose memory is not part of the report."""
+    _report.enabled = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+_report = MemoryReport()
+
+
+def report() -> MemoryReport:
+    """Return the memory report of the current run.
+
+    Returns:
+        MemoryReport: Memory report.
+
+    """
+    return _report
+
+
+def phase(path: str) -> contextlib.AbstractContextManager[None]:
+    """Measure the memory used by a phase of the current run.
+
+    Args:
+        path: Name of the phase, including the names of the enclosing phases.
+
+    Returns:
+        contextlib.AbstractContextManager[None]: Context manager.
+
+    """
+    return _report.phase(path)
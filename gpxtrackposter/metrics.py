@@ -0,0 +1,255 @@
+"""Count the work of a run and export it for monitoring"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from typing import Any
+
+from gpxtrackposter import utils
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None  # type: ignore[assignment]
+
+# prefix of the metric names in Prometheus textfiles
+PREFIX = "gpxtrackposter_"
+
+# type, help text and label name of every metric
+DEFINITIONS: dict[str, tuple[str, str, str | None]] = {
+    "files_scanned_total": ("counter", "GPX files found in the GPX directory.", None),
+    "cache_hits_total": ("counter", "Tracks loaded from the track cache.", None),
+    "cache_misses_total": ("counter", "Tracks not found in the track cache.", None),
+    "points_parsed_total": ("counter", "Track points read from GPX files.", None),
+    "points_simplified_total": ("counter", "Track points kept after simplifying the GPX tracks.", None),
+    "points_drawn_total": ("counter", "Track points drawn as lines, including lines taken from caches.", None),
+    "svg_elements_total": ("counter", "SVG elements of the drawn posters.", None),
+    "bytes_written_total": ("counter", "Bytes of the written posters.", None),
+    "peak_rss_bytes": ("gauge", "Peak resident set size of the main process and of the largest worker.", "process"),
+    "phase_seconds": ("gauge", "Seconds spent in a phase of the run.", "phase"),
+    "run_seconds": ("gauge", "Seconds of the run.", None),
+    "last_run_timestamp_seconds": ("gauge", "Unix time of the end of the run.", None),
+}
+
+
+class Metrics:
+    """Registry of the counters and gauges of a run, see DEFINITIONS.
+
+    Worker processes count in their own registry and return their counts to the main process, which adds
+    them with merge.
+
+    Methods:
+        inc: Increase a counter.
+        set: Set a gauge.
+        value: Return the value of a metric.
+        collect: Return and remove the values, e.g. to send them from a worker to the main process.
+        merge: Add values of another process.
+        reset: Remove all values.
+        write: Write the values as Prometheus textfile or append them to a JSON lines file.
+        prometheus: Return the values in the Prometheus text format.
+        json: Return the values as JSON serializable dictionary.
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize the Metrics class."""
+        self._values: dict[tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, label: str = "") -> None:
+        """Increase a counter.
+
+        Args:
+            name: Name of the metric, see DEFINITIONS.
+            value: Amount to add.
+            label: Value of the label of the metric, if it has one.
+
+        """
+        _check_name(name)
+        with self._lock:
+            self._values[name, label] = self._values.get((name, label), 0) + value
+
+    def set(self, name: str, value: float, label: str = "") -> None:
+        """Set a gauge.
+
+        Args:
+            name: Name of the metric, see DEFINITIONS.
+            value: New value.
+            label: Value of the label of the metric, if it has one.
+
+        """
+        _check_name(name)
+        with self._lock:
+            self._values[name, label] = value
+
+    def value(self, name: str, label: str = "") -> float:
+        """Return the value of a metric.
+
+        Args:
+            name: Name of the metric, see DEFINITIONS.
+            label: Value of the label of the metric, if it has one.
+
+        Returns:
+            float: Value, 0 if nothing was counted.
+
+        """
+        with self._lock:
+            return self._values.get((name, label), 0)
+
+    def collect(self) -> list[tuple[str, str, float]]:
+        """Return and remove the values, e.g. to send them from a worker to the main process.
+
+        Returns:
+            list[tuple[str, str, float]]: Name, label and value of every metric.
+
+        """
+        with self._lock:
+            values, self._values = self._values, {}
+        return [(name, label, value) for (name, label), value in values.items()]
+
+    def merge(self, values: list[tuple[str, str, float]]) -> None:
+        """Add the counters of another process.
+
+        Args:
+            values: Name, label and value of every metric, see collect.
+
+        """
+        for name, label, value in values:
+            self.inc(name, value, label)
+
+    def reset(self) -> None:
+        """Remove all values."""
+        with self._lock:
+            self._values.clear()
+
+    def write(self, file_name: str) -> None:
+        """Write the values as Prometheus textfile or append them as one line to a JSON lines file.
+
+        Files ending with ".prom" are written as Prometheus textfile, e.g. for the textfile collector of the
+        node exporter, all other files as JSON lines. The textfile is replaced atomically, so that a collector
+        never reads a partly written file.
+
+        Args:
+            file_name: Name of the metrics file, e.g. "gpxtrackposter.prom" or "metrics.jsonl".
+
+        """
+        if file_name.endswith(".prom"):
+            utils.write_file_atomic(file_name, self.prometheus().encode("utf8"))
+        else:
+            with open(file_name, "a", encoding="utf8") as f:
+                f.write(json.dumps(self.json()) + "\n")
+
+    def prometheus(self) -> str:
+        """Return the values in the Prometheus text format.
+
+        Returns:
+            str: Lines with the help text, type and values of every metric, names prefixed with PREFIX.
+
+        """
+        lines = []
+        for name, samples in self._samples().items():
+            metric_type, help_text, label_name = DEFINITIONS[name]
+            lines.append(f"# HELP {PREFIX}{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}{name} {metric_type}")
+            for label, value in sorted(samples.items()):
+                labels = f'{{{label_name}="{_escape(label)}"}}' if label_name else ""
+                lines.append(f"{PREFIX}{name}{labels} {float(value)!r}")
+        return "\n".join(lines) + "\n"
+
+    def json(self) -> dict[str, Any]:
+        """Return the values as JSON serializable dictionary.
+
+        Returns:
+            dict[str, Any]: Value of every metric, by label for metrics with label.
+
+        """
+        return {name: samples if DEFINITIONS[name][2] else samples[""] for name, samples in self._samples().items()}
+
+    def _samples(self) -> dict[str, dict[str, float]]:
+        # values by label of every metric in the order of DEFINITIONS; counters without label are always
+        # included, so that every run exports the same series
+        with self._lock:
+            values = dict(self._values)
+        samples: dict[str, dict[str, float]] = {}
+        for name, (metric_type, _, label_name) in DEFINITIONS.items():
+            metric_samples = {label: value for (n, label), value in values.items() if n == name}
+            if not metric_samples and metric_type == "counter" and label_name is None:
+                metric_samples = {"": 0}
+            if metric_samples:
+                samples[name] = metric_samples
+        return samples
+
+
+def _check_name(name: str) -> None:
+    if name not in DEFINITIONS:
+        msg = f"Unknown metric: {name}"
+        raise KeyError(msg)
+
+
+def _escape(label: str) -> str:
+    return label.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def peak_rss() -> dict[str, int]:
+    """Return the peak resident set size of the main process and of the largest worker process.
+
+    Returns:
+        dict[str, int]: Bytes by "main" and "workers"; empty if the resource module is not available.
+
+    """
+    if resource is None:
+        return {}
+    # Linux reports kilobytes, macOS bytes
+    scale = 1 if sys.platform == "darwin" else 1024
+    return {
+        "main": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+        "workers": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale,
+    }
+
+
+_metrics = Metrics()
+
+
+def metrics() -> Metrics:
+    """Return the metrics registry of the current process.
+
+    Returns:
+        Metrics: Metrics registry.
+
+    """
+    return _metrics
+
+
+def inc(name: str, value: float = 1, label: str = "") -> None:
+    """Increase a counter of the metrics registry of the current process.
+
+    Args:
+        name: Name of the metric, see DEFINITIONS.
+        value: Amount to add.
+        label: Value of the label of the metric, if it has one.
+
+    """
+    _metrics.inc(name, value, label)
+
+
+def finish_run(report: dict[str, Any]) -> None:
+    """Set the gauges of the end of a run: phase seconds, peak memory and time.
+
+    Args:
+        report: Timings of the run, see Timings.report.
+
+    """
+    _metrics.set("run_seconds", report["total_seconds"])
+    for p in report["phases"]:
+        _metrics.set("phase_seconds", p["seconds"], p["name"])
+    for process, rss in peak_rss().items():
+        _metrics.set("peak_rss_bytes", rss, process)
+    _metrics.set("last_run_timestamp_seconds", time.time())
@@ -8,17 +8,24 @@
 from __future__ import annotations
 
 import gettext
+import io
 import locale
 import logging
+import os
 from collections import defaultdict
-from typing import TYPE_CHECKING, Any
+from typing import IO, TYPE_CHECKING, Any
 
 import pint  # type: ignore[import-untyped]
 import svgwrite  # type: ignore[import-untyped]
 
+from gpxtrackposter import metrics, timings
+from gpxtrackposter.exceptions import ParameterError
+from gpxtrackposter.fragment_cache import FragmentGroup
+from gpxtrackposter.localization import LocaleData, locale_data, process_locale_data
 from gpxtrackposter.quantity_range import QuantityRange
+from gpxtrackposter.style_sheet import StyleSheet
 from gpxtrackposter.units import Units
-from gpxtrackposter.utils import format_float
+from gpxtrackposter.utils import DEFAULT_DPI, default_precision
 from gpxtrackposter.xy import XY
 from gpxtrackposter.year_range import YearRange
 
@@ -34,6 +41,9 @@ if TYPE_CHECKING:
 
 log = logging.getLogger("gpxtrackposter")
 
+# output formats of Poster.draw
+IMAGE_FORMATS = ["svg", "png"]
+
 
 class Poster:
     """Create a poster from track data.
@@ -53,14 +63,21 @@ class Poster:
         tracks_drawer: drawer used to draw the poster.
         with_animation: poster with animation or not.
         animation_time: animation time.
+        dpi: Print resolution used to derive the default coordinate precision and the PNG output size.
+        precision: Number of decimals of output coordinates (None: derived from dpi).
+        svg_paths: Emit track lines as relative path data instead of polylines.
+        styles: CSS classes for recurring style combinations of the drawn elements.
+        locale_data: Names and number format of the poster's language, independent of the process locale.
 
     Methods:
         set_language: set language for the poster.
         translate: translate string to language.
         set_tracks: Associate the Poster with a set of tracks.
-        draw: Draw the tracks on the poster.
+        draw: Draw the tracks on the poster and write it.
+        create_drawing: Draw the tracks on the poster.
         m2u: Convert meters to kilometers or miles based on units.
         u: Return distance unit (km or mi).
+        coordinate_precision: Return the number of decimals of output coordinates.
 
     """
 
@@ -88,8 +105,13 @@ class Poster:
         self.years: YearRange = YearRange()
         self.tracks_drawer: TracksDrawer | None = None
         self._trans: Callable[[str], str] | None = None
+        self.locale_data: LocaleData = process_locale_data()
         self.with_animation: bool = False
         self.animation_time: int = 30
+        self.dpi: int = DEFAULT_DPI
+        self.precision: int | None = None
+        self.svg_paths: bool = False
+        self.styles: StyleSheet = StyleSheet()
         self.set_language(None, None)
 
     def set_language(self, language: str | None, localedir: str | None) -> None:
@@ -100,9 +122,10 @@ class Poster:
             localedir: directory for locale files
 
         """
+        self.locale_data = process_locale_data()
         if language:
             try:
-                locale.setlocale(locale.LC_ALL, f"{language}.utf8")
+                self.locale_data = locale_data(language)
             except locale.Error as e:
                 log.warning("Unable to set the locale to %s (%s)", language, str(e))
                 language = None
@@ -197,6 +220,18 @@ class Poster:
         """
         self.animation_time = animation_time
 
+    def coordinate_precision(self) -> int:
+        """Return the number of decimals used for output coordinates.
+
+        Returns:
+            int: The explicitly set precision, or one derived from the print resolution.
+
+        """
+        if self.precision is not None:
+            return self.precision
+        return default_precision(self.dpi)
+
+    @timings.timed("set tracks")
     def set_tracks(self, tracks: list[Track]) -> None:
         """Associate the set of tracks with this poster.
 
@@ -226,16 +261,56 @@ class Poster:
             length = pint.Quantity(sum(t.length() for t in date_tracks))
             self.length_range_by_date.extend(length)
 
-    def draw(self, drawer: TracksDrawer, output: str) -> None:
+    def draw(self, drawer: TracksDrawer, output: str | IO[bytes], image_format: str | None = None) -> None:
+        """Set the Poster's drawer, draw the tracks and write the poster.
+
+        The poster is written as SVG or rendered to a PNG image with the poster's dpi. Nothing but the output
+        and the caches of the drawer is written, so a binary file object keeps the poster in memory.
+
+        Args:
+            drawer: The drawer type of the poster.
+            output: The output name of the poster, or a binary file object.
+            image_format: "svg" or "png"; None uses PNG if the output name ends with ".png", otherwise SVG.
+
+        """
+        if image_format is None:
+            image_format = "png" if isinstance(output, str) and output.lower().endswith(".png") else "svg"
+        if image_format not in IMAGE_FORMATS:
+            msg = f"Not a valid image format: {image_format} (must be one of {', '.join(IMAGE_FORMATS)})"
+            raise ParameterError(msg)
+        d = self.create_drawing(drawer)
+        metrics.inc("svg_elements_total", _count_elements(d))
+        start = None if isinstance(output, str) or not output.seekable() else output.tell()
+        with timings.phase("save"):
+            if image_format == "png":
+                from gpxtrackposter.raster_renderer import RasterRenderer
+
+                RasterRenderer(self.dpi).save(d, output)
+            elif isinstance(output, str):
+                d.saveas(output)
+            else:
+                text = io.StringIO()
+                d.write(text)
+                output.write(text.getvalue().encode("utf-8"))
+        if isinstance(output, str):
+            if os.path.isfile(output):
+                metrics.inc("bytes_written_total", os.path.getsize(output))
+        elif start is not None:
+            metrics.inc("bytes_written_total", output.tell() - start)
+
+    def create_drawing(self, drawer: TracksDrawer) -> svgwrite.Drawing:
         """Set the Poster's drawer and draw the tracks.
 
         Args:
             drawer: The drawer type of the poster.
-            output: The output name of the poster.
+
+        Returns:
+            svgwrite.Drawing: The drawn poster.
 
         """
         self.tracks_drawer = drawer
-        d = svgwrite.Drawing(output, (f"{self.width}mm", f"{self.height}mm"))
+        self.styles.clear()
+        d = svgwrite.Drawing(size=(f"{self.width}mm", f"{self.height}mm"))
         d.viewbox(width=self.width, height=self.height)
         d.add(d.rect((0, 0), (self.width, self.height), fill=self.colors["background"]))
         self._draw_background(d, XY(self.width, self.height), XY(0.0, 0.0))
@@ -246,7 +321,9 @@ class Poster:
             XY(self.width - self.padding["l"] - self.padding["r"], self.height - self.padding["t"] - self.padding["b"]),
             XY(self.padding["l"], self.padding["t"]),
         )
-        d.save()
+        if not self.styles.is_empty():
+            d.defs.add(d.style(self.styles.css()))
+        return d
 
     def m2u(self, m: pint.Quantity) -> float:
         """Convert meters to kilometers or miles, according to units.
@@ -283,7 +360,7 @@ class Poster:
             str: Formatted distance.
 
         """
-        return format_float(self.m2u(d)) + " " + self.u()
+        return self.locale_data.format_float(self.m2u(d)) + " " + self.u()
 
     def _draw_tracks(self, d: svgwrite.Drawing, size: XY, offset: XY) -> None:
         assert self.tracks_drawer
@@ -291,7 +368,9 @@ class Poster:
         g = d.g(id="tracks")
         d.add(g)
 
-        self.tracks_drawer.draw(d, g, size, offset)
+        with timings.phase("draw"):
+            self.tracks_drawer.draw(d, g, size, offset)
+            self.tracks_drawer.flush_year_groups()
 
     def _draw_background(self, d: svgwrite.Drawing, size: XY, offset: XY) -> None:
         assert self.tracks_drawer
@@ -299,25 +378,27 @@ class Poster:
         g = d.g(id="background")
         d.add(g)
 
-        self.tracks_drawer.draw_background(d, g, size, offset)
+        with timings.phase("draw background"):
+            self.tracks_drawer.draw_background(d, g, size, offset)
 
     def _draw_header(self, d: svgwrite.Drawing) -> None:
         g = d.g(id="header")
         d.add(g)
 
-        text_color = self.colors["text"]
-        title_style = "font-size:12px; font-family:Arial; font-weight:bold;"
+        title_class = self.styles.class_name(
+            style="font-size:12px; font-family:Arial; font-weight:bold;", fill=self.colors["text"]
+        )
         assert self._title is not None
-        g.add(d.text(self._title, insert=(10, 20), fill=text_color, style=title_style))
+        g.add(d.text(self._title, insert=(10, 20), class_=title_class))
 
     def _draw_footer(self, d: svgwrite.Drawing) -> None:
         g = d.g(id="footer")
         d.add(g)
 
         text_color = self.colors["text"]
-        header_style = "font-size:4px; font-family:Arial"
-        value_style = "font-size:9px; font-family:Arial"
-        small_value_style = "font-size:3px; font-family:Arial"
+        header_class = self.styles.class_name(style="font-size:4px; font-family:Arial", fill=text_color)
+        value_class = self.styles.class_name(style="font-size:9px; font-family:Arial", fill=text_color)
+        small_value_class = self.styles.class_name(style="font-size:3px; font-family:Arial", fill=text_color)
 
         (
             total_length,
@@ -330,57 +411,50 @@ class Poster:
             d.text(
                 self.translate("ATHLETE"),
                 insert=(10, self.height - 20),
-                fill=text_color,
-                style=header_style,
+                class_=header_class,
             )
         )
         g.add(
             d.text(
                 self._athlete,
                 insert=(10, self.height - 10),
-                fill=text_color,
-                style=value_style,
+                class_=value_class,
             )
         )
         g.add(
             d.text(
                 self.translate("STATISTICS"),
                 insert=(120, self.height - 20),
-                fill=text_color,
-                style=header_style,
+                class_=header_class,
             )
         )
         g.add(
             d.text(
                 self.translate("Number") + f": {len(self.tracks)}",
                 insert=(120, self.height - 15),
-                fill=text_color,
-                style=small_value_style,
+                class_=small_value_class,
             )
         )
         weekly = len(self.tracks) / weeks if weeks else 0.0
         g.add(
             d.text(
-                self.translate("Weekly") + ": " + format_float(weekly),
+                self.translate("Weekly") + ": " + self.locale_data.format_float(weekly),
                 insert=(120, self.height - 10),
-                fill=text_color,
-                style=small_value_style,
+                class_=small_value_class,
             )
         )
         g.add(
             d.text(
                 self.translate("Total") + ": " + self.format_distance(total_length),
                 insert=(141, self.height - 15),
-                fill=text_color,
-                style=small_value_style,
+                class_=small_value_class,
             )
         )
         g.add(
             d.text(
                 self.translate("Avg") + ": " + self.format_distance(average_length),
                 insert=(141, self.height - 10),
-                fill=text_color,
-                style=small_value_style,
+                class_=small_value_class,
             )
         )
         if length_range.is_valid():
@@ -395,16 +469,14 @@ class Poster:
             d.text(
                 self.translate("Min") + ": " + self.format_distance(min_length),
                 insert=(167, self.height - 15),
-                fill=text_color,
-                style=small_value_style,
+                class_=small_value_class,
             )
         )
         g.add(
             d.text(
                 self.translate("Max") + ": " + self.format_distance(max_length),
                 insert=(167, self.height - 10),
-                fill=text_color,
-                style=small_value_style,
+                class_=small_value_class,
             )
         )
 
@@ -433,3 +505,10 @@ class Poster:
         self.years.clear()
         for t in tracks:
             self.years.add(t.start_time())
+
+
+def _count_elements(element: svgwrite.base.BaseElement) -> int:
+    # restored fragments are serialized XML: count their start tags
+    if isinstance(element, FragmentGroup):
+        return element.fragment.count("<") - element.fragment.count("</")
+    return 1 + sum(_count_elements(child) for child in getattr(element, "elements", []))
@@ -0,0 +1,188 @@
+"""Render posters independently of each other, e.g. in several threads of one process"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import io
+import logging
+from typing import IO, TYPE_CHECKING, Any
+
+from gpxtrackposter import drawer_registry
+from gpxtrackposter.exceptions import ParameterError
+from gpxtrackposter.poster import Poster
+from gpxtrackposter.track_loader import TrackLoader
+from gpxtrackposter.units import Units
+
+if TYPE_CHECKING:
+    import argparse
+
+    from gpxtrackposter.track import Track
+    from gpxtrackposter.tracks_drawer import TracksDrawer
+
+log = logging.getLogger("gpxtrackposter")
+
+
+class PosterJob:
+    """Render a poster with its own poster, drawer, translations and locale data.
+
+    Jobs share no state and do not change the process locale, so several jobs can render concurrently in
+    threads of one process.
+
+    Attributes:
+        args: Options of the poster, named like the command line options.
+        poster: Poster of the job.
+        drawer: Drawer of the poster type, with the options already fetched.
+
+    Methods:
+        from_options: Create a job from a dictionary of options.
+        select_tracks: Select the tracks of the poster from unfiltered tracks.
+        render: Render the poster of the tracks.
+        render_bytes: Render the poster of the tracks in memory.
+
+    """
+
+    def __init__(self, args: argparse.Namespace, cache_dir: str | None = None) -> None:
+        """Create the poster and the drawer and check the drawer options.
+
+        Args:
+            args: Options of the poster, as returned by the command line parser.
+            cache_dir: Directory the drawer may store cached data in, or None.
+
+        Raises:
+            ParameterError: An option of the drawer is not valid.
+
+        """
+        self.args = args
+        self.poster = Poster()
+        self.drawer: TracksDrawer = drawer_registry.drawer_plugins()[args.type].load()(self.poster)
+        self.drawer.fetch_args(args)
+        if cache_dir:
+            self.drawer.set_cache_dir(cache_dir)
+        self.drawer.set_workers(args.workers)
+
+    @classmethod
+    def from_options(cls, options: dict[str, Any], cache_dir: str | None = None) -> PosterJob:
+        """Create a job from options named like the long command line options, see batch.job_arguments.
+
+        Args:
+            options: Options differing from the defaults, e.g. {"type": "circular", "year": "2020"}.
+            cache_dir: Directory the drawer may store cached data in, or None.
+
+        Returns:
+            PosterJob: Job.
+
+        Raises:
+            ParameterError: An option is unknown or not valid.
+
+        """
+        # the parser is defined by the command line interface, which imports this module
+        from gpxtrackposter import batch, cli  # noqa: PLC0415
+
+        args_parser = cli.create_parser()
+        cli.add_drawer_args(args_parser)
+        return cls(batch.job_arguments(args_parser, args_parser.parse_args([]), options), cache_dir)
+
+    def select_tracks(self, tracks: list[Track]) -> list[Track]:
+        """Select the tracks of the poster by year, length and activity and mark the special tracks.
+
+        Args:
+            tracks: Tracks loaded without filters.
+
+        Returns:
+            list[Track]: Selected tracks.
+
+        """
+        loader = TrackLoader(1)
+        setup_track_filters(loader, self.args)
+        return loader.select_tracks(tracks)
+
+    def render(
+        self, tracks: list[Track], output: str | IO[bytes] | None = None, image_format: str | None = None
+    ) -> Poster:
+        """Render the poster of the tracks.
+
+        Args:
+            tracks: Tracks of the poster, see select_tracks.
+            output: Name of the output file or a binary file object, or None for the output option.
+            image_format: "svg" or "png"; None derives the format from the output name, see Poster.draw.
+
+        Returns:
+            Poster: The drawn poster.
+
+        """
+        setup_poster(tracks, self.args, self.poster)
+        self.poster.draw(self.drawer, self.args.output if output is None else output, image_format)
+        return self.poster
+
+    def render_bytes(self, tracks: list[Track], image_format: str = "svg") -> bytes:
+        """Render the poster of the tracks in memory.
+
+        Only the caches of the drawer are written to disk.
+
+        Args:
+            tracks: Tracks of the poster, see select_tracks.
+            image_format: "svg" or "png".
+
+        Returns:
+            bytes: The poster as SVG or PNG image.
+
+        """
+        buffer = io.BytesIO()
+        self.render(tracks, buffer, image_format)
+        return buffer.getvalue()
+
+
+def setup_track_filters(loader: TrackLoader, args: argparse.Namespace) -> None:
+    """Set up the year, length and activity filters and the special tracks of a loader"""
+    if not loader.year_range.parse(args.year):
+        msg = f"Bad year range: {args.year}."
+        raise ParameterError(msg)
+
+    loader.special_file_names = args.special
+    loader.set_min_length(args.min_distance * Units().km)
+    loader.set_activity(args.activity_type)
+
+
+def setup_poster(tracks: list[Track], args: argparse.Namespace, p: Poster | None = None) -> Poster:
+    """Set up the poster"""
+    if p is None:
+        p = Poster()
+    msg = f"Creating poster of type {args.type} with {len(tracks)} tracks and storing it in file {args.output}..."
+    log.info(msg)
+    p.set_language(args.language, args.localedir)
+    p.set_athlete(args.athlete)
+    p.set_title(args.title or p.translate("MY TRACKS"))
+    p.set_with_animation(args.with_animation)
+    p.set_animation_time(args.animation_time)
+    if args.precision is not None and args.precision < 0:
+        msg = f"Not a valid precision: {args.precision} (must be >= 0)"
+        raise ParameterError(msg)
+    if args.dpi <= 0:
+        msg = f"Not a valid DPI value: {args.dpi} (must be > 0)"
+        raise ParameterError(msg)
+    p.dpi = args.dpi
+    p.precision = args.precision
+    p.svg_paths = args.svg_paths
+
+    p.special_distance = {
+        "special_distance": args.special_distance * Units().km,
+        "special_distance2": args.special_distance2 * Units().km,
+    }
+
+    p.colors = {
+        "background": args.background_color,
+        "track": args.track_color,
+        "track2": args.track_color2 or args.track_color,
+        "special": args.special_color,
+        "special2": args.special_color2 or args.special_color,
+        "text": args.text_color,
+    }
+    p.units = args.units
+    p.set_tracks(tracks)
+    if args.type == "github":
+        p.height = 55 + p.years.count() * 43
+    return p
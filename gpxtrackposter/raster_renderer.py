@@ -0,0 +1,533 @@
+"""Render a poster drawing to a raster image without external converters."""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import base64
+import contextlib
+import functools
+import io
+import logging
+import math
+import re
+from itertools import pairwise
+from typing import IO, TYPE_CHECKING
+
+from PIL import Image, ImageColor, ImageDraw, ImageFont  # type: ignore[import-untyped]
+
+from gpxtrackposter.utils import DEFAULT_DPI
+
+if TYPE_CHECKING:
+    import xml.etree.ElementTree as ET
+
+    import svgwrite  # type: ignore[import-untyped]
+
+log = logging.getLogger("gpxtrackposter")
+
+# properties that are passed on from a group to its children
+_INHERITED_PROPERTIES = (
+    "fill",
+    "stroke",
+    "stroke-width",
+    "stroke-opacity",
+    "fill-opacity",
+    "font-size",
+    "font-family",
+    "font-weight",
+    "text-anchor",
+    "alignment-baseline",
+    "dominant-baseline",
+    "stroke-linecap",
+)
+_STYLE_ATTRIBUTES = (*_INHERITED_PROPERTIES, "opacity")
+_PATH_TOKEN = re.compile(r"[MmLlHhVvAaZz]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_CSS_RULE = re.compile(r"\.([\w-]+)\s*\{([^}]*)\}")
+_TRANSFORM = re.compile(r"(matrix|translate|scale|rotate)\s*\(([^)]*)\)")
+
+Point = tuple[float, float]
+Matrix = tuple[float, float, float, float, float, float]
+IDENTITY: Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+def parse_style(style: str) -> dict[str, str]:
+    """Parse an inline style or CSS declaration block into a dict.
+
+    Args:
+        style: Declarations, e.g. "font-size:4px; font-family:Arial".
+
+    Returns:
+        dict[str, str]: Property values by name.
+
+    """
+    properties = {}
+    for declaration in style.split(";"):
+        if ":" in declaration:
+            name, value = declaration.split(":", 1)
+            properties[name.strip()] = value.strip()
+    return properties
+
+
+def parse_length(value: str | None, default: float = 0.0) -> float:
+    """Parse an SVG length, ignoring its unit.
+
+    Args:
+        value: Length, e.g. "12px" or "200mm".
+        default: Value to return if the length is missing.
+
+    Returns:
+        float: Numerical value of the length.
+
+    """
+    if value is None:
+        return default
+    match = re.match(r"\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)", value)
+    return float(match.group(1)) if match else default
+
+
+def _multiply(m: Matrix, n: Matrix) -> Matrix:
+    """Return the matrix applying n first, then m."""
+    return (
+        m[0] * n[0] + m[2] * n[1],
+        m[1] * n[0] + m[3] * n[1],
+        m[0] * n[2] + m[2] * n[3],
+        m[1] * n[2] + m[3] * n[3],
+        m[0] * n[4] + m[2] * n[5] + m[4],
+        m[1] * n[4] + m[3] * n[5] + m[5],
+    )
+
+
+def parse_transform(value: str | None) -> Matrix:
+    """Parse an SVG transform attribute into an affine matrix (a, b, c, d, e, f).
+
+    Args:
+        value: Transform list, e.g. "translate(10,20) scale(2)".
+
+    Returns:
+        Matrix: Affine matrix of the whole transform list.
+
+    """
+    matrix = IDENTITY
+    for name, arguments in _TRANSFORM.findall(value or ""):
+        v = [float(a) for a in re.split(r"[\s,]+", arguments.strip()) if a]
+        if name == "matrix" and len(v) == 6:
+            step = (v[0], v[1], v[2], v[3], v[4], v[5])
+        elif name == "translate" and v:
+            step = (1.0, 0.0, 0.0, 1.0, v[0], v[1] if len(v) > 1 else 0.0)
+        elif name == "scale" and v:
+            step = (v[0], 0.0, 0.0, v[1] if len(v) > 1 else v[0], 0.0, 0.0)
+        elif name == "rotate" and v:
+            angle = math.radians(v[0])
+            cx, cy = (v[1], v[2]) if len(v) > 2 else (0.0, 0.0)
+            cos, sin = math.cos(angle), math.sin(angle)
+            step = (cos, sin, -sin, cos, cx - cos * cx + sin * cy, cy - sin * cx - cos * cy)
+        else:
+            continue
+        matrix = _multiply(matrix, step)
+    return matrix
+
+
+def _arc_points(start: Point, r: Point, phi_deg: float, large_arc: bool, sweep: bool, end: Point) -> list[Point]:
+    """Flatten an SVG elliptical arc (endpoint parameterization) into points, excluding the start point."""
+    rx, ry = abs(r[0]), abs(r[1])
+    if rx == 0 or ry == 0 or start == end:
+        return [end]
+    phi = math.radians(phi_deg)
+    cos_phi, sin_phi = math.cos(phi), math.sin(phi)
+    dx, dy = (start[0] - end[0]) / 2, (start[1] - end[1]) / 2
+    x1 = cos_phi * dx + sin_phi * dy
+    y1 = -sin_phi * dx + cos_phi * dy
+    scale = (x1 * x1) / (rx * rx) + (y1 * y1) / (ry * ry)
+    if scale > 1:
+        rx, ry = rx * math.sqrt(scale), ry * math.sqrt(scale)
+    num = rx * rx * ry * ry - rx * rx * y1 * y1 - ry * ry * x1 * x1
+    den = rx * rx * y1 * y1 + ry * ry * x1 * x1
+    factor = math.sqrt(max(0.0, num / den)) if den else 0.0
+    if large_arc == sweep:
+        factor = -factor
+    cx1, cy1 = factor * rx * y1 / ry, -factor * ry * x1 / rx
+    cx = cos_phi * cx1 - sin_phi * cy1 + (start[0] + end[0]) / 2
+    cy = sin_phi * cx1 + cos_phi * cy1 + (start[1] + end[1]) / 2
+    theta1 = math.atan2((y1 - cy1) / ry, (x1 - cx1) / rx)
+    theta2 = math.atan2((-y1 - cy1) / ry, (-x1 - cx1) / rx)
+    delta = theta2 - theta1
+    if sweep and delta < 0:
+        delta += 2 * math.pi
+    elif not sweep and delta > 0:
+        delta -= 2 * math.pi
+    steps = max(2, int(abs(delta) / (math.pi / 36)) + 1)
+    points = []
+    for i in range(1, steps + 1):
+        theta = theta1 + delta * i / steps
+        x, y = rx * math.cos(theta), ry * math.sin(theta)
+        points.append((cos_phi * x - sin_phi * y + cx, sin_phi * x + cos_phi * y + cy))
+    return points
+
+
+def parse_path(d: str) -> list[tuple[list[Point], bool]]:
+    """Flatten SVG path data into subpaths of points.
+
+    Supported commands are M, L, H, V, A and Z (absolute and relative); arcs are approximated by line segments.
+
+    Args:
+        d: SVG path data.
+
+    Returns:
+        list[tuple[list[Point], bool]]: Subpaths with their points and whether they are closed.
+
+    """
+    tokens = _PATH_TOKEN.findall(d)
+    subpaths: list[tuple[list[Point], bool]] = []
+    current: list[Point] = []
+    pos: Point = (0.0, 0.0)
+    command = ""
+    i = 0
+
+    def number() -> float:
+        nonlocal i
+        value = float(tokens[i])
+        i += 1
+        return value
+
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            command = tokens[i]
+            i += 1
+            if command in "Zz":
+                if current:
+                    subpaths.append((current, True))
+                    pos = current[0]
+                current = []
+                continue
+        relative = command.islower()
+        base = pos if relative else (0.0, 0.0)
+        cmd = command.upper()
+        if cmd == "M":
+            if current:
+                subpaths.append((current, False))
+            pos = (base[0] + number(), base[1] + number())
+            current = [pos]
+            # subsequent coordinate pairs are implicit line-to commands
+            command = "l" if relative else "L"
+        elif cmd == "L":
+            pos = (base[0] + number(), base[1] + number())
+            current.append(pos)
+        elif cmd == "H":
+            pos = (base[0] + number() if relative else number(), pos[1])
+            current.append(pos)
+        elif cmd == "V":
+            pos = (pos[0], base[1] + number() if relative else number())
+            current.append(pos)
+        elif cmd == "A":
+            r = (number(), number())
+            phi = number()
+            large_arc = number() != 0
+            sweep = number() != 0
+            end = (base[0] + number(), base[1] + number())
+            current.extend(_arc_points(pos, r, phi, large_arc, sweep, end))
+            pos = end
+        else:
+            # unsupported command: skip its parameter
+            i += 1
+    if current:
+        subpaths.append((current, False))
+    return subpaths
+
+
+def _point_at_length(points: list[Point], length: float) -> tuple[Point, float]:
+    """Return the point at a distance along a line and the direction (radians) of the line there."""
+    angle = 0.0
+    for p, q in pairwise(points):
+        segment = math.hypot(q[0] - p[0], q[1] - p[1])
+        angle = math.atan2(q[1] - p[1], q[0] - p[0])
+        if segment >= length:
+            t = length / segment if segment else 0.0
+            return (p[0] + t * (q[0] - p[0]), p[1] + t * (q[1] - p[1])), angle
+        length -= segment
+    return points[-1], angle
+
+
+@functools.lru_cache(maxsize=64)
+def _font(family: str, bold: bool, size: int) -> ImageFont.ImageFont | ImageFont.FreeTypeFont:
+    names = [f"{family}{' Bold' if bold else ''}.ttf", f"{family.lower()}{'bd' if bold else ''}.ttf"]
+    names.append("DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf")
+    for name in names:
+        with contextlib.suppress(OSError):
+            return ImageFont.truetype(name, size)
+    return ImageFont.load_default(size)
+
+
+class RasterRenderer:
+    """Render a poster drawing to a raster image.
+
+    The renderer walks the SVG element tree built by the drawers, so all layout and projection is shared
+    with the SVG output. It supports the subset of SVG the drawers emit: groups, rectangles, lines,
+    circles, polylines, paths (lines and arcs), text (also along paths), inline images and CSS classes.
+    Antialiasing is achieved by supersampling.
+
+    Attributes:
+        dpi: Output resolution in dots per inch.
+        supersampling: Factor of the internal resolution used for antialiasing.
+
+    Methods:
+        render: Render a drawing to an image.
+        save: Render a drawing and save it as PNG.
+
+    """
+
+    def __init__(self, dpi: int = DEFAULT_DPI, supersampling: int = 2) -> None:
+        """Initialize the RasterRenderer class."""
+        self.dpi: int = dpi
+        self.supersampling: int = max(1, supersampling)
+        self._classes: dict[str, dict[str, str]] = {}
+        self._ids: dict[str, ET.Element] = {}
+        self._scale: float = 1.0
+        self._transform: Matrix = IDENTITY
+        self._image: Image.Image | None = None
+        self._draw: ImageDraw.ImageDraw | None = None
+
+    def render(self, drawing: svgwrite.Drawing) -> Image.Image:
+        """Render a drawing to an RGBA image.
+
+        Args:
+            drawing: svg drawing with a size in mm and a viewbox.
+
+        Returns:
+            Image.Image: Rendered image.
+
+        """
+        root = drawing.get_xml()
+        view_box = [float(v) for v in re.split(r"[\s,]+", root.get("viewBox", "0 0 0 0").strip())]
+        width_mm = parse_length(root.get("width"), view_box[2])
+        height_mm = parse_length(root.get("height"), view_box[3])
+        size = (max(1, round(width_mm / 25.4 * self.dpi)), max(1, round(height_mm / 25.4 * self.dpi)))
+        self._scale = self.supersampling * size[0] / view_box[2] if view_box[2] else 1.0
+
+        self._classes = {}
+        self._ids = {}
+        self._transform = IDENTITY
+        for element in root.iter():
+            if element.tag == "style":
+                for name, declarations in _CSS_RULE.findall("".join(element.itertext())):
+                    self._classes[name] = parse_style(declarations)
+            if element.get("id"):
+                self._ids[element.get("id", "")] = element
+
+        self._image = Image.new("RGBA", (size[0] * self.supersampling, size[1] * self.supersampling), (0, 0, 0, 0))
+        self._draw = ImageDraw.Draw(self._image)
+        self._render_children(root, {})
+        image = self._image
+        self._image, self._draw = None, None
+        if self.supersampling > 1:
+            image = image.resize(size, Image.Resampling.LANCZOS)
+        return image
+
+    def save(self, drawing: svgwrite.Drawing, output: str | IO[bytes]) -> None:
+        """Render a drawing and save it as PNG.
+
+        Args:
+            drawing: svg drawing with a size in mm and a viewbox.
+            output: File name or binary file object.
+
+        """
+        self.render(drawing).save(output, format="PNG", dpi=(self.dpi, self.dpi))
+
+    def _render_children(self, element: ET.Element, inherited: dict[str, str]) -> None:
+        for child in element:
+            if child.tag in ("defs", "style", "title", "desc", "animate"):
+                continue
+            style = self._style(child, inherited)
+            transform = self._transform
+            if child.get("transform"):
+                self._transform = _multiply(transform, parse_transform(child.get("transform")))
+            renderer = getattr(self, f"_render_{child.tag}", None)
+            if renderer is not None:
+                renderer(child, style)
+            elif child.tag in ("g", "svg"):
+                self._render_children(child, {k: v for k, v in style.items() if k in _INHERITED_PROPERTIES})
+            self._transform = transform
+
+    def _style(self, element: ET.Element, inherited: dict[str, str]) -> dict[str, str]:
+        style = dict(inherited)
+        for name in _STYLE_ATTRIBUTES:
+            if element.get(name) is not None:
+                style[name] = element.get(name, "")
+        for class_name in element.get("class", "").split():
+            style.update(self._classes.get(class_name, {}))
+        style.update(parse_style(element.get("style", "")))
+        return style
+
+    def _xy(self, x: float, y: float) -> Point:
+        a, b, c, d, e, f = self._transform
+        return (a * x + c * y + e) * self._scale, (b * x + d * y + f) * self._scale
+
+    def _length(self, value: float) -> float:
+        """Scale a length like stroke width or font size, which are not direction dependent."""
+        a, b, c, d, _, _ = self._transform
+        return value * self._scale * math.sqrt(abs(a * d - b * c))
+
+    @staticmethod
+    def _color(value: str | None, opacity: float) -> tuple[int, int, int, int] | None:
+        if value is None or value == "none" or opacity <= 0:
+            return None
+        try:
+            rgb = ImageColor.getrgb(value)
+        except ValueError:
+            log.info("Unsupported color %s", value)
+            return None
+        return rgb[0], rgb[1], rgb[2], round(255 * min(1.0, opacity))
+
+    def _paint(self, style: dict[str, str], default_fill: str | None = "black") -> tuple:
+        opacity = float(style.get("opacity", 1))
+        fill = self._color(style.get("fill", default_fill), opacity * float(style.get("fill-opacity", 1)))
+        stroke = self._color(style.get("stroke"), opacity * float(style.get("stroke-opacity", 1)))
+        width = max(1, round(self._length(parse_length(style.get("stroke-width"), 1.0))))
+        return fill, stroke, width
+
+    def _layer_draw(self, bounds: tuple[float, float, float, float], fill: tuple | None, stroke: tuple | None) -> tuple:
+        """Return a drawing context; semi-transparent shapes are drawn on a layer covering only their bounds."""
+        assert self._image is not None
+        assert self._draw is not None
+        transparent = any(color is not None and color[3] < 255 for color in (fill, stroke))
+        if not transparent:
+            return self._draw, (0, 0), None
+        x0 = max(0, math.floor(bounds[0]))
+        y0 = max(0, math.floor(bounds[1]))
+        x1 = min(self._image.width, math.ceil(bounds[2]) + 1)
+        y1 = min(self._image.height, math.ceil(bounds[3]) + 1)
+        if x1 <= x0 or y1 <= y0:
+            return None, (0, 0), None
+        layer = Image.new("RGBA", (x1 - x0, y1 - y0), (0, 0, 0, 0))
+        return ImageDraw.Draw(layer), (x0, y0), layer
+
+    def _composite(self, layer: Image.Image | None, origin: tuple[int, int]) -> None:
+        if layer is None:
+            return
+        assert self._image is not None
+        x, y = origin
+        if x + layer.width <= 0 or y + layer.height <= 0:
+            return
+        # alpha_composite does not accept negative destinations, so clip the layer instead
+        self._image.alpha_composite(layer, dest=(max(0, x), max(0, y)), source=(max(0, -x), max(0, -y)))
+
+    def _draw_shape(self, subpaths: list[tuple[list[Point], bool]], style: dict[str, str], filled: bool) -> None:
+        fill, stroke, width = self._paint(style, "black" if filled else None)
+        if not filled:
+            fill = None
+        if (fill is None and stroke is None) or not subpaths:
+            return
+        xs = [p[0] for points, _ in subpaths for p in points]
+        ys = [p[1] for points, _ in subpaths for p in points]
+        margin = width if stroke is not None else 0
+        draw, origin, layer = self._layer_draw(
+            (min(xs) - margin, min(ys) - margin, max(xs) + margin, max(ys) + margin), fill, stroke
+        )
+        if draw is None:
+            return
+        round_cap = style.get("stroke-linecap") == "round"
+        for points, closed in subpaths:
+            local = [(x - origin[0], y - origin[1]) for x, y in points]
+            if fill is not None and len(local) > 2:
+                draw.polygon(local, fill=fill)
+            if stroke is not None:
+                if closed:
+                    local = [*local, local[0]]
+                if len(local) > 1:
+                    draw.line(local, fill=stroke, width=width, joint="curve")
+                if round_cap and width > 2:
+                    r = width / 2
+                    for x, y in (local[0], local[-1]):
+                        draw.ellipse((x - r, y - r, x + r, y + r), fill=stroke)
+        self._composite(layer, origin)
+
+    def _render_rect(self, element: ET.Element, style: dict[str, str]) -> None:
+        x, y = parse_length(element.get("x")), parse_length(element.get("y"))
+        w, h = parse_length(element.get("width")), parse_length(element.get("height"))
+        corners = [self._xy(x, y), self._xy(x + w, y), self._xy(x + w, y + h), self._xy(x, y + h)]
+        self._draw_shape([(corners, True)], style, filled=True)
+
+    def _render_line(self, element: ET.Element, style: dict[str, str]) -> None:
+        start = self._xy(parse_length(element.get("x1")), parse_length(element.get("y1")))
+        end = self._xy(parse_length(element.get("x2")), parse_length(element.get("y2")))
+        self._draw_shape([([start, end], False)], style, filled=False)
+
+    def _render_circle(self, element: ET.Element, style: dict[str, str]) -> None:
+        cx, cy = self._xy(parse_length(element.get("cx")), parse_length(element.get("cy")))
+        r = self._length(parse_length(element.get("r")))
+        steps = max(16, int(r))
+        points = [
+            (cx + r * math.cos(2 * math.pi * i / steps), cy + r * math.sin(2 * math.pi * i / steps))
+            for i in range(steps)
+        ]
+        self._draw_shape([(points, True)], style, filled=True)
+
+    def _render_polyline(self, element: ET.Element, style: dict[str, str]) -> None:
+        values = [float(v) for v in re.split(r"[\s,]+", element.get("points", "").strip()) if v]
+        points = [self._xy(x, y) for x, y in zip(values[::2], values[1::2], strict=False)]
+        self._draw_shape([(points, False)], style, filled=True)
+
+    def _render_path(self, element: ET.Element, style: dict[str, str]) -> None:
+        subpaths = [
+            ([self._xy(x, y) for x, y in points], closed) for points, closed in parse_path(element.get("d", ""))
+        ]
+        self._draw_shape(subpaths, style, filled=True)
+
+    def _render_image(self, element: ET.Element, style: dict[str, str]) -> None:
+        _ = style
+        href = element.get("xlink:href") or element.get("href") or ""
+        if not href.startswith("data:") or "," not in href:
+            log.info("Skipping image that is not inlined")
+            return
+        data = base64.b64decode(href.split(",", 1)[1])
+        x0, y0 = parse_length(element.get("x")), parse_length(element.get("y"))
+        x, y = self._xy(x0, y0)
+        x1, y1 = self._xy(x0 + parse_length(element.get("width")), y0 + parse_length(element.get("height")))
+        w, h = x1 - x, y1 - y
+        with Image.open(io.BytesIO(data)) as img:
+            picture = img.convert("RGBA").resize((max(1, round(w)), max(1, round(h))), Image.Resampling.LANCZOS)
+        self._composite(picture, (round(x), round(y)))
+
+    def _render_text(self, element: ET.Element, style: dict[str, str]) -> None:
+        fill, _, _ = self._paint(style)
+        if fill is None:
+            return
+        size = max(1, round(self._length(parse_length(style.get("font-size"), 16.0))))
+        font = _font(style.get("font-family", "Arial"), style.get("font-weight") == "bold", size)
+        horizontal = {"middle": "m", "end": "r"}.get(style.get("text-anchor", ""), "l")
+        baseline = style.get("alignment-baseline") or style.get("dominant-baseline", "")
+        vertical = {"hanging": "a", "middle": "m", "central": "m"}.get(baseline, "s")
+        anchor = horizontal + vertical if isinstance(font, ImageFont.FreeTypeFont) else None
+        text = element.text or ""
+        if text:
+            position = self._xy(parse_length(element.get("x")), parse_length(element.get("y")))
+            assert self._draw is not None
+            self._draw.text(position, text, fill=fill, font=font, anchor=anchor)
+        for child in element:
+            if child.tag == "textPath" and child.text:
+                self._render_text_path(child, child.text, fill, font, anchor)
+
+    def _render_text_path(
+        self,
+        element: ET.Element,
+        text: str,
+        fill: tuple,
+        font: ImageFont.ImageFont | ImageFont.FreeTypeFont,
+        anchor: str | None,
+    ) -> None:
+        path = self._ids.get((element.get("xlink:href") or element.get("href") or "").lstrip("#"))
+        if path is None:
+            return
+        subpaths = parse_path(path.get("d", ""))
+        if not subpaths or len(subpaths[0][0]) < 2:
+            return
+        points = [self._xy(x, y) for x, y in subpaths[0][0]]
+        (x, y), angle = _point_at_length(points, self._length(parse_length(element.get("startOffset"))))
+        bbox = font.getbbox(text, anchor=anchor) if anchor else font.getbbox(text)
+        extent = 2 * math.ceil(max(abs(v) for v in bbox)) + 2
+        layer = Image.new("RGBA", (extent, extent), (0, 0, 0, 0))
+        ImageDraw.Draw(layer).text((extent / 2, extent / 2), text, fill=fill, font=font, anchor=anchor)
+        layer = layer.rotate(-math.degrees(angle), resample=Image.Resampling.BICUBIC)
+        self._composite(layer, (round(x - extent / 2), round(y - extent / 2)))
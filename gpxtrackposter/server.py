@@ -0,0 +1,321 @@
+"""Render posters on request from tracks kept in memory"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import http.server
+import json
+import logging
+import os
+import socketserver
+import threading
+from typing import TYPE_CHECKING, Any
+
+from gpxtrackposter import batch, fingerprint
+from gpxtrackposter.exceptions import ParameterError, PosterError
+from gpxtrackposter.poster_job import PosterJob
+from gpxtrackposter.timezone_adjuster import TimezoneAdjuster
+
+if TYPE_CHECKING:
+    import argparse
+
+    from gpxtrackposter.track import Track
+    from gpxtrackposter.track_loader import TrackLoader
+
+log = logging.getLogger("gpxtrackposter")
+
+CONTENT_TYPES = {"svg": "image/svg+xml", "png": "image/png"}
+# number of rendered posters kept in memory
+RESULT_CACHE_SIZE = 32
+MAX_REQUEST_SIZE = 1024 * 1024
+
+
+def add_server_args(args_parser: argparse.ArgumentParser) -> None:
+    """Add the options of the serve command to the parser
+
+    Args:
+        args_parser: Argument parser
+
+    """
+    group = args_parser.add_argument_group("Server Options (create_poster serve)")
+    group.add_argument(
+        "--host",
+        metavar="HOST",
+        type=str,
+        default="127.0.0.1",
+        help="Address the server listens on (default: 127.0.0.1).",
+    )
+    group.add_argument(
+        "--port",
+        metavar="PORT",
+        type=int,
+        default=8765,
+        help="Port the server listens on (default: 8765).",
+    )
+    group.add_argument(
+        "--socket",
+        metavar="FILE",
+        type=str,
+        help="Listen on a Unix socket instead of a TCP port.",
+    )
+
+
+class TrackStore:
+    """Tracks loaded once and kept in memory, updated when the GPX files change.
+
+    Attributes:
+        loader: Loader of the tracks, without year, length and activity filters.
+        gpx_dir: Directory of the GPX files.
+        strava_config: Strava config file, used instead of the GPX directory.
+
+    Methods:
+        tracks: Return the current tracks and their hash.
+
+    """
+
+    def __init__(self, loader: TrackLoader, gpx_dir: str, strava_config: str | None = None) -> None:
+        """Initialize the TrackStore class; the tracks are loaded on first use.
+
+        Args:
+            loader: Loader of the tracks, without year, length and activity filters.
+            gpx_dir: Directory of the GPX files.
+            strava_config: Strava config file, used instead of the GPX directory.
+
+        """
+        self.loader = loader
+        self.gpx_dir = gpx_dir
+        self.strava_config = strava_config
+        self._tracks: list[Track] = []
+        self._hash: str | None = None
+        self._lock = threading.Lock()
+        # parsing new GPX files needs the timezone finder, load it once
+        TimezoneAdjuster()
+
+    def tracks(self) -> tuple[list[Track], str | None]:
+        """Return the current tracks, loading the added and changed GPX files if the GPX files changed.
+
+        Strava tracks are loaded only once.
+
+        Returns:
+            tuple[list[Track], str | None]: Tracks and the hash of the GPX files, None for Strava tracks.
+
+        """
+        with self._lock:
+            if self.strava_config:
+                if self._hash is None:
+                    self._tracks = self.loader.load_strava_tracks(self.strava_config)
+                    self._hash = ""
+                return self._tracks, None
+            tracks_hash = self.loader.fingerprint(self.gpx_dir)
+            if tracks_hash != self._hash:
+                log.info("Loading tracks of %s", self.gpx_dir)
+                self._tracks = self.loader.update_tracks(self.gpx_dir)
+                self._hash = tracks_hash
+            return self._tracks, tracks_hash
+
+
+class PosterServer:
+    """Render posters with the options of requests in a bounded thread pool.
+
+    Attributes:
+        store: Tracks of all posters.
+        args_parser: Argument parser of the command line.
+        args: Options of the serve command, the defaults of all requests.
+        cache_dir: Directory the drawers may store cached data in, or None.
+
+    Methods:
+        render: Render the poster of the options of a request.
+        close: Wait for running renders and stop the thread pool.
+
+    """
+
+    def __init__(
+        self,
+        store: TrackStore,
+        args_parser: argparse.ArgumentParser,
+        args: argparse.Namespace,
+        cache_dir: str | None = None,
+    ) -> None:
+        """Initialize the PosterServer class.
+
+        Args:
+            store: Tracks of all posters.
+            args_parser: Argument parser of the command line.
+            args: Options of the serve command, the defaults of all requests.
+            cache_dir: Directory the drawers may store cached data in, or None.
+
+        """
+        self.store = store
+        self.args_parser = args_parser
+        self.args = args
+        self.cache_dir = cache_dir
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=args.workers or os.cpu_count() or 1)
+        self._results: collections.OrderedDict[str, bytes] = collections.OrderedDict()
+        self._results_lock = threading.Lock()
+
+    def render(self, options: dict[str, Any]) -> tuple[bytes, str]:
+        """Render the poster of the options of a request.
+
+        The options are named like the long command line options, as in job files; an output name ending
+        with ".png" gives a PNG image, otherwise the poster is an SVG image. Equal requests for unchanged
+        tracks are answered from memory.
+
+        Args:
+            options: Options of the request.
+
+        Returns:
+            tuple[bytes, str]: Poster and its image format.
+
+        Raises:
+            ParameterError: An option is unknown or not valid.
+            PosterError: No tracks match the options.
+
+        """
+        args = batch.job_arguments(self.args_parser, self.args, options)
+        image_format = "png" if args.output.lower().endswith(".png") else "svg"
+        return self._executor.submit(self._render, args, image_format).result(), image_format
+
+    def _render(self, args: argparse.Namespace, image_format: str) -> bytes:
+        tracks, tracks_hash = self.store.tracks()
+        key = None
+        if tracks_hash is not None:
+            key = fingerprint.input_fingerprint(args, tracks_hash)
+            with self._results_lock:
+                if key in self._results:
+                    self._results.move_to_end(key)
+                    return self._results[key]
+        job = PosterJob(args, self.cache_dir)
+        # the pool already renders several posters at once
+        job.drawer.set_workers(1)
+        job_tracks = job.select_tracks(tracks)
+        if not job_tracks:
+            msg = "No tracks found."
+            raise PosterError(msg)
+        data = job.render_bytes(job_tracks, image_format)
+        if key is not None:
+            with self._results_lock:
+                self._results[key] = data
+                while len(self._results) > RESULT_CACHE_SIZE:
+                    self._results.popitem(last=False)
+        return data
+
+    def close(self) -> None:
+        """Wait for running renders and stop the thread pool."""
+        self._executor.shutdown()
+
+
+class _RequestHandler(http.server.BaseHTTPRequestHandler):
+    server: _HTTPServer | _UnixHTTPServer
+
+    def do_POST(self) -> None:
+        if self.path.split("?")[0] != "/render":
+            self._send_error(404, "Not found; POST the options of a poster to /render")
+            return
+        try:
+            data, image_format = self.server.poster_server.render(self._read_options())
+        except (ParameterError, ValueError) as e:
+            self._send_error(400, str(e))
+            return
+        except PosterError as e:
+            self._send_error(422, str(e))
+            return
+        except Exception:
+            # e.g. a failing drawer plugin or an unavailable locale; the server keeps answering requests
+            log.exception("Failed to render the poster of a request")
+            self._send_error(500, "Internal server error")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES[image_format])
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_options(self) -> dict[str, Any]:
+        length = int(self.headers.get("Content-Length", 0))
+        if not 0 <= length <= MAX_REQUEST_SIZE:
+            msg = "Request too large"
+            raise ParameterError(msg)
+        options = json.loads(self.rfile.read(length) or b"{}")
+        if not isinstance(options, dict):
+            msg = "The request must contain an object of options"
+            raise ParameterError(msg)
+        return options
+
+    def _send_error(self, code: int, message: str) -> None:
+        body = json.dumps({"error": message}).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix socket clients have no address
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002 - name of the overridden method
+        log.info("%s %s", self.address_string(), format % args)
+
+
+class _HTTPServer(http.server.ThreadingHTTPServer):
+    def __init__(self, address: tuple[str, int], poster_server: PosterServer) -> None:
+        self.poster_server = poster_server
+        super().__init__(address, _RequestHandler)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, address: str, poster_server: PosterServer) -> None:
+        self.poster_server = poster_server
+        super().__init__(address, _RequestHandler)
+
+
+def create_server(
+    poster_server: PosterServer, host: str = "127.0.0.1", port: int = 8765, socket_file: str | None = None
+) -> socketserver.BaseServer:
+    """Create an HTTP server answering render requests.
+
+    Args:
+        poster_server: Renderer of the requests.
+        host: Address to listen on.
+        port: Port to listen on, 0 for any free port.
+        socket_file: Unix socket to listen on instead of host and port.
+
+    Returns:
+        socketserver.BaseServer: Server, call serve_forever to answer requests.
+
+    """
+    if socket_file:
+        if os.path.exists(socket_file):
+            os.remove(socket_file)
+        return _UnixHTTPServer(socket_file, poster_server)
+    return _HTTPServer((host, port), poster_server)
+
+
+def serve(poster_server: PosterServer, host: str, port: int, socket_file: str | None = None) -> None:
+    """Answer render requests until interrupted.
+
+    Args:
+        poster_server: Renderer of the requests.
+        host: Address to listen on.
+        port: Port to listen on.
+        socket_file: Unix socket to listen on instead of host and port.
+
+    """
+    with create_server(poster_server, host, port, socket_file) as server:
+        log.info("Serving posters on %s", socket_file or f"http://{host}:{port}/render")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            poster_server.close()
+            if socket_file and os.path.exists(socket_file):
+                os.remove(socket_file)
@@ -0,0 +1,125 @@
+"""Collect recurring SVG style combinations as CSS classes"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import contextlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+StyleKey = tuple[tuple[str, str], ...]
+
+
+class StyleSheet:
+    """Collect recurring SVG style combinations as CSS classes.
+
+    Instead of repeating presentation attributes on every element, drawers ask the style sheet for a
+    class name for a combination of properties and reference that class. All classes are written
+    into a single `<style>` block.
+
+    Attributes:
+        _prefix: Prefix of generated class names.
+        _classes: Class names by sorted property combinations.
+        _records: Classes requested within active record blocks.
+
+    Methods:
+        clear: Remove all classes.
+        is_empty: Return True if no class was generated.
+        class_name: Return the class name for a combination of properties.
+        record: Record the classes requested within a block.
+        restore: Request recorded classes again.
+        css: Return the CSS text of all classes.
+
+    """
+
+    def __init__(self, prefix: str = "s") -> None:
+        """Initialize the StyleSheet class."""
+        self._prefix: str = prefix
+        self._classes: dict[StyleKey, str] = {}
+        self._records: list[list[tuple[StyleKey, str]]] = []
+
+    def clear(self) -> None:
+        """Remove all classes."""
+        self._classes.clear()
+
+    def is_empty(self) -> bool:
+        """Check whether any class was generated.
+
+        Returns:
+            bool: True if no class was generated.
+
+        """
+        return not self._classes
+
+    def class_name(self, style: str = "", **properties: str | float) -> str:
+        """Return the class name for a combination of properties, creating the class if needed.
+
+        Args:
+            style: Inline style string, e.g. "font-size:4px; font-family:Arial".
+            properties: Additional properties; underscores in names are replaced by dashes.
+
+        Returns:
+            str: Class name.
+
+        """
+        merged: dict[str, str] = {}
+        for declaration in style.split(";"):
+            if ":" not in declaration:
+                continue
+            name, value = declaration.split(":", 1)
+            merged[name.strip()] = value.strip()
+        for prop, prop_value in properties.items():
+            merged[prop.replace("_", "-")] = str(prop_value)
+        return self._class_name(tuple(sorted(merged.items())))
+
+    def _class_name(self, key: StyleKey) -> str:
+        if key not in self._classes:
+            self._classes[key] = f"{self._prefix}{len(self._classes)}"
+        name = self._classes[key]
+        for record in self._records:
+            record.append((key, name))
+        return name
+
+    @contextlib.contextmanager
+    def record(self) -> Iterator[list[tuple[StyleKey, str]]]:
+        """Record the classes requested within a block, e.g. to cache the elements drawn in it.
+
+        Yields:
+            list[tuple[StyleKey, str]]: Property combinations and class names requested within the block.
+
+        """
+        record: list[tuple[StyleKey, str]] = []
+        self._records.append(record)
+        try:
+            yield record
+        finally:
+            self._records.remove(record)
+
+    def restore(self, record: list[tuple[StyleKey, str]]) -> bool:
+        """Request recorded classes again, in the recorded order.
+
+        Args:
+            record: Property combinations and class names as recorded by record.
+
+        Returns:
+            bool: True if every class got its recorded name, i.e. recorded elements can be reused.
+
+        """
+        return all(self._class_name(key) == name for key, name in record)
+
+    def css(self) -> str:
+        """Return the CSS text of all classes.
+
+        Returns:
+            str: CSS text.
+
+        """
+        return "".join(
+            f".{name}{{{';'.join(f'{prop}:{value}' for prop, value in key)}}}" for key, name in self._classes.items()
+        )
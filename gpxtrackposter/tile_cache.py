@@ -0,0 +1,288 @@
+"""Cache and fetch map tiles for heatmap backgrounds"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import requests  # type: ignore[import-untyped]
+import staticmaps  # type: ignore[import-untyped]
+
+from gpxtrackposter import utils
+from gpxtrackposter.drawer_options import DEFAULT_TILE_CACHE_SIZE, DEFAULT_TILE_WORKERS
+
+log = logging.getLogger("gpxtrackposter")
+
+TILE_EXTENSIONS = [".png", ".jpg", ".jpeg", ".webp"]
+
+
+class TileCache:
+    """Persistent content-addressed tile cache with a size limit and LRU eviction.
+
+    Tile data is stored once per content hash, so identical tiles (e.g. empty sea tiles) share a file.
+    An index maps provider, zoom, x and y to the content hash and records the last use of every tile.
+    When the stored data exceeds the size limit, the least recently used tiles are evicted.
+
+    Attributes:
+        cache_dir: Directory of the cache.
+        max_bytes: Size limit of the stored tile data in bytes.
+        _index: Content hash and time of last use by tile key.
+        _sizes: Size of stored tile data by content hash.
+        _lock: Lock guarding index and files, tiles are fetched concurrently.
+
+    Methods:
+        get: Return cached tile data.
+        put: Store tile data.
+        size: Return the size of the stored tile data.
+        flush: Write the index to disk.
+
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_TILE_CACHE_SIZE * 1024 * 1024) -> None:
+        """Initialize the TileCache class."""
+        self.cache_dir: str = cache_dir
+        self.max_bytes: int = max_bytes
+        self._index: dict[str, tuple[str, float]] = {}
+        self._sizes: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load_index()
+
+    @staticmethod
+    def key(provider: staticmaps.TileProvider, zoom: int, x: int, y: int) -> str:
+        """Return the index key of a tile.
+
+        Args:
+            provider: Tile provider.
+            zoom: Zoom level.
+            x: Tile column.
+            y: Tile row.
+
+        Returns:
+            str: Key of the tile.
+
+        """
+        return f"{provider.name()}/{zoom}/{x}/{y}"
+
+    def _index_file_name(self) -> str:
+        return os.path.join(self.cache_dir, "index.json")
+
+    def _data_file_name(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest[:2], digest)
+
+    def _load_index(self) -> None:
+        try:
+            with open(self._index_file_name(), encoding="utf8") as f:
+                data = json.load(f)
+            index = {key: (str(value[0]), float(value[1])) for key, value in data.items()}
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, TypeError, IndexError, AttributeError):
+            log.warning("Ignoring broken tile cache index %s", self._index_file_name())
+            return
+        for key, (digest, last_used) in index.items():
+            if digest not in self._sizes:
+                try:
+                    self._sizes[digest] = os.path.getsize(self._data_file_name(digest))
+                except OSError:
+                    continue
+            self._index[key] = (digest, last_used)
+
+    def get(self, key: str) -> bytes | None:
+        """Return cached tile data and mark the tile as used.
+
+        Args:
+            key: Key of the tile.
+
+        Returns:
+            bytes | None: Tile data, or None if the tile is not cached.
+
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            try:
+                with open(self._data_file_name(entry[0]), "rb") as f:
+                    data = f.read()
+            except OSError:
+                del self._index[key]
+                return None
+            self._index[key] = (entry[0], time.time())
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store tile data and evict least recently used tiles if the cache is too large.
+
+        Args:
+            key: Key of the tile.
+            data: Tile data.
+
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if digest not in self._sizes:
+                utils.write_file_atomic(self._data_file_name(digest), data)
+                self._sizes[digest] = len(data)
+            self._index[key] = (digest, time.time())
+            self._evict()
+
+    def size(self) -> int:
+        """Return the size of the stored tile data.
+
+        Returns:
+            int: Size in bytes.
+
+        """
+        return sum(self._sizes.values())
+
+    def _evict(self) -> None:
+        total = self.size()
+        if total <= self.max_bytes:
+            return
+        references = collections.Counter(digest for digest, _ in self._index.values())
+        for key, (digest, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            del self._index[key]
+            references[digest] -= 1
+            if references[digest] > 0:
+                continue
+            total -= self._sizes.pop(digest)
+            try:
+                os.remove(self._data_file_name(digest))
+            except OSError:
+                log.warning("Failed to remove cached tile %s", digest)
+            if total <= self.max_bytes:
+                break
+
+    def flush(self) -> None:
+        """Write the index to disk."""
+        with self._lock:
+            data = json.dumps({key: [digest, last_used] for key, (digest, last_used) in self._index.items()})
+            utils.write_file_atomic(self._index_file_name(), data.encode("utf8"))
+
+
+class TileDirectoryProvider(staticmaps.TileProvider):
+    """Tile provider reading tiles from a local XYZ directory, i.e. DIR/{z}/{x}/{y}.png
+
+    Attributes:
+        directory: Root directory of the tiles.
+
+    Methods:
+        load: Return the data of a tile.
+
+    """
+
+    def __init__(self, directory: str, attribution: str | None = None, max_zoom: int = 20) -> None:
+        """Initialize the TileDirectoryProvider class."""
+        super().__init__(f"dir-{os.path.abspath(directory)}", "", attribution=attribution, max_zoom=max_zoom)
+        self.directory: str = directory
+
+    def load(self, zoom: int, x: int, y: int) -> bytes | None:
+        """Return the data of a tile.
+
+        Args:
+            zoom: Zoom level.
+            x: Tile column.
+            y: Tile row.
+
+        Returns:
+            bytes | None: Tile data, or None if the directory does not contain the tile.
+
+        """
+        base = os.path.join(self.directory, str(zoom), str(x), str(y))
+        for extension in TILE_EXTENSIONS:
+            if os.path.isfile(base + extension):
+                with open(base + extension, "rb") as f:
+                    return f.read()
+        return None
+
+
+class CachingTileDownloader(staticmaps.TileDownloader):
+    """Tile downloader using a TileCache, local tile directories and parallel prefetching.
+
+    Attributes:
+        tile_cache: Cache of downloaded tiles, or None.
+        workers: Maximum number of concurrent downloads.
+        _prefetched: Tiles fetched by prefetch by tile key.
+
+    Methods:
+        get: Return the data of a tile.
+        prefetch: Fetch all tiles needed by a transformer concurrently.
+
+    """
+
+    def __init__(self, tile_cache: TileCache | None = None, workers: int = DEFAULT_TILE_WORKERS) -> None:
+        """Initialize the CachingTileDownloader class."""
+        super().__init__()
+        self.tile_cache: TileCache | None = tile_cache
+        self.workers: int = workers
+        self._prefetched: dict[str, bytes | None] = {}
+
+    def get(self, provider: staticmaps.TileProvider, cache_dir: str, zoom: int, x: int, y: int) -> bytes | None:  # noqa: ARG002
+        """Return the data of a tile from prefetched tiles, a local directory, the tile cache or the network.
+
+        Args:
+            provider: Tile provider.
+            cache_dir: Ignored, the tile cache replaces the cache of staticmaps.
+            zoom: Zoom level.
+            x: Tile column.
+            y: Tile row.
+
+        Returns:
+            bytes | None: Tile data, or None if the provider has no such tile.
+
+        """
+        key = TileCache.key(provider, zoom, x, y)
+        if key in self._prefetched:
+            return self._prefetched[key]
+        if isinstance(provider, TileDirectoryProvider):
+            return provider.load(zoom, x, y)
+        if self.tile_cache is not None:
+            data = self.tile_cache.get(key)
+            if data is not None:
+                return data
+        data = super().get(provider, None, zoom, x, y)
+        if data is not None and self.tile_cache is not None:
+            self.tile_cache.put(key, data)
+        return data
+
+    def prefetch(self, provider: staticmaps.TileProvider, transformer: staticmaps.Transformer) -> None:
+        """Fetch all tiles needed to render with a transformer, using at most `workers` concurrent downloads.
+
+        Args:
+            provider: Tile provider.
+            transformer: Transformer of the map to render.
+
+        """
+        tiles = []
+        for yy in range(transformer.tiles_y()):
+            y = transformer.first_tile_y() + yy
+            if y < 0 or y >= transformer.number_of_tiles():
+                continue
+            for xx in range(transformer.tiles_x()):
+                x = (transformer.first_tile_x() + xx) % transformer.number_of_tiles()
+                tiles.append((x, y))
+
+        def fetch(tile: tuple[int, int]) -> tuple[str, bytes | None]:
+            key = TileCache.key(provider, transformer.zoom(), *tile)
+            try:
+                return key, self.get(provider, "", transformer.zoom(), *tile)
+            except (RuntimeError, requests.RequestException) as e:
+                log.warning("Failed to fetch tile %s: %s", key, e)
+                return key, None
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            self._prefetched.update(executor.map(fetch, tiles))
+        log.info("Prefetched %d tiles", len(tiles))
+        if self.tile_cache is not None:
+            self.tile_cache.flush()
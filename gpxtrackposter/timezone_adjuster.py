@@ -10,12 +10,12 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 import pytz
-import timezonefinder  # type: ignore[import-untyped]
 
 if TYPE_CHECKING:
     import datetime
 
     import s2sphere  # type: ignore[import-untyped]
+    import timezonefinder  # type: ignore[import-untyped]
 
 
 class TimezoneAdjuster:
@@ -34,7 +34,10 @@ class TimezoneAdjuster:
     def __init__(self) -> None:
         """Initialize the TimezoneAdjuster class."""
         if not TimezoneAdjuster._timezonefinder:
-            TimezoneAdjuster._timezonefinder = timezonefinder.TimezoneFinder()
+            # only needed when GPX files are parsed, not when all tracks come from the cache
+            from timezonefinder import TimezoneFinder  # type: ignore[import-untyped]
+
+            TimezoneAdjuster._timezonefinder = TimezoneFinder()
 
     @classmethod
     def adjust(cls, time: datetime.datetime, latlng: s2sphere.LatLng) -> datetime.datetime:
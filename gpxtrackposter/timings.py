@@ -0,0 +1,187 @@
+"""Measure the time spent in the phases of a run"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import threading
+import time
+from typing import TYPE_CHECKING, Any, ParamSpec, TypeVar
+
+from gpxtrackposter import memory, trace
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class Timings:
+    """Durations of the phases of a run, summed up over all calls and threads.
+
+    A phase within another phase is named by the names of the enclosing phases and its own name, separated
+    by "/", e.g. "load tracks/parse GPX". Phases of worker processes are not recorded; their time is part of
+    the phase waiting for them. Phases are also recorded as spans of the trace recorder, see trace, and
+    measured by the memory report, see memory.
+
+    Attributes:
+        start: Start of the run, see time.perf_counter.
+
+    Methods:
+        phase: Measure the duration of a phase.
+        add: Add the duration of a phase.
+        reset: Remove all phases and restart the run.
+        report: Return the phases as JSON serializable dictionary.
+        table: Return the phases as text table.
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize the Timings class."""
+        self.start = time.perf_counter()
+        self._phases: dict[str, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measure the duration of a phase.
+
+        Args:
+            name: Name of the phase.
+
+        Yields:
+            None
+
+        """
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        stack: list[str] = self._local.stack
+        stack.append(name)
+        path = "/".join(stack)
+        try:
+            # the snapshots of the memory report are not part of the phase
+            with memory.phase(path):
+                start = time.perf_counter()
+                try:
+                    with trace.span(name, "phase"):
+                        yield
+                finally:
+                    self.add(path, time.perf_counter() - start)
+        finally:
+            stack.pop()
+
+    def add(self, path: str, seconds: float) -> None:
+        """Add the duration of a phase.
+
+        Args:
+            path: Name of the phase, including the names of the enclosing phases.
+            seconds: Duration.
+
+        """
+        with self._lock:
+            calls, total = self._phases.get(path, (0, 0.0))
+            self._phases[path] = (calls + 1, total + seconds)
+
+    def reset(self) -> None:
+        """Remove all phases and restart the run."""
+        with self._lock:
+            self._phases.clear()
+            self.start = time.perf_counter()
+
+    def report(self) -> dict[str, Any]:
+        """Return the phases as JSON serializable dictionary.
+
+        Returns:
+            dict[str, Any]: Seconds since the start of the run and the number of calls and seconds of every
+                phase, nested phases following the enclosing phase.
+
+        """
+        with self._lock:
+            phases = dict(self._phases)
+        # phases in the order they were first recorded, nested phases below the enclosing phase, which is
+        # recorded after the phases within it
+        order = {path: i for i, path in enumerate(phases)}
+
+        def sort_key(path: str) -> list[int]:
+            parts = path.split("/")
+            return [order.get("/".join(parts[: i + 1]), len(order)) for i in range(len(parts))]
+
+        return {
+            "total_seconds": time.perf_counter() - self.start,
+            "phases": [
+                {"name": path, "calls": phases[path][0], "seconds": phases[path][1]}
+                for path in sorted(phases, key=sort_key)
+            ],
+        }
+
+    def table(self) -> str:
+        """Return the phases as text table, nested phases indented below the enclosing phase.
+
+        Returns:
+            str: Table with the calls, seconds and share of the run of every phase.
+
+        """
+        report = self.report()
+        total = report["total_seconds"]
+        lines = [f"{'Phase':<40} {'Calls':>7} {'Seconds':>9} {'%':>6}"]
+        for p in report["phases"]:
+            *parents, name = p["name"].split("/")
+            share = 100.0 * p["seconds"] / total if total > 0 else 0.0
+            lines.append(f"{'  ' * len(parents) + name:<40} {p['calls']:>7} {p['seconds']:>9.3f} {share:>6.1f}")
+        lines.append(f"{'total':<40} {'':>7} {total:>9.3f} {100.0:>6.1f}")
+        return "\n".join(lines)
+
+
+_timings = Timings()
+
+
+def timings() -> Timings:
+    """Return the timings of the current run.
+
+    Returns:
+        Timings: Timings.
+
+    """
+    return _timings
+
+
+def phase(name: str) -> contextlib.AbstractContextManager[None]:
+    """Measure the duration of a phase of the current run.
+
+    Args:
+        name: Name of the phase.
+
+    Returns:
+        contextlib.AbstractContextManager[None]: Context manager.
+
+    """
+    return _timings.phase(name)
+
+
+def timed(name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Return a decorator measuring every call of a function as phase of the current run.
+
+    Args:
+        name: Name of the phase.
+
+    Returns:
+        Callable[[Callable[P, R]], Callable[P, R]]: Decorator.
+
+    """
+
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        @functools.wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with _timings.phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
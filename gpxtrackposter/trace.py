@@ -0,0 +1,165 @@
+"""Record the work of processes and threads as Chrome trace events"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+class TraceRecorder:
+    """Spans of work of the processes and threads of a run, written as Chrome trace file.
+
+    Spans are only recorded while the recorder is enabled. Worker processes record their spans in their own
+    recorder and return them to the main process, which adds them with extend. The trace file can be opened
+    with Perfetto (https://ui.perfetto.dev) or chrome://tracing.
+
+    Attributes:
+        enabled: Whether spans are recorded.
+
+    Methods:
+        enable: Start or stop recording spans.
+        span: Record the duration of some work.
+        collect: Return and remove the recorded events.
+        extend: Add events recorded by another process.
+        write: Write the recorded events as Chrome trace file.
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize the TraceRecorder class."""
+        self.enabled = False
+        self._events: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def enable(self, enabled: bool = True) -> None:
+        """Start or stop recording spans.
+
+        Args:
+            enabled: Whether spans are recorded.
+
+        """
+        self.enabled = enabled
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str = "", **args: Any) -> Iterator[None]:  # noqa: ANN401 - any JSON value
+        """Record the duration of some work in the current process and thread.
+
+        Args:
+            name: Name of the work, e.g. "parse".
+            category: Category of the work, e.g. "file" or "phase".
+            **args: Details shown with the span, e.g. the file name.
+
+        Yields:
+            None
+
+        """
+        if not self.enabled:
+            yield
+            return
+        # the monotonic clock is shared by all processes, so spans of workers line up with the main process
+        start = time.monotonic_ns()
+        try:
+            yield
+        finally:
+            end = time.monotonic_ns()
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start / 1000,
+                "dur": (end - start) / 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_native_id(),
+            }
+            if args:
+                event["args"] = args
+            with self._lock:
+                self._events.append(event)
+
+    def collect(self) -> list[dict[str, Any]]:
+        """Return and remove the recorded events, e.g. to send them from a worker to the main process.
+
+        Returns:
+            list[dict[str, Any]]: Chrome trace events.
+
+        """
+        with self._lock:
+            events, self._events = self._events, []
+        return events
+
+    def extend(self, events: list[dict[str, Any]]) -> None:
+        """Add events recorded by another process.
+
+        Args:
+            events: Chrome trace events, see collect.
+
+        """
+        with self._lock:
+            self._events.extend(events)
+
+    def write(self, file_name: str) -> None:
+        """Write the recorded events as Chrome trace file, naming the main process and the worker processes.
+
+        Args:
+            file_name: Name of the trace file, e.g. "trace.json".
+
+        """
+        with self._lock:
+            events = list(self._events)
+        main_pid = os.getpid()
+        pids = sorted({event["pid"] for event in events} | {main_pid})
+        metadata = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "args": {"name": "create_poster" if pid == main_pid else f"worker {pid}"},
+            }
+            for pid in pids
+        ]
+        with open(file_name, "w", encoding="utf8") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+
+
+_recorder = TraceRecorder()
+
+
+def recorder() -> TraceRecorder:
+    """Return the trace recorder of the current process.
+
+    Returns:
+        TraceRecorder: Trace recorder.
+
+    """
+    return _recorder
+
+
+def span(
+    name: str,
+    category: str = "",
+    **args: Any,  # noqa: ANN401 - any JSON value
+) -> contextlib.AbstractContextManager[None]:
+    """Record the duration of some work with the trace recorder of the current process.
+
+    Args:
+        name: Name of the work, e.g. "parse".
+        category: Category of the work, e.g. "file" or "phase".
+        **args: Details shown with the span, e.g. the file name.
+
+    Returns:
+        contextlib.AbstractContextManager[None]: Context manager.
+
+    """
+    return _recorder.span(name, category, **args)
@@ -7,19 +7,21 @@
 
 from __future__ import annotations
 
+import copy
 import datetime
 import json
 import os
 from typing import TYPE_CHECKING
 
-import gpxpy  # type: ignore[import-untyped]
 import polyline  # type: ignore[import-untyped]
 import s2sphere  # type: ignore[import-untyped]
 
+from gpxtrackposter import metrics, timings, trace, utils
 from gpxtrackposter.exceptions import TrackLoadError
 from gpxtrackposter.units import Units
 
 if TYPE_CHECKING:
+    import gpxpy  # type: ignore[import-untyped]
     import pint  # type: ignore[import-untyped]
     from stravalib.model import (
         SummaryActivity as StravaActivity,  # type: ignore[import-untyped]
@@ -33,7 +35,7 @@ class Track:
 
     Attributes:
         file_names: Basename of a given file passed in load_gpx.
-        polylines: Lines interpolated between each coordinate.
+        polylines: Lines interpolated between each coordinate; assigning new lines resets their hash.
         _start_time: Activity start time.
         _end_time: Activity end time.
         _length_meters: Length of the track (2-dimensional).
@@ -44,6 +46,8 @@ class Track:
         load_gpx: Load a GPX file into the current track.
         bbox: Compute the border box of the track.
         append: Append other track to current track.
+        copy: Return a copy that can be appended to without changing the current track.
+        polylines_hash: Return a hash of the lines, computed once.
         load_cache: Load track from cached json data.
         store_cache: Cache the current track.
 
@@ -52,7 +56,7 @@ class Track:
     def __init__(self) -> None:
         """Initialize the Track class."""
         self.file_names: list[str] = []
-        self.polylines: list[list[s2sphere.LatLng]] = []
+        self.polylines = []
         self._start_time: datetime.datetime | None = None
         self._end_time: datetime.datetime | None = None
         # Don't use Units().meter here, as this constructor is called from
@@ -61,6 +65,28 @@ class Track:
         self.special = False
         self.activity_type = None
 
+    @property
+    def polylines(self) -> list[list[s2sphere.LatLng]]:
+        """Return the lines of the track."""
+        return self._polylines
+
+    @polylines.setter
+    def polylines(self, value: list[list[s2sphere.LatLng]]) -> None:
+        """Set the lines of the track."""
+        self._polylines = value
+        self._polylines_hash: str | None = None
+
+    def polylines_hash(self) -> str:
+        """Return a hash of the lines, computed once, e.g. for the keys of cached fragments drawn from them.
+
+        Returns:
+            str: Hex digest, see utils.polylines_hash.
+
+        """
+        if self._polylines_hash is None:
+            self._polylines_hash = utils.polylines_hash(self.polylines)
+        return self._polylines_hash
+
     def load_gpx(self, file_name: str, timezone_adjuster: TimezoneAdjuster | None) -> None:
         """Load the GPX file into self.
 
@@ -73,6 +99,9 @@ class Track:
             PermissionError: An error occurred while opening the GPX file.
 
         """
+        # gpxpy is only needed for tracks that are not cached
+        import gpxpy  # type: ignore[import-untyped]
+
         try:
             self.file_names = [os.path.basename(file_name)]
             # Handle empty gpx files
@@ -80,8 +109,9 @@ class Track:
             if os.path.getsize(file_name) == 0:
                 msg = "Empty GPX file"
                 raise TrackLoadError(msg)
-            with open(file_name, encoding="utf8") as file:
-                self._load_gpx_data(gpxpy.parse(file), timezone_adjuster)
+            with open(file_name, encoding="utf8") as file, trace.span("parse", "file"):
+                gpx = gpxpy.parse(file)
+            self._load_gpx_data(gpx, timezone_adjuster)
         except TrackLoadError:
             raise
         except gpxpy.gpx.GPXXMLSyntaxException as e:
@@ -211,17 +241,21 @@ class Track:
         if bounds and timezone_adjuster:
             lat, lng = bounds.min_latitude, bounds.min_longitude
             latlng = s2sphere.LatLng.from_degrees(lat, lng)
-            self.set_start_time(timezone_adjuster.adjust(self.start_time(), latlng))
-            self.set_end_time(timezone_adjuster.adjust(self.end_time(), latlng))
+            with timings.phase("timezone lookup"):
+                self.set_start_time(timezone_adjuster.adjust(self.start_time(), latlng))
+                self.set_end_time(timezone_adjuster.adjust(self.end_time(), latlng))
         self._length_meters = gpx.length_2d()
         if self._length_meters <= 0:
             msg = "Track is empty."
             raise TrackLoadError(msg)
-        gpx.simplify()
+        metrics.inc("points_parsed_total", gpx.get_points_no())
+        with trace.span("simplify", "file"):
+            gpx.simplify()
         for t in gpx.tracks:
             for s in t.segments:
                 line = [s2sphere.LatLng.from_degrees(p.latitude, p.longitude) for p in s.points]
                 self.polylines.append(line)
+        metrics.inc("points_simplified_total", sum(len(line) for line in self.polylines))
         if gpx.tracks[0].type:
             self.activity_type = gpx.tracks[0].type.lower()
 
@@ -234,10 +268,23 @@ class Track:
         """
         self._end_time = other.end_time()
         self.polylines.extend(other.polylines)
+        self._polylines_hash = None
         self._length_meters += other.length_meters
         self.file_names.extend(other.file_names)
         self.special = self.special or other.special
 
+    def copy(self) -> Track:
+        """Return a copy of the track that can be appended to without changing this track.
+
+        Returns:
+            Track: Copy of the track.
+
+        """
+        t = copy.copy(self)
+        t.file_names = list(self.file_names)
+        t.polylines = list(self.polylines)
+        return t
+
     def load_cache(self, cache_file_name: str) -> None:
         """Load the track from a previously cached track
 
@@ -17,8 +17,8 @@ import shutil
 from typing import TYPE_CHECKING, Any
 
 import s2sphere  # type: ignore[import-untyped]
-from stravalib import Client  # type: ignore[import-untyped]
 
+from gpxtrackposter import memory, metrics, timings, trace
 from gpxtrackposter.exceptions import ParameterError, TrackLoadError
 from gpxtrackposter.timezone_adjuster import TimezoneAdjuster
 from gpxtrackposter.track import Track
@@ -26,7 +26,7 @@ from gpxtrackposter.units import Units
 from gpxtrackposter.year_range import YearRange
 
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import Callable, Generator
 
     import pint  # type: ignore[import-untyped]
 
@@ -46,7 +46,8 @@ def load_gpx_file(file_name: str, timezone_adjuster: TimezoneAdjuster) -> Track:
     """
     log.info("Loading track %s...", os.path.basename(file_name))
     t = Track()
-    t.load_gpx(file_name, timezone_adjuster)
+    with trace.span("load GPX", "file", file=os.path.basename(file_name)):
+        t.load_gpx(file_name, timezone_adjuster)
     return t
 
 
@@ -66,7 +67,8 @@ def load_cached_track_file(cache_file_name: str, file_name: str) -> Track:
     """
     try:
         t = Track()
-        t.load_cache(cache_file_name)
+        with trace.span("load cache", "file", file=os.path.basename(file_name)):
+            t.load_cache(cache_file_name)
         t.file_names = [os.path.basename(file_name)]
     except Exception as e:
         msg = "Failed to load track from cache."
@@ -75,6 +77,27 @@ def load_cached_track_file(cache_file_name: str, file_name: str) -> Track:
     return t
 
 
+def _local_time(time: datetime.datetime) -> datetime.datetime:
+    # cached tracks have naive local times, parsed tracks local times with timezone
+    return time.replace(tzinfo=None)
+
+
+def _load_in_worker(
+    trace_enabled: bool,
+    load: Callable[..., Track],
+    *args: Any,  # noqa: ANN401 - arguments of load
+) -> tuple[Track, list[dict[str, Any]], list[tuple[str, str, float]]]:
+    # runs in a worker process; returns the track and the trace events and metrics recorded while loading it
+    recorder = trace.recorder()
+    recorder.enable(trace_enabled)
+    # forked workers inherit the events, metrics and memory tracing of the main process
+    recorder.collect()
+    metrics.metrics().collect()
+    memory.stop_in_worker()
+    t = load(*args)
+    return t, recorder.collect(), metrics.metrics().collect()
+
+
 class TrackLoader:
     """Handle the loading of tracks from cache and/or GPX files
 
@@ -87,7 +110,10 @@ class TrackLoader:
 
     Methods:
         clear_cache: Remove cache directory
+        fingerprint: Return a hash of the GPX files without loading them
         load_tracks: Load all data from cache and GPX files
+        update_tracks: Load all data, reading only the GPX files changed since the last call
+        select_tracks: Apply the filters to tracks loaded with other filters
 
     """
 
@@ -99,7 +125,9 @@ class TrackLoader:
         self.year_range: YearRange = YearRange()
         self.cache_dir: str | None = None
         self.strava_cache_file: str = ""
-        self._cache_file_names: dict[str, str] = {}
+        self._checksums: dict[str, tuple[tuple[int, int], str]] = {}
+        # checksum and unmerged track of every GPX file read by update_tracks
+        self._file_tracks: dict[str, tuple[str | None, Track | None]] = {}
         self._activity_type: str = "all"
 
     def set_cache_dir(self, cache_dir: str) -> None:
@@ -143,9 +171,32 @@ class TrackLoader:
         """
         self._activity_type = activity_type.lower()
 
+    @timings.timed("hash files")
+    def fingerprint(self, base_dir: str) -> str:
+        """Return a hash of the names and contents of the GPX files in base_dir without loading them.
+
+        Args:
+            base_dir: Base directory with gpx files.
+
+        Returns:
+            str: Hex digest, equal for equal GPX files.
+
+        """
+        h = hashlib.sha256()
+        for file_name in self._list_gpx_files(base_dir):
+            try:
+                checksum = self._checksum(file_name)
+            except TrackLoadError:
+                checksum = "unreadable"
+            h.update(f"{os.path.basename(file_name)}:{checksum}\n".encode())
+        return h.hexdigest()
+
+    @timings.timed("load tracks")
     def load_tracks(self, base_dir: str) -> list[Track]:
         """Load tracks base_dir and return as a List of tracks.
 
+        The tracks are returned in the same order for the same files, no matter in which order they were loaded.
+
         Args:
             base_dir: Base directory with gpx files.
 
@@ -155,29 +206,83 @@ class TrackLoader:
         """
         file_names = list(self._list_gpx_files(base_dir))
         log.info("GPX files: %d", len(file_names))
+        metrics.inc("files_scanned_total", len(file_names))
+        file_tracks = self._load_file_tracks(file_names)
+        # workers finish in any order, keep the order of the file names
+        tracks = [file_tracks[f] for f in file_names if f in file_tracks]
+        return self._filter_and_merge_tracks(tracks)
 
-        tracks: list[Track] = []
+    @timings.timed("load tracks")
+    def update_tracks(self, base_dir: str) -> list[Track]:
+        """Load tracks of base_dir like load_tracks, reading only the GPX files added or changed since the last call.
 
+        The tracks of every file are kept in memory; removed files are dropped, added and changed files are
+        loaded from cache or parsed. All tracks are filtered and merged again, so that the neighbours of changed
+        tracks are merged correctly.
+
+        Args:
+            base_dir: Base directory with gpx files.
+
+        Returns:
+            list[Track]: A List of tracks.
+
+        """
+        file_names = list(self._list_gpx_files(base_dir))
+        metrics.inc("files_scanned_total", len(file_names))
+        checksums: dict[str, str | None] = {}
+        for file_name in file_names:
+            try:
+                checksums[file_name] = self._checksum(file_name)
+            except TrackLoadError:
+                checksums[file_name] = None
+        changed_file_names = [
+            f
+            for f in file_names
+            if checksums[f] is None or f not in self._file_tracks or self._file_tracks[f][0] != checksums[f]
+        ]
+        removed = len(set(self._file_tracks) - set(file_names))
+        log.info("GPX files: %d, added or changed: %d, removed: %d", len(file_names), len(changed_file_names), removed)
+
+        loaded_tracks = self._load_file_tracks(changed_file_names)
+        file_tracks: dict[str, tuple[str | None, Track | None]] = {}
+        for file_name in file_names:
+            if file_name in loaded_tracks:
+                file_tracks[file_name] = (checksums[file_name], loaded_tracks[file_name])
+            elif file_name in self._file_tracks and file_name not in changed_file_names:
+                file_tracks[file_name] = self._file_tracks[file_name]
+            elif checksums[file_name] is not None:
+                # remember files without valid track, so that they are not parsed again until they change
+                file_tracks[file_name] = (checksums[file_name], None)
+        self._file_tracks = file_tracks
+        tracks = [t for _, t in file_tracks.values() if t is not None]
+        return self._filter_and_merge_tracks(tracks)
+
+    def _load_file_tracks(self, file_names: list[str]) -> dict[str, Track]:
         # load track from cache
         cached_tracks: dict[str, Track] = {}
-        if self.cache_dir:
+        if self.cache_dir and file_names:
             log.info("Trying to load %d track(s) from cache...", len(file_names))
-            cached_tracks = self._load_tracks_from_cache(file_names)
+            with timings.phase("load from cache"):
+                cached_tracks = self._load_tracks_from_cache(file_names)
             log.info("Loaded tracks from cache: %d", len(cached_tracks))
-            tracks = list(cached_tracks.values())
+            metrics.inc("cache_hits_total", len(cached_tracks))
+            metrics.inc("cache_misses_total", len(file_names) - len(cached_tracks))
 
         # load remaining gpx files
+        loaded_tracks: dict[str, Track] = {}
         remaining_file_names = [f for f in file_names if f not in cached_tracks]
         if remaining_file_names:
             log.info("Trying to load %d track(s) from GPX files; this may take a while...", len(remaining_file_names))
-            timezone_adjuster = TimezoneAdjuster()
-            loaded_tracks = self._load_tracks(remaining_file_names, timezone_adjuster)
-            tracks.extend(loaded_tracks.values())
+            with timings.phase("load timezone finder"):
+                timezone_adjuster = TimezoneAdjuster()
+            with timings.phase("parse GPX"):
+                loaded_tracks = self._load_tracks(remaining_file_names, timezone_adjuster)
             log.info("Conventionally loaded tracks: %d", len(loaded_tracks))
-            self._store_tracks_to_cache(loaded_tracks)
-
-        return self._filter_and_merge_tracks(tracks)
+            with timings.phase("store to cache"):
+                self._store_tracks_to_cache(loaded_tracks)
+        return cached_tracks | loaded_tracks
 
+    @timings.timed("load tracks")
     def load_strava_tracks(self, strava_config: str) -> list[Track]:
         """Load strava tracks
 
@@ -198,6 +303,9 @@ class TrackLoader:
                     tracks = [self._strava_cache_to_track(i) for i in strava_cache_data]
                     tracks_names = [track.file_names[0] for track in tracks]
 
+        # stravalib is slow to import and only needed here
+        from stravalib import Client  # type: ignore[import-untyped]
+
         with open(strava_config, encoding="utf8") as f:
             strava_data = json.load(f)
         filter_type = strava_data.pop("activity_type", None)
@@ -225,6 +333,37 @@ class TrackLoader:
         self._store_strava_tracks_to_cache(tracks)
         return self._filter_and_merge_tracks(tracks)
 
+    def select_tracks(self, tracks: list[Track]) -> list[Track]:
+        """Select the tracks matching the filters of this loader from tracks loaded with other filters.
+
+        The special flag of the selected tracks is set according to special_file_names. The given tracks are not
+        changed: tracks whose special flag differs are returned as copies, so that several jobs can select from
+        the same tracks concurrently. Selecting from tracks loaded without year, length and activity filters gives
+        the same tracks as loading them with the filters, except for tracks merged across the boundary of the year
+        range.
+
+        Args:
+            tracks: Loaded tracks.
+
+        Returns:
+            list[Track]: Tracks within the year range, not shorter than the minimum length and of the activity type.
+
+        """
+        selected = []
+        for t in tracks:
+            if not (
+                self.year_range.contains(t.start_time())
+                and t.length() >= self._min_length
+                and self._activity_type in (t.activity_type, "all")
+            ):
+                continue
+            special = any(file_name in self.special_file_names for file_name in t.file_names)
+            if special != t.special:
+                t = t.copy()  # noqa: PLW2901 - the given track is shared
+                t.special = special
+            selected.append(t)
+        return selected
+
     def _filter_tracks(self, tracks: list[Track]) -> list[Track]:
         filtered_tracks = []
         for t in tracks:
@@ -250,29 +389,34 @@ class TrackLoader:
         return [t for t in tracks if self._activity_type in (t.activity_type, "all")]
 
     @staticmethod
+    @timings.timed("merge tracks")
     def _merge_tracks(tracks: list[Track]) -> list[Track]:
         one_hour_seconds = 3600
         log.info("Merging tracks...")
-        tracks = sorted(tracks, key=lambda t1: t1.start_time())
-        merged_tracks = []
+        # file names break ties, so that equal start times give a deterministic order
+        tracks = sorted(tracks, key=lambda t1: (_local_time(t1.start_time()), t1.file_names))
+        merged_tracks: list[Track] = []
         last_end_time = None
+        # the first track of a merge is copied, the loaded tracks stay unchanged for update_tracks
+        copied = False
         for t in tracks:
-            if last_end_time is None:
-                merged_tracks.append(t)
+            start_time = _local_time(t.start_time())
+            if last_end_time is not None and 0 < int((start_time - last_end_time).total_seconds()) < one_hour_seconds:
+                if not copied:
+                    merged_tracks[-1] = merged_tracks[-1].copy()
+                    copied = True
+                merged_tracks[-1].append(t)
             else:
-                dt = int((t.start_time() - last_end_time).total_seconds())
-                if 0 < dt < one_hour_seconds:
-                    merged_tracks[-1].append(t)
-                else:
-                    merged_tracks.append(t)
-            last_end_time = t.end_time()
+                merged_tracks.append(t)
+                copied = False
+            last_end_time = _local_time(t.end_time())
         log.info("Merged %d track(s)", len(tracks) - len(merged_tracks))
         return merged_tracks
 
     def _load_tracks(self, file_names: list[str], timezone_adjuster: TimezoneAdjuster) -> dict[str, Track]:
         tracks = {}
 
-        if self._workers is not None and self._workers <= 1:
+        if len(file_names) <= 1 or (self._workers is not None and self._workers <= 1):
             for file_name in file_names:
                 try:
                     t = load_gpx_file(file_name, timezone_adjuster)
@@ -283,18 +427,24 @@ class TrackLoader:
                     tracks[file_name] = t
             return tracks
 
+        recorder = trace.recorder()
         with concurrent.futures.ProcessPoolExecutor(max_workers=self._workers) as executor:
             future_to_file_name = {
-                executor.submit(load_gpx_file, file_name, timezone_adjuster): file_name for file_name in file_names
+                executor.submit(
+                    _load_in_worker, recorder.enabled, load_gpx_file, file_name, timezone_adjuster
+                ): file_name
+                for file_name in file_names
             }
         for future in concurrent.futures.as_completed(future_to_file_name):
             file_name = future_to_file_name[future]
             try:
-                t = future.result()
+                t, events, values = future.result()
             except TrackLoadError:
                 msg = f"Error while loading {file_name}"
                 log.exception(msg)
             else:
+                recorder.extend(events)
+                metrics.metrics().merge(values)
                 tracks[file_name] = t
 
         return tracks
@@ -302,7 +452,7 @@ class TrackLoader:
     def _load_tracks_from_cache(self, file_names: list[str]) -> dict[str, Track]:
         tracks = {}
 
-        if self._workers is not None and self._workers <= 1:
+        if len(file_names) <= 1 or (self._workers is not None and self._workers <= 1):
             for file_name in file_names:
                 try:
                     t = load_cached_track_file(self._get_cache_file_name(file_name), file_name)
@@ -312,25 +462,35 @@ class TrackLoader:
                     tracks[file_name] = t
             return tracks
 
+        recorder = trace.recorder()
         with concurrent.futures.ProcessPoolExecutor(max_workers=self._workers) as executor:
             future_to_file_name = {
-                executor.submit(load_cached_track_file, self._get_cache_file_name(file_name), file_name): file_name
+                executor.submit(
+                    _load_in_worker,
+                    recorder.enabled,
+                    load_cached_track_file,
+                    self._get_cache_file_name(file_name),
+                    file_name,
+                ): file_name
                 for file_name in file_names
             }
         for future in concurrent.futures.as_completed(future_to_file_name):
             file_name = future_to_file_name[future]
             try:
-                t = future.result()
+                t, events, values = future.result()
             except Exception:
                 log.info("Silently ignore failed cache load attempts.")
             else:
+                recorder.extend(events)
+                metrics.metrics().merge(values)
                 tracks[file_name] = t
 
         return tracks
 
     def _store_track_to_cache(self, file_name: str, track: Track) -> None:
         try:
-            track.store_cache(self._get_cache_file_name(file_name))
+            with trace.span("store cache", "file", file=os.path.basename(file_name)):
+                track.store_cache(self._get_cache_file_name(file_name))
         except Exception:
             msg = f"Failed to store track %s to cache: {file_name}"
             log.exception(msg)
@@ -387,7 +547,7 @@ class TrackLoader:
         if not os.path.isdir(base_dir):
             msg = f"Not a directory: {base_dir}"
             raise ParameterError(msg)
-        for name in os.listdir(base_dir):
+        for name in sorted(os.listdir(base_dir)):
             path_name = os.path.join(base_dir, name)
             if name.endswith(".gpx") and os.path.isfile(path_name):
                 yield path_name
@@ -395,11 +555,21 @@ class TrackLoader:
     def _get_cache_file_name(self, file_name: str) -> str:
         assert self.cache_dir
 
-        if file_name in self._cache_file_names:
-            return self._cache_file_names[file_name]
+        return os.path.join(self.cache_dir, f"{self._checksum(file_name)}.json")
+
+    def _checksum(self, file_name: str) -> str:
+        # reuse the checksum as long as the file was not modified
+        try:
+            stat = os.stat(file_name)
+        except OSError as e:
+            msg = "Failed to compute checksum."
+            raise TrackLoadError(msg) from e
+        version = (stat.st_mtime_ns, stat.st_size)
+        if file_name in self._checksums and self._checksums[file_name][0] == version:
+            return self._checksums[file_name][1]
 
         try:
-            with open(file_name, "rb") as file:
+            with open(file_name, "rb") as file, trace.span("hash", "file", file=os.path.basename(file_name)):
                 checksum = hashlib.sha256(file.read()).hexdigest()
         except PermissionError as e:
             msg = "Failed to compute checksum (bad permissions)."
@@ -408,6 +578,5 @@ class TrackLoader:
             msg = "Failed to compute checksum."
             raise TrackLoadError(msg) from e
 
-        cache_file_name = os.path.join(self.cache_dir, f"{checksum}.json")
-        self._cache_file_names[file_name] = cache_file_name
-        return cache_file_name
+        self._checksums[file_name] = (version, checksum)
+        return checksum
@@ -6,22 +6,87 @@
 # license that can be found in the LICENSE file.
 
 import argparse
+import concurrent.futures
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+from typing import Any
 
 import pint  # type: ignore[import-untyped]
 import svgwrite  # type: ignore[import-untyped]
 
-from gpxtrackposter import utils
+from gpxtrackposter import memory, metrics, trace, utils
+from gpxtrackposter.fragment_cache import FRAGMENT_CACHE_VERSION, FragmentCache, FragmentGroup, serialize
 from gpxtrackposter.poster import Poster
 from gpxtrackposter.quantity_range import QuantityRange
+from gpxtrackposter.style_sheet import StyleKey
+from gpxtrackposter.track import Track
 from gpxtrackposter.xy import XY
 
+log = logging.getLogger("gpxtrackposter")
+
+
+class YearGroup:
+    """Inputs of the `<g id="year{year}">` group of one year.
+
+    Attributes:
+        year: Year
+        tracks: Tracks drawn into the group
+        layout: JSON serializable position, size and other layout values of the group
+        method: Name of the drawer method drawing the group, called with svg drawing, group and kwargs
+        kwargs: Keyword arguments of the method; must be picklable for drawers with parallel_years
+
+    """
+
+    def __init__(self, year: int, tracks: list[Track], layout: list[Any], method: str, kwargs: dict[str, Any]) -> None:
+        """Initialize the YearGroup class."""
+        self.year: int = year
+        self.tracks: list[Track] = tracks
+        self.layout: list[Any] = layout
+        self.method: str = method
+        self.kwargs: dict[str, Any] = kwargs
+
 
 class TracksDrawer:
-    """Base class that other drawer classes inherit from."""
+    """Base class that other drawer classes inherit from.
+
+    Drawers add one `<g id="year{year}">` group per year. Groups added with draw_year_groups are cached
+    between runs by a hash of their inputs, so only the years whose tracks or settings changed are drawn again.
+
+    Attributes:
+        parallel_years: Years are independent and cheap to pass to worker processes, so they may be drawn in parallel.
+
+    """
+
+    parallel_years: bool = False
 
     def __init__(self, the_poster: Poster) -> None:
         """Initialize the TracksDrawer class."""
         self.poster = the_poster
+        self.cache_dir: str | None = None
+        self.workers: int | None = 1
+        self._year_groups: FragmentCache | None = None
+        self._points_drawn: int = 0
+
+    def set_cache_dir(self, cache_dir: str) -> None:
+        """Set the path to the directory drawers may store cached data in.
+
+        Args:
+            cache_dir: The path to the cache directory.
+
+        """
+        self.cache_dir = cache_dir
+
+    def set_workers(self, workers: int | None) -> None:
+        """Set the maximum number of processes drawing years in parallel.
+
+        Args:
+            workers: Number of processes; None uses the number of CPU cores.
+
+        """
+        self.workers = workers
 
     def create_args(self, args_parser: argparse.ArgumentParser) -> None:
         """Add arguments to the parser.
@@ -62,6 +127,172 @@ class TracksDrawer:
 
         """
 
+    def state_key(self) -> list[Any]:
+        """Return the drawer settings the drawn year groups depend on.
+
+        Drawers with own arguments extend the list, otherwise cached year groups ignore changes of them.
+
+        Returns:
+            list[Any]: JSON serializable settings.
+
+        """
+        return [type(self).__name__]
+
+    def draw_year_groups(self, dr: svgwrite.Drawing, g: svgwrite.container.Group, groups: list[YearGroup]) -> None:
+        """Add the groups of several years in the given order, reusing the groups of previous runs.
+
+        The key of a group covers the drawer and poster settings, the tracks and the layout of the year. The style
+        classes requested while drawing are stored with the group and requested again when it is reused, the
+        number of points drawn is stored with the group and counted again. Without cache directory, the groups
+        are neither looked up nor stored, so no keys are computed and no groups are serialized.
+        If parallel_years is set, more than one worker is allowed and processes can be forked, the years not found
+        in the cache are drawn in a process pool; a year whose style classes got other names in its worker is drawn
+        again in this process. Without fork, e.g. on Windows, the years are drawn one after another, because the
+        quantities of a pickled drawer belong to another unit registry than the ones of the worker.
+
+        Args:
+            dr: svg drawing
+            g: svg group the year groups are added to
+            groups: Year groups to draw
+
+        """
+        year_groups = self._get_year_group_cache() if self.cache_dir else None
+        keys: list[str] = []
+        cached: list[dict[str, Any] | None] = [None] * len(groups)
+        if year_groups is not None:
+            keys = [self._year_group_key(group.year, group.tracks, group.layout) for group in groups]
+            cached = [year_groups.get(key) for key in keys]
+        rendered: dict[int, dict[str, Any]] = {}
+        misses = [index for index, entry in enumerate(cached) if entry is None]
+        workers = self.workers or os.cpu_count() or 1
+        if (
+            self.parallel_years
+            and workers > 1
+            and len(misses) > 1
+            and "fork" in multiprocessing.get_all_start_methods()
+        ):
+            pool_groups = [groups[index] for index in misses]
+            rendered = dict(zip(misses, self._render_year_groups_in_pool(pool_groups, workers), strict=True))
+        styles = self.poster.styles
+        for index, group in enumerate(groups):
+            entry = cached[index] or rendered.get(index)
+            if entry is not None and styles.restore(
+                [(tuple(tuple(item) for item in style_key), name) for style_key, name in entry["styles"]]
+            ):
+                g.add(FragmentGroup(entry["svg"]))
+                if year_groups is not None:
+                    year_groups.put(keys[index], entry)
+                # the points of years drawn in workers are counted by the workers
+                if cached[index] is not None:
+                    self.count_points(entry["points"])
+                continue
+            g_year, record, points = self._render_year_group(dr, group)
+            if year_groups is not None:
+                year_groups.put(keys[index], {"svg": serialize(g_year), "styles": record, "points": points})
+            g.add(g_year)
+
+    def _render_year_group(
+        self, dr: svgwrite.Drawing, group: YearGroup
+    ) -> tuple[svgwrite.container.Group, list[tuple[StyleKey, str]], int]:
+        g_year = dr.g(id=f"year{group.year}")
+        points = self._points_drawn
+        with self.poster.styles.record() as record:
+            getattr(self, group.method)(dr, g_year, **group.kwargs)
+        return g_year, record, self._points_drawn - points
+
+    def _render_year_groups_in_pool(self, groups: list[YearGroup], workers: int) -> list[dict[str, Any]]:
+        workers = min(workers, len(groups))
+        log.info("Drawing %d years with %d workers", len(groups), workers)
+        # forked workers inherit the drawer and its tracks without pickling them
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_year_worker,
+            initargs=(self,),
+        ) as executor:
+            # the tracks are only needed for the key, do not send them to the workers
+            futures = [executor.submit(_render_year_worker, group.year, group.method, group.kwargs) for group in groups]
+        entries = []
+        for future in futures:
+            entry, events, values = future.result()
+            trace.recorder().extend(events)
+            metrics.metrics().merge(values)
+            entries.append(entry)
+        return entries
+
+    def flush_year_groups(self) -> None:
+        """Store the year groups of this run in the cache directory."""
+        if self._year_groups is not None:
+            self._year_groups.flush()
+
+    def _get_year_group_cache(self) -> FragmentCache:
+        assert self.cache_dir is not None
+        file_name = os.path.join(self.cache_dir, f"{type(self).__name__.lower()}_years.json")
+        if self._year_groups is None or self._year_groups.file_name != file_name:
+            self._year_groups = FragmentCache(file_name)
+        return self._year_groups
+
+    def _year_group_key(self, year: int, tracks: list[Track], layout: list[Any]) -> str:
+        poster = self.poster
+        data = [
+            FRAGMENT_CACHE_VERSION,
+            year,
+            self.state_key(),
+            poster.colors,
+            poster.units,
+            poster.special_distance,
+            poster.coordinate_precision(),
+            poster.svg_paths,
+            poster.with_animation,
+            poster.animation_time,
+            [str(poster.length_range.lower()), str(poster.length_range.upper())],
+            [str(poster.length_range_by_date.lower()), str(poster.length_range_by_date.upper())],
+            [poster.month_name(month) for month in range(1, 13)],
+            poster.u(),
+            vars(poster.locale_data),
+            [[tr.polylines_hash(), tr.start_time().isoformat(), str(tr.length()), tr.special] for tr in tracks],
+            layout,
+        ]
+        return hashlib.sha256(json.dumps(data, default=repr).encode("utf8")).hexdigest()
+
+    def polyline(
+        self,
+        dr: svgwrite.Drawing,
+        line: list[tuple[float, float]],
+        precision: int | None = None,
+        **extra: str | float,
+    ) -> svgwrite.base.BaseElement:
+        """Create a line element with coordinates rounded to the poster's precision.
+
+        Depending on the poster settings, the line is emitted as polyline or as relative path data.
+
+        Args:
+            dr: svg drawing
+            line: List of x, y tuples.
+            precision: Number of decimals; defaults to the poster's coordinate precision.
+            extra: Additional SVG attributes.
+
+        Returns:
+            svgwrite.base.BaseElement: Polyline or path element.
+
+        """
+        if precision is None:
+            precision = self.poster.coordinate_precision()
+        self.count_points(len(line))
+        if self.poster.svg_paths:
+            return dr.path(d=utils.line_to_path_data(line, precision), **extra)
+        return dr.polyline(points=utils.quantize_line(line, precision), **extra)
+
+    def count_points(self, points: int) -> None:
+        """Count track points drawn as lines, also those of fragments taken from a cache.
+
+        Args:
+            points: Number of points.
+
+        """
+        self._points_drawn += points
+        metrics.inc("points_drawn_total", points)
+
     def color(self, length_range: QuantityRange, length: pint.Quantity, is_special: bool = False) -> str:
         """Define special color.
 
@@ -76,4 +307,31 @@ class TracksDrawer:
         """
         color1 = self.poster.colors["special"] if is_special else self.poster.colors["track"]
         color2 = self.poster.colors["special2"] if is_special else self.poster.colors["track2"]
-        return utils.interpolate_color(color1, color2, length_range.relative_position(length))
+        return utils.gradient_color(utils.color_gradient(color1, color2), length_range.relative_position(length))
+
+
+# drawer of a worker process drawing years in parallel
+_year_worker_drawer: TracksDrawer | None = None
+
+
+def _init_year_worker(drawer: TracksDrawer) -> None:
+    global _year_worker_drawer  # noqa: PLW0603
+    _year_worker_drawer = drawer
+    # forked workers inherit the trace events, the metrics and the memory tracing of the main process
+    trace.recorder().collect()
+    metrics.metrics().reset()
+    memory.stop_in_worker()
+
+
+def _render_year_worker(
+    year: int, method: str, kwargs: dict[str, Any]
+) -> tuple[dict[str, Any], list[dict[str, Any]], list[tuple[str, str, float]]]:
+    assert _year_worker_drawer is not None
+    group = YearGroup(year, [], [], method, kwargs)
+    with trace.span("draw year", "year", year=year):
+        g_year, record, points = _year_worker_drawer._render_year_group(svgwrite.Drawing(), group)  # noqa: SLF001
+    return (
+        {"svg": serialize(g_year), "styles": record, "points": points},
+        trace.recorder().collect(),
+        metrics.metrics().collect(),
+    )
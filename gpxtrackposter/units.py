@@ -7,18 +7,29 @@
 
 from __future__ import annotations
 
+import threading
+
 import pint
 
 
 class Units:
     """Unit class."""
 
-    _instance = None
+    _instance: pint.UnitRegistry | None = None
+    # quantities of different registries cannot be combined, so threads must not create a registry each
+    _lock = threading.Lock()
 
     def __init__(self) -> None:
         """Initialize the Units class."""
         if not Units._instance:
-            Units._instance = pint.UnitRegistry()
+            with Units._lock:
+                if not Units._instance:
+                    # parsing the unit definitions takes long, pint caches the parsed definitions
+                    # in the user's cache dir
+                    try:
+                        Units._instance = pint.UnitRegistry(cache_folder=":auto:")
+                    except OSError:
+                        Units._instance = pint.UnitRegistry()
 
     def __getattr__(self, name: str) -> pint.Unit:
         """Get a unit."""
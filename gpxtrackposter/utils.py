@@ -7,10 +7,15 @@
 
 from __future__ import annotations
 
+import functools
+import hashlib
 import locale
 import math
+import os
+import secrets
+import struct
 from itertools import count as itercount
-from itertools import takewhile
+from itertools import pairwise, takewhile
 from typing import TYPE_CHECKING
 
 import colour  # type: ignore[import-untyped]
@@ -21,6 +26,12 @@ if TYPE_CHECKING:
 from gpxtrackposter.value_range import ValueRange
 from gpxtrackposter.xy import XY
 
+# number of entries of a precomputed color gradient
+COLOR_GRADIENT_STEPS = 256
+
+# print resolution used to derive the default coordinate precision
+DEFAULT_DPI = 300
+
 
 # mercator projection
 def latlng2xy(latlng: s2sphere.LatLng) -> XY:
@@ -103,6 +114,78 @@ def project(
     return lines
 
 
+def default_precision(dpi: int = DEFAULT_DPI) -> int:
+    """Return the number of decimals needed to place coordinates at the given print resolution.
+
+    Poster coordinates are millimetres (the viewbox equals the poster size), so the rounding error
+    has to stay below half a printed pixel of 25.4 / dpi millimetres.
+
+    Args:
+        dpi: Print resolution in dots per inch.
+
+    Returns:
+        int: Number of decimals.
+
+    """
+    pixel_size = 25.4 / dpi
+    return max(0, math.ceil(-math.log10(pixel_size)))
+
+
+def quantize_line(line: list[tuple[float, float]], precision: int) -> list[tuple[float, float]]:
+    """Round the points of a line and remove consecutive duplicates.
+
+    Args:
+        line: List of x, y tuples.
+        precision: Number of decimals.
+
+    Returns:
+        list[tuple[float, float]]: Rounded line without consecutive duplicate points.
+
+    """
+    quantized: list[tuple[float, float]] = []
+    for x, y in line:
+        point = (round(x, precision) + 0.0, round(y, precision) + 0.0)
+        if not quantized or quantized[-1] != point:
+            quantized.append(point)
+    return quantized
+
+
+def line_to_path_data(line: list[tuple[float, float]], precision: int) -> str:
+    """Encode a line as relative SVG path data (`m x,y l dx,dy ...`).
+
+    The points are rounded on an integer grid before computing the relative moves, so rounding
+    errors do not accumulate along the line. Consecutive duplicate points are removed.
+
+    Args:
+        line: List of x, y tuples.
+        precision: Number of decimals.
+
+    Returns:
+        str: SVG path data.
+
+    """
+    scale = 10**precision
+
+    def fmt(value: int) -> str:
+        if precision == 0:
+            return str(value)
+        text = f"{value / scale:.{precision}f}".rstrip("0").rstrip(".")
+        return "0" if text == "-0" else text
+
+    points: list[tuple[int, int]] = []
+    for x, y in line:
+        point = (round(x * scale), round(y * scale))
+        if not points or points[-1] != point:
+            points.append(point)
+    if not points:
+        return ""
+    data = f"m{fmt(points[0][0])},{fmt(points[0][1])}"
+    if len(points) > 1:
+        deltas = [f"{fmt(p[0] - q[0])},{fmt(p[1] - q[1])}" for q, p in pairwise(points)]
+        data += "l" + " ".join(deltas)
+    return data
+
+
 def compute_bounds_xy(lines: list[list[XY]]) -> tuple[ValueRange, ValueRange]:
     """Compute boundaries of a list of XY objects.
 
@@ -125,6 +208,11 @@ def compute_bounds_xy(lines: list[list[XY]]) -> tuple[ValueRange, ValueRange]:
 def compute_grid(count: int, dimensions: XY) -> tuple[float | None, tuple[int, int] | None]:
     """Compute a grid with a given number of fields and dimensions.
 
+    The grid with the least wasted area is chosen; on ties, the one with the fewest columns and rows.
+    For a given number of columns, the fewest rows holding all fields waste the least area, and all column
+    counts sharing that number of rows are beaten by the smallest of them. So only O(sqrt(count)) column
+    counts need to be checked.
+
     Args:
         count: Number of fields to generate grid for.
         dimensions: Dimensions of grid.
@@ -133,23 +221,37 @@ def compute_grid(count: int, dimensions: XY) -> tuple[float | None, tuple[int, i
         tuple[Optional[float], Optional[tuple[int, int]]]: Tuple of best size and best counts for y and y.
 
     """
-    # this is somehow suboptimal O(count^2). I guess it's possible in O(count)
     min_waste = -1.0
     best_size = None
     best_counts = None
-    for count_x in range(1, count + 1):
+
+    def check_columns(count_x: int) -> bool:
+        """Check the best grid with count_x columns, return False if rounding skipped the fewest rows."""
+        nonlocal min_waste, best_size, best_counts
         size_x = dimensions.x / count_x
-        for count_y in range(1, count + 1):
-            if count_x * count_y >= count:
-                size_y = dimensions.y / count_y
-                size = min(size_x, size_y)
-                waste = dimensions.x * dimensions.y - count * size * size
-                if waste < 0:
-                    continue
-                if best_size is None or waste < min_waste:
-                    best_size = size
-                    best_counts = count_x, count_y
-                    min_waste = waste
+        min_count_y = -(-count // count_x)
+        for count_y in range(min_count_y, count + 1):
+            size = min(size_x, dimensions.y / count_y)
+            waste = dimensions.x * dimensions.y - count * size * size
+            if waste < 0:
+                continue
+            if best_size is None or waste < min_waste:
+                best_size = size
+                best_counts = count_x, count_y
+                min_waste = waste
+            return count_y == min_count_y
+        return False
+
+    count_x = 1
+    while count_x <= count:
+        count_y = -(-count // count_x)
+        # first number of columns needing fewer rows
+        next_count_x = count + 1 if count_y == 1 else -(-count // (count_y - 1))
+        if not check_columns(count_x):
+            # floating point rounding made the fewest rows invalid, check the whole group
+            for other_count_x in range(count_x + 1, next_count_x):
+                check_columns(other_count_x)
+        count_x = next_count_x
     return best_size, best_counts
 
 
@@ -179,6 +281,59 @@ def interpolate_color(color1: str, color2: str, ratio: float) -> str:
     return c3.hex_l
 
 
+@functools.lru_cache(maxsize=32)
+def color_gradient(color1: str, color2: str, steps: int = COLOR_GRADIENT_STEPS) -> tuple[str, ...]:
+    """Precompute a color gradient between two colors as a lookup table.
+
+    Args:
+        color1: First color.
+        color2: Second color.
+        steps: Number of entries of the gradient.
+
+    Returns:
+        tuple[str, ...]: Interpolated colors from color1 to color2.
+
+    """
+    if steps < 2:
+        return (interpolate_color(color1, color2, 0),)
+    return tuple(interpolate_color(color1, color2, i / (steps - 1)) for i in range(steps))
+
+
+def gradient_color(gradient: tuple[str, ...], ratio: float) -> str:
+    """Look up the color for a ratio in a precomputed color gradient.
+
+    Args:
+        gradient: Precomputed color gradient, see color_gradient.
+        ratio: Ratio between first and last color of the gradient.
+
+    Returns:
+        str: Color of the gradient entry closest to the ratio.
+
+    """
+    if ratio <= 0:
+        return gradient[0]
+    if ratio >= 1:
+        return gradient[-1]
+    return gradient[round(ratio * (len(gradient) - 1))]
+
+
+def polylines_hash(latlnglines: list[list[s2sphere.LatLng]]) -> str:
+    """Return a hash of the content of latitude, longitude lines.
+
+    Args:
+        latlnglines: Latitude, longitude lines.
+
+    Returns:
+        str: Hex digest, equal for lines with equal coordinates.
+
+    """
+    h = hashlib.sha256()
+    for line in latlnglines:
+        h.update(struct.pack(f"<{2 * len(line)}d", *(d for ll in line for d in (ll.lat().degrees, ll.lng().degrees))))
+        h.update(b"|")
+    return h.hexdigest()
+
+
 def format_float(f: float) -> str:
     """Format a float value to a one digit str.
 
@@ -192,6 +347,20 @@ def format_float(f: float) -> str:
     return locale.format_string("%.1f", f)
 
 
+def format_number(value: float, digits: int = 6) -> str:
+    """Format a number for SVG attributes with a number of significant digits, independent of the locale.
+
+    Args:
+        value: Number to format.
+        digits: Number of significant digits.
+
+    Returns:
+        str: Formatted number without trailing zeros.
+
+    """
+    return f"{value + 0.0:.{digits}g}"
+
+
 def make_key_times(year_count: int) -> list[str]:
     """Should append `1` because the svg keyTimes rule
 
@@ -205,3 +374,27 @@ def make_key_times(year_count: int) -> list[str]:
     s = list(takewhile(lambda n: n < 1, itercount(0, 1 / year_count)))
     s.append(1)
     return [str(round(i, 2)) for i in s]
+
+
+def write_file_atomic(file_name: str, data: bytes) -> None:
+    """Write data to a file via a temporary file, so readers never see a partially written file.
+
+    The file gets the permissions of files created with open, e.g. readable by other users for the umask 022.
+
+    Args:
+        file_name: Name of the file; missing directories are created.
+        data: Data to write.
+
+    """
+    directory = os.path.dirname(file_name) or "."
+    os.makedirs(directory, exist_ok=True)
+    tmp_name = os.path.join(directory, f".{os.path.basename(file_name)}.{secrets.token_hex(8)}.tmp")
+    # unlike tempfile.mkstemp, which creates files readable by the owner only, the umask applies to the mode
+    fd = os.open(tmp_name, os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, file_name)
+    except OSError:
+        os.remove(tmp_name)
+        raise
@@ -0,0 +1,227 @@
+"""Watch a directory for added, changed and removed GPX files"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import contextlib
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import time
+from typing import TYPE_CHECKING
+
+from gpxtrackposter.exceptions import ParameterError, PosterError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+log = logging.getLogger("gpxtrackposter")
+
+# seconds without further changes before rendering again
+DEFAULT_DEBOUNCE = 2.0
+# seconds between two scans of the directory if inotify is not available
+DEFAULT_POLL_INTERVAL = 1.0
+
+# inotify events of files written, moved or removed, see inotify(7)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_EVENT = struct.Struct("iIII")
+
+
+class DirectoryWatcher:
+    """Wait for changes of the GPX files of a directory.
+
+    Uses inotify on Linux and scans the directory periodically on other systems.
+
+    Attributes:
+        base_dir: Directory of the GPX files.
+        poll_interval: Seconds between two scans of the directory if inotify is not available.
+
+    Methods:
+        wait: Wait for a change of a GPX file.
+        wait_for_changes: Wait for changes and until no further change happens for a while.
+        close: Stop watching the directory.
+
+    """
+
+    def __init__(self, base_dir: str, poll_interval: float = DEFAULT_POLL_INTERVAL, use_inotify: bool = True) -> None:
+        """Start watching the directory.
+
+        Args:
+            base_dir: Directory of the GPX files.
+            poll_interval: Seconds between two scans of the directory if inotify is not available.
+            use_inotify: Use inotify if available, otherwise always scan the directory.
+
+        Raises:
+            ParameterError: The directory does not exist.
+
+        """
+        if not os.path.isdir(base_dir):
+            msg = f"Not a directory: {base_dir}"
+            raise ParameterError(msg)
+        self.base_dir = base_dir
+        self.poll_interval = poll_interval
+        self._fd = _inotify_watch(base_dir) if use_inotify else None
+        self._snapshot = self._scan() if self._fd is None else {}
+        log.info("Watching %s %s", base_dir, "with inotify" if self._fd is not None else "by polling")
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait for a GPX file to be added, changed or removed.
+
+        Args:
+            timeout: Maximum seconds to wait, None to wait forever.
+
+        Returns:
+            bool: True if a GPX file changed, False if the timeout expired.
+
+        """
+        if self._fd is not None:
+            return self._wait_inotify(timeout)
+        return self._wait_polling(timeout)
+
+    def wait_for_changes(self, debounce: float = DEFAULT_DEBOUNCE) -> None:
+        """Wait for a change of a GPX file and until no further change happens for debounce seconds.
+
+        Files copied into the directory one after another thus cause a single update.
+
+        Args:
+            debounce: Seconds without changes to wait for after the first change.
+
+        """
+        while not self.wait():
+            pass
+        while self.wait(debounce):
+            pass
+
+    def close(self) -> None:
+        """Stop watching the directory."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _wait_inotify(self, timeout: float | None) -> bool:
+        assert self._fd is not None
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if not readable:
+                return False
+            if self._read_events():
+                return True
+
+    def _read_events(self) -> bool:
+        assert self._fd is not None
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = _IN_EVENT.unpack_from(data, offset)
+                offset += _IN_EVENT.size
+                name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & _IN_Q_OVERFLOW or name.endswith(b".gpx"):
+                    changed = True
+
+    def _wait_polling(self, timeout: float | None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            if snapshot != self._snapshot:
+                self._snapshot = snapshot
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            interval = self.poll_interval if deadline is None else min(self.poll_interval, deadline - time.monotonic())
+            time.sleep(max(0.0, interval))
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        try:
+            entries = list(os.scandir(self.base_dir))
+        except OSError:
+            return {}
+        for entry in entries:
+            if not entry.name.endswith(".gpx"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+
+def _inotify_watch(base_dir: str) -> int | None:
+    # inotify is part of the C library on Linux; returns None elsewhere or if no watch can be added
+    if not hasattr(os, "O_NONBLOCK"):
+        return None
+    library = ctypes.util.find_library("c")
+    if library is None:
+        return None
+    try:
+        libc = ctypes.CDLL(library, use_errno=True)
+        inotify_init1 = libc.inotify_init1
+        inotify_add_watch = libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    fd = inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    if fd < 0:
+        log.info("inotify is not available: %s", os.strerror(ctypes.get_errno()))
+        return None
+    mask = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE
+    if inotify_add_watch(fd, os.fsencode(base_dir), mask) < 0:
+        log.info("Cannot watch %s with inotify: %s", base_dir, os.strerror(ctypes.get_errno()))
+        os.close(fd)
+        return None
+    return fd
+
+
+def watch(
+    base_dir: str,
+    on_change: Callable[[], None],
+    debounce: float = DEFAULT_DEBOUNCE,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    watcher: DirectoryWatcher | None = None,
+) -> None:
+    """Call on_change after GPX files of base_dir were added, changed or removed, until interrupted.
+
+    Errors of on_change are logged and do not stop watching, e.g. for a poster without tracks.
+
+    Args:
+        base_dir: Directory of the GPX files.
+        on_change: Function called after changes, e.g. rendering the poster again.
+        debounce: Seconds without further changes to wait for before calling on_change.
+        poll_interval: Seconds between two scans of the directory if inotify is not available.
+        watcher: Watcher of base_dir created before the first rendering, so that changes during the first rendering
+            cause a call of on_change; closed by the caller. None to start watching now.
+
+    """
+    if watcher is None:
+        with contextlib.closing(DirectoryWatcher(base_dir, poll_interval)) as new_watcher:
+            watch(base_dir, on_change, debounce, poll_interval, new_watcher)
+        return
+    try:
+        while True:
+            watcher.wait_for_changes(debounce)
+            log.info("GPX files of %s changed", base_dir)
+            try:
+                on_change()
+            except PosterError as e:
+                log.error(e)  # noqa: TRY400 - the message is enough
+    except KeyboardInterrupt:
+        pass
@@ -56,6 +56,7 @@ def fixture_default_values() -> Namespace:
         special_color2=None,
         units="metric",
         clear_cache=False,
+        force=False,
         verbose=False,
         special_distance=10.0,
         special_distance2=20.0,
@@ -65,6 +66,9 @@ def fixture_default_values() -> Namespace:
         animation_time=30,
         workers=None,
         from_strava=None,
+        dpi=300,
+        precision=None,
+        svg_paths=False,
     )
 
 
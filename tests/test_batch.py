@@ -0,0 +1,95 @@
+"""Several tests for batch jobs"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from gpxtrackposter import batch
+from gpxtrackposter.cli import create_parser
+from gpxtrackposter.exceptions import ParameterError, PosterError
+
+if TYPE_CHECKING:
+    import argparse
+    from pathlib import Path
+
+    from gpxtrackposter.track import Track
+
+
+def render_or_fail(tracks: list[Track], args: argparse.Namespace) -> None:  # noqa: ARG001
+    """Render function failing for the output fail.svg"""
+    if args.output == "fail.svg":
+        msg = "failed"
+        raise PosterError(msg)
+
+
+def test_load_job_file_applies_defaults(tmp_path: Path) -> None:
+    """Test the defaults are added to every job of a JSON file"""
+    job_file = tmp_path / "jobs.json"
+    job_file.write_text(
+        json.dumps({"defaults": {"athlete": "Jane", "year": "2020"}, "jobs": [{"type": "grid"}, {"year": "2021"}]})
+    )
+    assert batch.load_job_file(str(job_file)) == [
+        {"athlete": "Jane", "year": "2020", "type": "grid"},
+        {"athlete": "Jane", "year": "2021"},
+    ]
+
+
+def test_load_job_file_reads_toml(tmp_path: Path) -> None:
+    """Test a TOML job file gives the same jobs as a JSON file"""
+    job_file = tmp_path / "jobs.toml"
+    job_file.write_text('[defaults]\nathlete = "Jane"\n\n[[jobs]]\ntype = "calendar"\nspecial = ["a.gpx", "b.gpx"]\n')
+    assert batch.load_job_file(str(job_file)) == [
+        {"athlete": "Jane", "type": "calendar", "special": ["a.gpx", "b.gpx"]}
+    ]
+
+
+@pytest.mark.parametrize("content", ["[]", "{}", '{"jobs": []}', '{"jobs": [1]}', '{"jobs": [{}], "defaults": 1}', "{"])
+def test_load_job_file_with_invalid_content_raises_parameter_error(tmp_path: Path, content: str) -> None:
+    """Test invalid job files"""
+    job_file = tmp_path / "jobs.json"
+    job_file.write_text(content)
+    with pytest.raises(ParameterError):
+        batch.load_job_file(str(job_file))
+
+
+def test_job_arguments_override_command_line_options() -> None:
+    """Test job options override the command line options and keep the others"""
+    parser = create_parser()
+    args = parser.parse_args(["--athlete", "Jane", "--type", "grid", "--special", "a.gpx"])
+    job_args = batch.job_arguments(
+        parser,
+        args,
+        {"type": "calendar", "track-color": "#FF0000", "min_distance": 5, "with-animation": True, "special": ["b.gpx"]},
+    )
+    assert job_args.athlete == "Jane"
+    assert job_args.type == "calendar"
+    assert job_args.track_color == "#FF0000"
+    assert job_args.min_distance == 5.0
+    assert job_args.with_animation
+    assert job_args.special == ["a.gpx", "b.gpx"]
+    assert args.type == "grid"
+    assert args.special == ["a.gpx"]
+
+
+@pytest.mark.parametrize("job", [{"colour": "red"}, {"gpx-dir": "other"}, {"workers": 2}])
+def test_job_arguments_with_unknown_or_shared_option_raises_parameter_error(job: dict) -> None:
+    """Test jobs cannot set unknown options or options shared by all jobs"""
+    parser = create_parser()
+    with pytest.raises(ParameterError):
+        batch.job_arguments(parser, parser.parse_args([]), job)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_jobs_continues_after_failed_job(workers: int) -> None:
+    """Test a failing job does not stop the other jobs"""
+    parser = create_parser()
+    jobs = [parser.parse_args(["--output", output]) for output in ["a.svg", "fail.svg", "b.svg"]]
+    assert batch.run_jobs(render_or_fail, [], jobs, workers) == [True, False, True]
@@ -5,16 +5,20 @@
 # Use of this source code is governed by a MIT-style
 # license that can be found in the LICENSE file.
 
+import datetime as dt
 from argparse import ArgumentParser
+from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
+import svgwrite  # type: ignore[import-untyped]
 from pytest_mock import MockerFixture
 
 from gpxtrackposter.calendar_drawer import CalendarDrawer
 from gpxtrackposter.exceptions import PosterError
 from gpxtrackposter.poster import Poster
 from gpxtrackposter.units import Units
+from gpxtrackposter.xy import XY
 
 
 @pytest.mark.full_run
@@ -74,3 +78,79 @@ def test_run_drawer_with_animation(
     poster.set_tracks([mock_track_instance_berlin_paris, mock_track_instance_amsterdam_paris])
     assert len(poster.tracks) != 0
     poster.draw(calendar_drawer, args.output)
+
+
+def test_year_groups_are_cached_between_runs(
+    poster: Poster,
+    mock_track_instance_berlin_paris: MagicMock,
+    tmp_path: Path,
+    mocker: MockerFixture,
+) -> None:
+    """Test a second run with a new drawer reuses the unchanged year groups"""
+    poster.set_tracks([mock_track_instance_berlin_paris])
+    results = []
+    for _ in range(2):
+        drawer = CalendarDrawer(poster)
+        drawer.set_cache_dir(str(tmp_path))
+        draw_year = mocker.spy(drawer, "_draw")
+        poster.styles.clear()
+        dr = svgwrite.Drawing()
+        g = dr.g()
+        drawer.draw(dr, g, XY(200, 300), XY(10, 10))
+        drawer.flush_year_groups()
+        results.append((draw_year.call_count, g.tostring(), poster.styles.css()))
+    assert results[0][0] == 1
+    assert results[1][0] == 0
+    assert results[0][1:] == results[1][1:]
+    assert 'id="year' in results[1][1]
+
+    mock_track_instance_berlin_paris.length.return_value = 10 * Units().km
+    poster.set_tracks([mock_track_instance_berlin_paris])
+    drawer = CalendarDrawer(poster)
+    drawer.set_cache_dir(str(tmp_path))
+    draw_year = mocker.spy(drawer, "_draw")
+    dr = svgwrite.Drawing()
+    drawer.draw(dr, dr.g(), XY(200, 300), XY(10, 10))
+    assert draw_year.call_count == 1
+
+
+def test_years_drawn_in_parallel_match_sequential_drawing(
+    poster: Poster,
+    mock_track_instance_berlin_paris: MagicMock,
+    mocker: MockerFixture,
+) -> None:
+    """Test years drawn by several worker processes give the same poster as drawing them one after another"""
+    poster.set_tracks([mock_track_instance_berlin_paris])
+    poster.years.add(dt.datetime(dt.datetime.now().year - 2, 1, 1))
+    results = []
+    for workers in [1, 2]:
+        drawer = CalendarDrawer(poster)
+        drawer.set_workers(workers)
+        pool = mocker.spy(drawer, "_render_year_groups_in_pool")
+        poster.styles.clear()
+        dr = svgwrite.Drawing()
+        g = dr.g()
+        drawer.draw(dr, g, XY(200, 300), XY(10, 10))
+        assert pool.call_count == (workers > 1)
+        results.append((g.tostring(), poster.styles.css()))
+    assert results[0] == results[1]
+    assert results[0][0].count('id="year') == 3
+
+
+def test_years_drawn_sequentially_without_fork(
+    poster: Poster,
+    mock_track_instance_berlin_paris: MagicMock,
+    mocker: MockerFixture,
+) -> None:
+    """Test years are drawn in this process if worker processes cannot be forked, e.g. on Windows"""
+    poster.set_tracks([mock_track_instance_berlin_paris])
+    poster.years.add(dt.datetime(dt.datetime.now().year - 2, 1, 1))
+    mocker.patch("multiprocessing.get_all_start_methods", return_value=["spawn"])
+    drawer = CalendarDrawer(poster)
+    drawer.set_workers(2)
+    pool = mocker.spy(drawer, "_render_year_groups_in_pool")
+    dr = svgwrite.Drawing()
+    g = dr.g()
+    drawer.draw(dr, g, XY(200, 300), XY(10, 10))
+    assert pool.call_count == 0
+    assert g.tostring().count('id="year') == 3
@@ -6,24 +6,29 @@
 # license that can be found in the LICENSE file.
 
 import argparse
-import datetime
+import json
 import logging
-from unittest.mock import MagicMock, patch
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
 
 import pytest
-from pytest_mock import MockerFixture
 
+from gpxtrackposter import memory, metrics, timings
 from gpxtrackposter.cli import (
+    add_drawer_args,
     create_parser,
     parse_args,
+    report_memory,
+    report_metrics,
+    report_timings,
+    run_batch,
     setup_loader,
     setup_logging,
-    setup_poster,
 )
 from gpxtrackposter.exceptions import ParameterError
-from gpxtrackposter.poster import Poster
 from gpxtrackposter.track_loader import TrackLoader
-from gpxtrackposter.units import Units
 
 
 def test_create_parser_without_args_sets_default_values(default_values: argparse.Namespace) -> None:
@@ -53,6 +58,52 @@ def test_setup_logging_verbose_sets_logger_level_info() -> None:
     assert logger.getEffectiveLevel() == logging.INFO
 
 
+def test_setup_logging_verbose_adds_one_stream_handler() -> None:
+    """Test verbose logging is shown without a log file"""
+    setup_logging(verbose=True)
+    logger = setup_logging(verbose=True)
+    assert [type(handler) for handler in logger.handlers].count(logging.StreamHandler) == 1
+
+
+def test_report_timings_writes_json_file(default_values: argparse.Namespace, tmp_path: Path) -> None:
+    """Test the timings of the phases are written to the --timings-json file"""
+    timings.timings().reset()
+    with timings.phase("draw"):
+        pass
+    default_values.timings_json = str(tmp_path / "timings.json")
+    report_timings(default_values)
+    with open(default_values.timings_json, encoding="utf8") as f:
+        report = json.load(f)
+    assert [p["name"] for p in report["phases"]] == ["draw"]
+
+
+def test_report_metrics_writes_prometheus_textfile(default_values: argparse.Namespace, tmp_path: Path) -> None:
+    """Test the metrics and the phase timings of the run are written to the --metrics file"""
+    timings.timings().reset()
+    metrics.metrics().reset()
+    with timings.phase("draw"):
+        metrics.inc("points_drawn_total", 5)
+    default_values.metrics = str(tmp_path / "gpxtrackposter.prom")
+    report_metrics(default_values)
+    lines = Path(default_values.metrics).read_text(encoding="utf8").splitlines()
+    assert "gpxtrackposter_points_drawn_total 5.0" in lines
+    assert any(line.startswith('gpxtrackposter_phase_seconds{phase="draw"} ') for line in lines)
+
+
+def test_report_memory_writes_json_file(default_values: argparse.Namespace, tmp_path: Path) -> None:
+    """Test the memory of the phases is written to the --memory-report file and tracing stops"""
+    memory.report().reset()
+    memory.report().enable()
+    with timings.phase("draw"):
+        pass
+    default_values.memory_report = str(tmp_path / "memory.json")
+    report_memory(default_values)
+    with open(default_values.memory_report, encoding="utf8") as f:
+        report = json.load(f)
+    assert [p["name"] for p in report["phases"]] == ["draw"]
+    assert not memory.report().enabled
+
+
 def test_setup_logging_logfile_sets_file_handler() -> None:
     """Test setup of logging"""
     logger = setup_logging(logfile="logger.log")
@@ -86,56 +137,53 @@ def test_setup_loader_with_invalid_year_raises_parameter_error(default_values: a
         setup_loader(default_values)
 
 
-def test_setup_poster_returns_instance_of_poster_with_default_size(
-    mocker: MockerFixture,
-    mock_track_instance_berlin_paris: MagicMock,
-    mock_track_instance_amsterdam_paris: MagicMock,
-    default_values: argparse.Namespace,
-) -> None:
-    """Test setup of poster with default values from argparser"""
-    mocker.patch("gpxtrackposter.poster.Poster.draw", return_value=None)
-    poster = setup_poster([mock_track_instance_berlin_paris, mock_track_instance_amsterdam_paris], default_values)
-    assert poster
-    assert isinstance(poster, Poster)
-    # default height and width of poster
-    assert poster.height == 300
-    assert poster.width == 200
-
-
-def test_setup_poster_type_github_returns_instance_of_poster_with_modified_height(
-    mocker: MockerFixture,
-    mock_track_instance_berlin_paris: MagicMock,
-    mock_track_instance_amsterdam_paris: MagicMock,
-    default_values: argparse.Namespace,
-) -> None:
-    """Test setup of poster with type GitHub"""
-    mocker.patch("gpxtrackposter.poster.Poster.draw", return_value=None)
-    default_values.type = "github"
-    year_count = 3
-    mock_track_instance_berlin_paris.length.return_value = 1 * Units().km
-    mock_track_instance_berlin_paris.start_time.return_value = datetime.datetime(
-        year=2016, month=1, day=1, hour=1, minute=1, second=1
-    )
-    mock_track_instance_berlin_paris.end_time.return_value = datetime.datetime(
-        year=2016, month=1, day=1, hour=2, minute=2, second=2
-    )
-    mock_track_instance_berlin_paris.year = 2016
-    mock_track_instance_amsterdam_paris.length.return_value = 2 * Units().km
-    mock_track_instance_amsterdam_paris.start_time.return_value = datetime.datetime(
-        year=2018, month=1, day=1, hour=1, minute=1, second=1
+def test_run_batch_with_duplicate_outputs_raises_parameter_error(tmp_path: Path) -> None:
+    """Test every job of a batch needs its own output file"""
+    job_file = tmp_path / "jobs.json"
+    job_file.write_text('{"jobs": [{"type": "grid"}, {"type": "calendar"}]}')
+    parser = create_parser()
+    with pytest.raises(ParameterError):
+        run_batch(parser, parse_args(parser, ["--jobs", str(job_file)]))
+
+
+def test_run_batch_measures_jobs_as_phase(gpx_dir_with_tracks: Path, tmp_path: Path) -> None:
+    """Test rendering the jobs of a batch is part of the timings, also if they are rendered in worker processes"""
+    job_file = tmp_path / "jobs.json"
+    jobs = [{"type": "grid", "output": str(tmp_path / f"poster{i}.svg"), "min-distance": 0} for i in range(2)]
+    job_file.write_text(json.dumps({"jobs": jobs}))
+    parser = create_parser()
+    timings.timings().reset()
+    run_batch(
+        parser, parse_args(parser, ["--jobs", str(job_file), "--gpx-dir", str(gpx_dir_with_tracks), "--workers", "2"])
     )
-    mock_track_instance_amsterdam_paris.end_time.return_value = datetime.datetime(
-        year=2018, month=1, day=1, hour=2, minute=2, second=2
+    assert "render jobs" in [p["name"] for p in timings.timings().report()["phases"]]
+    assert (tmp_path / "poster1.svg").is_file()
+
+
+def test_add_drawer_args_accepts_options_of_other_types() -> None:
+    """Test options of other poster types are still accepted"""
+    parser = create_parser()
+    add_drawer_args(parser)
+    args = parse_args(parser, ["--type", "grid", "--heatmap-radius", "3"])
+    assert args.type == "grid"
+
+
+def test_calendar_run_does_not_import_unused_dependencies() -> None:
+    """Test a calendar run imports neither other drawers nor unused dependencies (startup time regression test)"""
+    code = (
+        "import sys\n"
+        "from gpxtrackposter import cli, poster_job\n"
+        "from gpxtrackposter.units import Units\n"
+        "assert Units._instance is None\n"
+        "parser = cli.create_parser()\n"
+        "cli.add_drawer_args(parser)\n"
+        "poster_job.PosterJob(cli.parse_args(parser, ['--type', 'calendar']))\n"
+        "print(' '.join(sys.modules))\n"
     )
-    mock_track_instance_amsterdam_paris.year = 2018
-    poster = setup_poster([mock_track_instance_berlin_paris, mock_track_instance_amsterdam_paris], default_values)
-
-    assert poster
-    assert isinstance(poster, Poster)
-    # assert years
-    assert poster.years.from_year == 2016
-    assert poster.years.to_year == 2018
-    assert year_count == poster.years.count()
-    # modified height of poster
-    assert poster.height == 55 + year_count * 43
-    assert poster.width == 200
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, check=True, text=True)  # noqa: S603
+    modules = set(result.stdout.split())
+    assert "gpxtrackposter.calendar_drawer" in modules
+    for name in ["grid_drawer", "heatmap_drawer", "circular_drawer", "github_drawer", "raster_renderer"]:
+        assert f"gpxtrackposter.{name}" not in modules
+    for name in ["stravalib", "timezonefinder", "staticmaps", "geopy", "requests", "gpxpy", "PIL"]:
+        assert name not in modules
@@ -0,0 +1,80 @@
+"""Several tests for DensityGrid"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from gpxtrackposter import utils
+from gpxtrackposter.density_grid import DensityGrid
+from gpxtrackposter.exceptions import ParameterError
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_add_track_counts_each_track_once_per_pixel() -> None:
+    """Test a track crossing a pixel twice counts once, a second track counts again"""
+    grid = DensityGrid(10, 10)
+    grid.add_track([[(0, 5), (9, 5)], [(9, 5), (0, 5)]])
+    assert grid.counts[5, 3] == 1
+    grid.add_track([[(3, 0), (3, 9)]])
+    assert grid.counts[5, 3] == 2
+    assert grid.counts[0, 0] == 0
+
+
+def test_add_track_clips_to_grid() -> None:
+    """Test lines outside the grid are ignored"""
+    grid = DensityGrid(10, 10)
+    grid.add_track([[(-20, -20), (-10, -10)]])
+    grid.add_track([[(-5, 5), (15, 5)]])
+    assert grid.counts.sum() == 10
+
+
+@pytest.mark.parametrize("method", ["log", "percentile"])
+def test_tone_map_is_between_zero_and_one(method: str) -> None:
+    """Test tone mapped values"""
+    grid = DensityGrid(4, 1)
+    grid.counts[0] = [0, 1, 10, 100]
+    values = grid.tone_map(method, percentile=50.0)
+    assert values[0, 0] == 0.0
+    assert values.max() == 1.0
+    assert np.all(np.diff(values[0]) >= 0)
+
+
+def test_tone_map_with_invalid_method_raises_exception() -> None:
+    """Test unknown tone map"""
+    grid = DensityGrid(1, 1)
+    grid.counts[0, 0] = 1
+    with pytest.raises(ParameterError):
+        grid.tone_map("linear")
+
+
+def test_to_image_uses_gradient_and_transparency() -> None:
+    """Test unvisited pixels are transparent and the most visited pixel gets the last gradient color"""
+    grid = DensityGrid(3, 1)
+    grid.counts[0] = [0, 1, 5]
+    image = grid.to_image(utils.color_gradient("#0000FF", "#FF0000"))
+    assert image.size == (3, 1)
+    unvisited = image.getpixel((0, 0))
+    assert isinstance(unvisited, tuple)
+    assert unvisited[3] == 0
+    assert image.getpixel((2, 0)) == (255, 0, 0, 255)
+
+
+def test_save_and_load(tmp_path: Path) -> None:
+    """Test a stored grid is loaded unchanged"""
+    grid = DensityGrid(3, 2)
+    grid.counts[1, 2] = 7
+    file_name = str(tmp_path / "cache" / "grid.npz")
+    grid.save(file_name)
+    loaded = DensityGrid.load(file_name)
+    assert (loaded.width, loaded.height) == (3, 2)
+    assert np.array_equal(loaded.counts, grid.counts)
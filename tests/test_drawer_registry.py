@@ -0,0 +1,104 @@
+"""Several tests for the drawer registry"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import argparse
+import importlib.metadata
+import logging
+from typing import TYPE_CHECKING
+
+import pytest
+
+from gpxtrackposter import drawer_registry
+from gpxtrackposter.drawer_registry import DrawerPlugin, drawer_plugins
+from gpxtrackposter.exceptions import PosterError
+from gpxtrackposter.grid_drawer import GridDrawer
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from pytest_mock import MockerFixture
+
+PLUGIN = DrawerPlugin("grid2", "gpxtrackposter.grid_drawer:GridDrawer", "another grid")
+GRID = DrawerPlugin("grid", "argparse:ArgumentParser")
+
+
+@pytest.fixture
+def clear_plugins() -> Iterator[None]:
+    """Forget the drawer plugins found before and after the test"""
+    drawer_plugins.cache_clear()
+    yield
+    drawer_plugins.cache_clear()
+
+
+def entry_point(value: str) -> importlib.metadata.EntryPoint:
+    """Return an entry point of the drawer group"""
+    return importlib.metadata.EntryPoint("plugin", value, drawer_registry.ENTRY_POINT_GROUP)
+
+
+def test_drawer_plugins_contain_builtin_types() -> None:
+    """Test the built-in poster types are registered in their order"""
+    assert list(drawer_plugins())[:5] == ["grid", "calendar", "heatmap", "circular", "github"]
+
+
+def test_load_returns_drawer_class() -> None:
+    """Test the drawer class is imported on load"""
+    assert drawer_plugins()["grid"].load() is GridDrawer
+
+
+@pytest.mark.parametrize(
+    "drawer_class",
+    ["gpxtrackposter.no_such_drawer:Drawer", "gpxtrackposter.grid_drawer:NoSuchDrawer", "argparse:ArgumentParser"],
+)
+def test_load_with_invalid_drawer_class_raises_exception(drawer_class: str) -> None:
+    """Test missing drawer classes and classes not being drawers raise PosterError"""
+    with pytest.raises(PosterError):
+        DrawerPlugin("broken", drawer_class).load()
+
+
+def test_add_args_adds_options_of_drawer() -> None:
+    """Test the options of a drawer are added without a drawer instance"""
+    parser = argparse.ArgumentParser()
+    drawer_plugins()["circular"].add_args(parser)
+    drawer_plugins()["grid"].add_args(parser)
+    assert parser.parse_args(["--circular-rings"]).circular_rings
+
+
+@pytest.mark.usefixtures("clear_plugins")
+def test_drawer_plugins_add_entry_points(mocker: MockerFixture) -> None:
+    """Test drawers of other packages are registered after the built-in ones"""
+    mocker.patch("importlib.metadata.entry_points", return_value=[entry_point(f"{__name__}:PLUGIN")])
+    plugins = drawer_plugins()
+    assert list(plugins)[-1] == "grid2"
+    assert plugins["grid2"].load() is GridDrawer
+
+
+@pytest.mark.usefixtures("clear_plugins")
+@pytest.mark.parametrize(
+    "value",
+    [
+        "gpxtrackposter.no_such_module:PLUGIN",
+        "gpxtrackposter.grid_drawer:GridDrawer",
+        "gpxtrackposter.drawer_registry:BUILTIN_DRAWERS",
+    ],
+)
+def test_drawer_plugins_skip_invalid_entry_points(
+    value: str, mocker: MockerFixture, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test broken entry points are logged and skipped"""
+    mocker.patch("importlib.metadata.entry_points", return_value=[entry_point(value)])
+    with caplog.at_level(logging.WARNING, logger="gpxtrackposter"):
+        assert list(drawer_plugins()) == ["grid", "calendar", "heatmap", "circular", "github"]
+    assert "drawer plugin" in caplog.text
+
+
+@pytest.mark.usefixtures("clear_plugins")
+def test_drawer_plugins_do_not_replace_builtin_types(mocker: MockerFixture) -> None:
+    """Test a drawer of another package cannot replace a built-in poster type"""
+    mocker.patch("importlib.metadata.entry_points", return_value=[entry_point(f"{__name__}:GRID")])
+    assert drawer_plugins()["grid"] is drawer_registry.BUILTIN_DRAWERS[0]
@@ -0,0 +1,52 @@
+"""Several tests for fingerprint"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import argparse
+from typing import TYPE_CHECKING
+
+from gpxtrackposter import fingerprint
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_input_fingerprint_ignores_options_not_affecting_the_output(default_values: argparse.Namespace) -> None:
+    """Test logging and worker options do not change the fingerprint, drawing options do"""
+    value = fingerprint.input_fingerprint(default_values, "tracks")
+    assert (
+        fingerprint.input_fingerprint(argparse.Namespace(**{**vars(default_values), "verbose": True}), "tracks")
+        == value
+    )
+    assert (
+        fingerprint.input_fingerprint(argparse.Namespace(**{**vars(default_values), "workers": 4}), "tracks") == value
+    )
+    assert fingerprint.input_fingerprint(argparse.Namespace(**{**vars(default_values), "dpi": 72}), "tracks") != value
+    assert fingerprint.input_fingerprint(default_values, "other tracks") != value
+
+
+def test_output_is_up_to_date_after_storing_fingerprint(tmp_path: Path) -> None:
+    """Test the sidecar records fingerprint and output"""
+    output = tmp_path / "poster.svg"
+    assert not fingerprint.is_up_to_date(str(output), "abc")
+    output.write_text("<svg />")
+    assert not fingerprint.is_up_to_date(str(output), "abc")
+    fingerprint.store_fingerprint(str(output), "abc")
+    assert fingerprint.is_up_to_date(str(output), "abc")
+    assert not fingerprint.is_up_to_date(str(output), "def")
+
+
+def test_modified_output_is_not_up_to_date(tmp_path: Path) -> None:
+    """Test a changed or removed output is rendered again"""
+    output = tmp_path / "poster.svg"
+    output.write_text("<svg />")
+    fingerprint.store_fingerprint(str(output), "abc")
+    output.write_text("<svg></svg>")
+    assert not fingerprint.is_up_to_date(str(output), "abc")
+    output.unlink()
+    assert not fingerprint.is_up_to_date(str(output), "abc")
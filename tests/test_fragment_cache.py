@@ -0,0 +1,72 @@
+"""Several tests for FragmentCache"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import svgwrite  # type: ignore[import-untyped]
+
+from gpxtrackposter.fragment_cache import MAX_UNUSED_FLUSHES, FragmentCache, FragmentGroup, serialize
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_fragment_group_restores_serialized_group() -> None:
+    """Test a restored fragment serializes like the original group"""
+    dr = svgwrite.Drawing()
+    g = dr.g()
+    g.add(dr.polyline(points=[(0, 0), (1, 1)]))
+    fragment = serialize(g)
+    outer = dr.g(stroke="#FF0000")
+    outer.add(FragmentGroup(fragment))
+    assert outer.tostring() == f'<g stroke="#FF0000">{fragment}</g>'
+
+
+def test_fragment_group_keeps_prefixed_attributes() -> None:
+    """Test xlink attributes survive serialization without namespace declarations in the fragment"""
+    dr = svgwrite.Drawing()
+    g = dr.g()
+    text = dr.text("")
+    text.add(dr.textPath("#path0", "January"))
+    g.add(text)
+    fragment = serialize(g)
+    assert FragmentGroup(fragment).tostring() == g.tostring()
+
+
+def test_fragment_cache_persists_used_fragments(tmp_path: Path) -> None:
+    """Test flushed fragments can be loaded again"""
+    file_name = str(tmp_path / "fragments.json")
+    cache = FragmentCache(file_name)
+    assert cache.get("a") is None
+    cache.put("a", "<g />")
+    cache.flush()
+    assert FragmentCache(file_name).get("a") == "<g />"
+
+
+def test_fragment_cache_drops_fragments_unused_for_several_flushes(tmp_path: Path) -> None:
+    """Test fragments not used for MAX_UNUSED_FLUSHES flushes are forgotten"""
+    file_name = str(tmp_path / "fragments.json")
+    cache = FragmentCache(file_name)
+    cache.put("a", "<g />")
+    cache.put("b", "<g />")
+    cache.flush()
+    for _ in range(MAX_UNUSED_FLUSHES):
+        cache = FragmentCache(file_name)
+        assert cache.get("b") == "<g />"
+        cache.flush()
+    cache = FragmentCache(file_name)
+    assert cache.get("a") is None
+    assert cache.get("b") == "<g />"
+
+
+def test_fragment_cache_ignores_broken_file(tmp_path: Path) -> None:
+    """Test a broken cache file is ignored"""
+    file_name = tmp_path / "fragments.json"
+    file_name.write_text("{broken")
+    assert FragmentCache(str(file_name)).get("a") is None
@@ -5,16 +5,24 @@
 # Use of this source code is governed by a MIT-style
 # license that can be found in the LICENSE file.
 
+import xml.etree.ElementTree as ET
 from argparse import ArgumentParser
+from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
+import s2sphere  # type: ignore[import-untyped]
+import svgwrite  # type: ignore[import-untyped]
 from pytest_mock import MockerFixture
 
+from gpxtrackposter import grid_drawer as grid_drawer_module
+from gpxtrackposter import tracks_drawer, utils
 from gpxtrackposter.exceptions import PosterError
 from gpxtrackposter.grid_drawer import GridDrawer
 from gpxtrackposter.poster import Poster
+from gpxtrackposter.track_loader import TrackLoader
 from gpxtrackposter.units import Units
+from gpxtrackposter.xy import XY
 
 
 @pytest.mark.full_run
@@ -74,3 +82,105 @@ def test_run_drawer_with_animation(
     poster.set_tracks([mock_track_instance_berlin_paris, mock_track_instance_amsterdam_paris])
     assert len(poster.tracks) != 0
     poster.draw(grid_drawer, args.output)
+
+
+@pytest.mark.parametrize(
+    "svg_paths, expected_tag, expected_attribute, expected_value",
+    [
+        (False, "polyline", "points", "1.23,4.57 2.0,5.0"),
+        (True, "path", "d", "m1.23,4.57l0.77,0.43"),
+    ],
+)
+def test_polyline_uses_poster_precision(
+    poster: Poster,
+    grid_drawer: GridDrawer,
+    svg_paths: bool,
+    expected_tag: str,
+    expected_attribute: str,
+    expected_value: str,
+) -> None:
+    """Test polyline coordinates are rounded and optionally written as relative path data"""
+    grid_drawer.poster = poster
+    poster.precision = 2
+    poster.svg_paths = svg_paths
+    dr = svgwrite.Drawing()
+    element = grid_drawer.polyline(dr, [(1.23456, 4.56789), (1.999, 5.0), (2.0, 5.001)], stroke="#FFFFFF")
+    xml = element.get_xml()
+    assert xml.tag == expected_tag
+    assert xml.get(expected_attribute) == expected_value
+
+
+def test_tracks_are_projected_once_and_placed_with_transforms(
+    poster: Poster,
+    grid_drawer: GridDrawer,
+    mock_track_instance_berlin_paris: MagicMock,
+    mock_track_instance_amsterdam_paris: MagicMock,
+    mocker: MockerFixture,
+) -> None:
+    """Test drawing at another size reuses the unit square projection"""
+    for tr, start in (
+        (mock_track_instance_berlin_paris, (52.52, 13.40)),
+        (mock_track_instance_amsterdam_paris, (52.37, 4.90)),
+    ):
+        tr.polylines = [[s2sphere.LatLng.from_degrees(*start), s2sphere.LatLng.from_degrees(48.86, 2.35)]]
+        tr.bbox.return_value = s2sphere.LatLngRect.from_point_pair(*tr.polylines[0])
+    grid_drawer.poster = poster
+    poster.set_tracks([mock_track_instance_berlin_paris, mock_track_instance_amsterdam_paris])
+    project = mocker.spy(utils, "project")
+    dr = svgwrite.Drawing()
+    for size in (XY(100, 100), XY(50, 80)):
+        g = dr.g()
+        grid_drawer.draw(dr, g, size, XY(10, 10))
+        cells = [cell for g_year in g.elements for cell in g_year.elements]
+        assert len(cells) == 2
+        assert all(cell["transform"].startswith("translate(") for cell in cells)
+    assert project.call_count == 2
+    points = cells[0].get_xml().find("g/polyline").get("points")
+    assert all(0 <= float(v) <= 1 for point in points.split() for v in point.split(","))
+
+
+def test_track_fragments_are_cached_between_runs(
+    poster: Poster,
+    grid_drawer: GridDrawer,
+    mock_track_instance_berlin_paris: MagicMock,
+    tmp_path: Path,
+    mocker: MockerFixture,
+) -> None:
+    """Test a second run with a new drawer takes the track lines from the cache"""
+    tr = mock_track_instance_berlin_paris
+    tr.polylines = [[s2sphere.LatLng.from_degrees(52.52, 13.40), s2sphere.LatLng.from_degrees(48.86, 2.35)]]
+    tr.bbox.return_value = s2sphere.LatLngRect.from_point_pair(*tr.polylines[0])
+    poster.set_tracks([tr])
+    results = []
+    for drawer in (grid_drawer, GridDrawer(poster)):
+        drawer.poster = poster
+        drawer.set_cache_dir(str(tmp_path))
+        project = mocker.spy(utils, "project")
+        dr = svgwrite.Drawing()
+        g = dr.g()
+        drawer.draw(dr, g, XY(100, 100), XY(10, 10))
+        results.append((project.call_count, ET.tostring(g.get_xml())))
+        mocker.stopall()
+    assert results[0][0] == 1
+    assert results[1][0] == 0
+    assert results[0][1] == results[1][1]
+
+
+def test_tracks_are_neither_hashed_nor_serialized_without_cache_dir(
+    poster: Poster, grid_drawer: GridDrawer, gpx_dir_with_tracks: Path, mocker: MockerFixture
+) -> None:
+    """Test drawing without cache directory computes no cache keys and serializes no fragments"""
+    loader = TrackLoader(workers=1)
+    loader.set_min_length(0 * Units().meter)
+    poster.set_tracks(loader.load_tracks(str(gpx_dir_with_tracks)))
+    grid_drawer.poster = poster
+    polylines_hash = mocker.spy(utils, "polylines_hash")
+    serialize_years = mocker.spy(tracks_drawer, "serialize")
+    serialize_tracks = mocker.spy(grid_drawer_module, "serialize")
+    dr = svgwrite.Drawing()
+    g = dr.g()
+    grid_drawer.draw(dr, g, XY(100, 100), XY(10, 10))
+    assert g.get_xml().findall("g")
+    polylines_hash.assert_not_called()
+    serialize_years.assert_not_called()
+    serialize_tracks.assert_not_called()
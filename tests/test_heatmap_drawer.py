@@ -7,20 +7,29 @@
 
 from __future__ import annotations
 
+import base64
+import io
 import logging
 import math
 from typing import TYPE_CHECKING
 
+import numpy as np
 import pytest
 import s2sphere  # type: ignore[import-untyped]
+import staticmaps  # type: ignore[import-untyped]
+import svgwrite  # type: ignore[import-untyped]
+from PIL import Image, ImageColor  # type: ignore[import-untyped]
 
 from gpxtrackposter.cli import parse_args
+from gpxtrackposter.density_grid import DensityGrid
 from gpxtrackposter.exceptions import ParameterError, PosterError
-from gpxtrackposter.heatmap_drawer import HeatmapDrawer
+from gpxtrackposter.heatmap_drawer import HeatmapDrawer, encode_image
 from gpxtrackposter.units import Units
+from gpxtrackposter.xy import XY
 
 if TYPE_CHECKING:
     from argparse import ArgumentParser
+    from pathlib import Path
     from unittest.mock import MagicMock
 
     from pytest_mock import MockerFixture
@@ -377,3 +386,129 @@ def test_run_drawer_with_animation(
     poster.set_tracks([mock_track_instance_berlin_paris, mock_track_instance_amsterdam_paris])
     assert len(poster.tracks) != 0
     poster.draw(heatmap_drawer, args.output)
+
+
+def test_draw_density_embeds_single_image_and_caches_grid(
+    poster: Poster,
+    heatmap_drawer: HeatmapDrawer,
+    parser: ArgumentParser,
+    mock_track_instance_berlin_paris: MagicMock,
+    mock_track_instance_amsterdam_paris: MagicMock,
+    mocker: MockerFixture,
+    tmp_path: Path,
+) -> None:
+    """Test density mode draws one image and re-coloring uses the cached density grid"""
+    mock_track_instance_berlin_paris.polylines = [
+        [s2sphere.LatLng.from_degrees(52.52, 13.40), s2sphere.LatLng.from_degrees(48.86, 2.35)]
+    ]
+    mock_track_instance_amsterdam_paris.polylines = [
+        [s2sphere.LatLng.from_degrees(52.37, 4.90), s2sphere.LatLng.from_degrees(48.86, 2.35)]
+    ]
+    mock_track_instance_berlin_paris.polylines_hash.return_value = "berlin-paris"
+    mock_track_instance_amsterdam_paris.polylines_hash.return_value = "amsterdam-paris"
+    heatmap_drawer.create_args(parser)
+    args = parser.parse_args(["--heatmap-mode", "density", "--heatmap-density-cache", str(tmp_path)])
+    heatmap_drawer.fetch_args(args)
+    heatmap_drawer.poster = poster
+    poster.dpi = 50
+    poster.set_tracks([mock_track_instance_berlin_paris, mock_track_instance_amsterdam_paris])
+
+    dr = svgwrite.Drawing()
+    g = dr.g()
+    heatmap_drawer.draw(dr, g, XY(100, 100), XY(10, 10))
+    assert [element.elementname for element in g.elements] == ["image"]
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+
+    add_track = mocker.spy(DensityGrid, "add_track")
+    poster.colors["track2"] = "#FF0000"
+    g = dr.g()
+    heatmap_drawer.draw(dr, g, XY(100, 100), XY(10, 10))
+    assert len(g.elements) == 1
+    add_track.assert_not_called()
+
+
+def test_draw_density_draws_special_tracks_with_special_colors(
+    poster: Poster,
+    heatmap_drawer: HeatmapDrawer,
+    parser: ArgumentParser,
+    mock_track_instance_berlin_paris: MagicMock,
+    mock_track_instance_amsterdam_paris: MagicMock,
+) -> None:
+    """Test density mode draws special tracks as second image colored with the special colors"""
+    mock_track_instance_berlin_paris.polylines = [
+        [s2sphere.LatLng.from_degrees(52.52, 13.40), s2sphere.LatLng.from_degrees(48.86, 2.35)]
+    ]
+    mock_track_instance_berlin_paris.special = False
+    mock_track_instance_amsterdam_paris.polylines = [
+        [s2sphere.LatLng.from_degrees(52.37, 4.90), s2sphere.LatLng.from_degrees(48.86, 2.35)]
+    ]
+    mock_track_instance_amsterdam_paris.special = True
+    heatmap_drawer.create_args(parser)
+    heatmap_drawer.fetch_args(parser.parse_args(["--heatmap-mode", "density"]))
+    heatmap_drawer.poster = poster
+    poster.dpi = 50
+    poster.set_tracks([mock_track_instance_berlin_paris, mock_track_instance_amsterdam_paris])
+
+    dr = svgwrite.Drawing()
+    g = dr.g()
+    heatmap_drawer.draw(dr, g, XY(100, 100), XY(10, 10))
+    images = [element["xlink:href"] for element in g.elements]
+    assert len(images) == 2
+    special_image = np.asarray(Image.open(io.BytesIO(base64.b64decode(images[1].split(",", 1)[1]))).convert("RGBA"))
+    visible = special_image[special_image[:, :, 3] > 0]
+    assert len(visible) > 0
+    assert {tuple(px[:3]) for px in visible.tolist()} == {ImageColor.getrgb(poster.colors["special"])}
+
+
+@pytest.mark.parametrize(
+    "invalid_args",
+    [
+        ["--heatmap-tile-dir", "/does/not/exist"],
+        ["--heatmap-tile-cache-size", "-1"],
+        ["--heatmap-tile-workers", "0"],
+        ["--heatmap-tile-quality", "0"],
+        ["--heatmap-tile-quality", "101"],
+        ["--heatmap-tile-provider", "no-such-provider"],
+    ],
+)
+def test_fetch_args_with_invalid_tile_options_raises_exception(
+    invalid_args: list[str], heatmap_drawer: HeatmapDrawer, parser: ArgumentParser
+) -> None:
+    """Test invalid tile options raise ParameterError"""
+    heatmap_drawer.create_args(parser)
+    args = parser.parse_args(invalid_args)
+    with pytest.raises(ParameterError):
+        heatmap_drawer.fetch_args(args)
+
+
+@pytest.mark.parametrize(
+    "image_format, expected_format",
+    [("png", "PNG"), ("jpeg", "JPEG"), ("webp", "WEBP")],
+)
+def test_encode_image(image_format: str, expected_format: str) -> None:
+    """Test background images are encoded in memory in the requested format"""
+    image = Image.new("RGBA", (16, 8), (10, 20, 30, 255))
+    data = encode_image(image, image_format, 50)
+    with Image.open(io.BytesIO(data)) as decoded:
+        assert decoded.format == expected_format
+        assert decoded.size == (16, 8)
+
+
+def test_background_cache_reuses_composite_for_same_inputs(heatmap_drawer: HeatmapDrawer, tmp_path: Path) -> None:
+    """Test background composites are cached by provider, bbox, size, renderer and padding"""
+    # pylint: disable=protected-access
+    heatmap_drawer.set_cache_dir(str(tmp_path))
+    provider = staticmaps.default_tile_providers["osm"]
+    bbox = s2sphere.LatLngRect.from_point_pair(
+        s2sphere.LatLng.from_degrees(47.9, 7.8), s2sphere.LatLng.from_degrees(48.1, 8.0)
+    )
+    key = heatmap_drawer._background_key(provider, bbox, XY(800, 1200), 3)
+    assert key == heatmap_drawer._background_key(provider, bbox, XY(800, 1200), 3)
+    assert key != heatmap_drawer._background_key(provider, bbox, XY(800, 1200), 4)
+    assert key != heatmap_drawer._background_key(staticmaps.default_tile_providers["carto"], bbox, XY(800, 1200), 3)
+    heatmap_drawer._heatmap_renderer = "cairo"
+    assert key != heatmap_drawer._background_key(provider, bbox, XY(800, 1200), 3)
+
+    assert heatmap_drawer._load_background(key) is None
+    heatmap_drawer._store_background(key, b"image")
+    assert heatmap_drawer._load_background(key) == b"image"
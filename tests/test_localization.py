@@ -7,10 +7,12 @@
 
 import locale
 import logging
+import threading
 
 import pytest
 
-from gpxtrackposter.localization import localized_day_of_week_name
+from gpxtrackposter import localization
+from gpxtrackposter.localization import LocaleData, locale_data, localized_day_of_week_name
 
 
 @pytest.mark.parametrize(
@@ -56,3 +58,38 @@ def test_localized_returns_expected_value(
     log.info(language)
     locale.setlocale(category=locale.LC_ALL, locale=[locale_lang, "UTF-8"])
     assert expected == localized_day_of_week_name(weekday_num, short)
+
+
+def test_locale_data_formats_with_own_decimal_point() -> None:
+    """Test the names and number format of locale data do not depend on the process locale"""
+    data = LocaleData("zh_CN", ["星期一"] * 7, ["一月"] * 12, ",")
+    assert data.format_float(1.25) == "1,2"
+    assert data.format_float(3) == "3,0"
+    assert data.day_of_week_name(0, short=True) == "一"
+    assert data.day_of_week_name(0, short=False) == "星期一"
+
+
+def test_locale_data_restores_process_locale() -> None:
+    """Test reading the data of a locale leaves the process locale unchanged"""
+    process_locale = locale.setlocale(locale.LC_ALL)
+    data = locale_data("C")
+    assert data.day_names[0] == "Monday"
+    assert data.month_names[11] == "December"
+    assert data.decimal_point == "."
+    assert locale.setlocale(locale.LC_ALL) == process_locale
+    with pytest.raises(locale.Error):
+        locale_data("xx_XX")
+    assert locale.setlocale(locale.LC_ALL) == process_locale
+
+
+def test_process_locale_data_waits_while_locale_is_switched() -> None:
+    """Test the data of the process locale is not read while another thread switches the locale"""
+    results: list[LocaleData] = []
+    # held by locale_data while it switches the process locale
+    with localization._locale_lock:
+        thread = threading.Thread(target=lambda: results.append(localization.process_locale_data()))
+        thread.start()
+        thread.join(0.1)
+        assert thread.is_alive()
+    thread.join()
+    assert len(results) == 1
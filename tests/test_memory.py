@@ -0,0 +1,84 @@
+"""Several tests for the memory report of phases"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import tracemalloc
+from typing import TYPE_CHECKING
+
+import pytest
+
+from gpxtrackposter import memory, timings
+from gpxtrackposter.memory import MemoryReport
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+@pytest.fixture(name="enabled_report")
+def fixture_enabled_report() -> Iterator[MemoryReport]:
+    """Memory report of the current run, tracing allocations during the test"""
+    report = memory.report()
+    report.reset()
+    report.enable(top=5)
+    yield report
+    report.disable()
+    report.reset()
+
+
+def test_peak_of_enclosing_phase_includes_nested_phases(enabled_report: MemoryReport) -> None:
+    """Test memory allocated and freed in a nested phase counts for the peak of the enclosing phase"""
+    with enabled_report.phase("draw"):
+        with enabled_report.phase("draw/tracks"):
+            data = bytearray(4_000_000)
+            del data
+        kept = bytearray(100_000)
+    phases = {p["name"]: p for p in enabled_report.report()["phases"]}
+    assert list(phases) == ["draw", "draw/tracks"]
+    assert phases["draw"]["peak_bytes"] >= phases["draw/tracks"]["peak_bytes"] >= 4_000_000
+    assert phases["draw"]["traced_bytes"] < phases["draw"]["peak_bytes"]
+    assert len(kept) == 100_000
+
+
+def test_top_allocations_of_top_level_phases(enabled_report: MemoryReport) -> None:
+    """Test the largest allocation sites are reported after top level phases only"""
+    with enabled_report.phase("load tracks"), enabled_report.phase("load tracks/parse GPX"):
+        data = [bytearray(1000) for _ in range(1000)]
+    phases = {p["name"]: p for p in enabled_report.report()["phases"]}
+    top_allocations = phases["load tracks"]["top_allocations"]
+    assert len(top_allocations) <= 5
+    assert top_allocations[0]["site"].startswith(__file__)
+    assert top_allocations[0]["bytes"] >= 1_000_000
+    assert "top_allocations" not in phases["load tracks/parse GPX"]
+    assert "Largest allocations after load tracks:" in enabled_report.table()
+    assert len(data) == 1000
+
+
+def test_timings_phases_are_measured_while_enabled(enabled_report: MemoryReport) -> None:
+    """Test the phases of the timings are measured by the memory report of the current run"""
+    with timings.phase("set tracks"):
+        pass
+    enabled_report.disable()
+    with timings.phase("save"):
+        pass
+    assert [p["name"] for p in enabled_report.report()["phases"]] == ["set tracks"]
+    assert not tracemalloc.is_tracing()
+
+
+def test_disabled_report_records_nothing() -> None:
+    """Test phases are not measured unless the report is enabled"""
+    report = MemoryReport()
+    with report.phase("draw"):
+        pass
+    assert report.report()["phases"] == []
+
+
+def test_stop_in_worker_stops_tracing(enabled_report: MemoryReport) -> None:
+    """Test forked workers stop tracing the allocations inherited from the main process"""
+    memory.stop_in_worker()
+    assert not enabled_report.enabled
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,133 @@
+"""Several tests for the metrics of a run"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import io
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from gpxtrackposter import metrics
+from gpxtrackposter.grid_drawer import GridDrawer
+from gpxtrackposter.metrics import Metrics
+from gpxtrackposter.track_loader import TrackLoader
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from gpxtrackposter.poster import Poster
+
+
+def test_prometheus_textfile_contains_all_counters(tmp_path: Path) -> None:
+    """Test the textfile contains help, type and value of every counter, including counters never increased"""
+    m = Metrics()
+    m.inc("files_scanned_total", 3)
+    m.inc("files_scanned_total")
+    m.set("phase_seconds", 1.5, 'load "tracks"')
+    file_name = tmp_path / "gpxtrackposter.prom"
+    m.write(str(file_name))
+    lines = file_name.read_text(encoding="utf8").splitlines()
+    assert "# TYPE gpxtrackposter_files_scanned_total counter" in lines
+    assert "gpxtrackposter_files_scanned_total 4.0" in lines
+    assert "gpxtrackposter_cache_hits_total 0.0" in lines
+    assert 'gpxtrackposter_phase_seconds{phase="load \\"tracks\\""} 1.5' in lines
+    assert not any(line.startswith("gpxtrackposter_peak_rss_bytes") for line in lines)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_json_lines_file_gets_a_line_per_run(tmp_path: Path) -> None:
+    """Test every write appends the values of the run to a JSON lines file"""
+    file_name = tmp_path / "metrics.jsonl"
+    m = Metrics()
+    for run in range(2):
+        m.reset()
+        m.inc("points_drawn_total", 10 * run)
+        m.set("phase_seconds", 2.0, "draw")
+        m.write(str(file_name))
+    runs = [json.loads(line) for line in file_name.read_text(encoding="utf8").splitlines()]
+    assert [run["points_drawn_total"] for run in runs] == [0, 10]
+    assert runs[1]["phase_seconds"] == {"draw": 2.0}
+
+
+def test_merge_adds_values_of_other_processes() -> None:
+    """Test values collected in a worker are added to the counters of the main process"""
+    worker = Metrics()
+    worker.inc("points_parsed_total", 5)
+    m = Metrics()
+    m.inc("points_parsed_total", 2)
+    m.merge(worker.collect())
+    m.merge(worker.collect())
+    assert m.value("points_parsed_total") == 7
+    assert worker.value("points_parsed_total") == 0
+
+
+def test_unknown_metric_raises_key_error() -> None:
+    """Test metrics have to be defined"""
+    with pytest.raises(KeyError):
+        Metrics().inc("unknown_total")
+
+
+def test_finish_run_sets_phase_seconds_and_peak_memory() -> None:
+    """Test the gauges of the end of a run"""
+    metrics.metrics().reset()
+    metrics.finish_run({"total_seconds": 3.0, "phases": [{"name": "load tracks", "calls": 1, "seconds": 2.0}]})
+    m = metrics.metrics()
+    assert m.value("run_seconds") == 3.0
+    assert m.value("phase_seconds", "load tracks") == 2.0
+    assert m.value("last_run_timestamp_seconds") > 0
+    if metrics.peak_rss():
+        assert m.value("peak_rss_bytes", "main") > 0
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_load_tracks_counts_files_cache_and_points(gpx_dir_with_tracks: Path, tmp_path: Path, workers: int) -> None:
+    """Test loading tracks counts in the main process and in worker processes"""
+    m = metrics.metrics()
+    m.reset()
+    for _ in range(2):
+        loader = TrackLoader(workers=workers)
+        loader.set_cache_dir(str(tmp_path / "cache"))
+        loader.load_tracks(str(gpx_dir_with_tracks))
+    assert m.value("files_scanned_total") == 6
+    assert m.value("cache_misses_total") == 3
+    assert m.value("cache_hits_total") == 3
+    assert m.value("points_parsed_total") >= m.value("points_simplified_total") > 0
+
+
+def test_draw_counts_points_elements_and_bytes(poster: Poster, gpx_dir_with_tracks: Path) -> None:
+    """Test drawing a poster counts the drawn points, the SVG elements and the written bytes"""
+    poster.set_title("Metrics Test")
+    poster.set_tracks(TrackLoader(workers=1).load_tracks(str(gpx_dir_with_tracks)))
+    m = metrics.metrics()
+    m.reset()
+    output = io.BytesIO()
+    poster.draw(GridDrawer(poster), output)
+    assert m.value("points_drawn_total") > 0
+    assert m.value("svg_elements_total") > 0
+    assert m.value("bytes_written_total") == len(output.getvalue())
+
+
+def test_points_of_cached_years_and_tracks_are_counted(
+    poster: Poster, gpx_dir_with_tracks: Path, tmp_path: Path
+) -> None:
+    """Test posters taken from the year group and track fragment caches count the same points as drawn ones"""
+    poster.set_title("Metrics Test")
+    poster.set_tracks(TrackLoader(workers=1).load_tracks(str(gpx_dir_with_tracks)))
+    m = metrics.metrics()
+    points = []
+    # cold caches, cached year groups, then cached track lines in year groups drawn again for another color
+    for track_color in ["#4DD2FF", "#4DD2FF", "#FF0000"]:
+        poster.colors["track"] = track_color
+        drawer = GridDrawer(poster)
+        drawer.set_cache_dir(str(tmp_path))
+        m.reset()
+        poster.draw(drawer, io.BytesIO())
+        points.append(m.value("points_drawn_total"))
+    assert points[0] > 0
+    assert points == [points[0]] * 3
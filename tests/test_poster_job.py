@@ -0,0 +1,196 @@
+"""Several tests for PosterJob"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import concurrent.futures
+import datetime as dt
+import locale
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from gpxtrackposter.exceptions import ParameterError
+from gpxtrackposter.localization import locale_data
+from gpxtrackposter.poster import Poster
+from gpxtrackposter.poster_job import PosterJob, setup_poster
+from gpxtrackposter.track_loader import TrackLoader
+from gpxtrackposter.units import Units
+
+if TYPE_CHECKING:
+    import argparse
+    from pathlib import Path
+    from unittest.mock import MagicMock
+
+    from pytest_mock import MockerFixture
+
+JOBS: list[dict[str, Any]] = [
+    {"type": "calendar", "title": "Calendar", "language": "de_DE"},
+    {"type": "grid", "title": "Grid"},
+    {"type": "circular", "title": "Circular", "circular-rings": True},
+    {"type": "github", "title": "Github", "units": "imperial"},
+]
+
+
+def render(options: dict, tracks: list, output: Path) -> bytes:
+    """Render a job without worker processes and return the output"""
+    job = PosterJob.from_options(options)
+    job.drawer.set_workers(1)
+    job.render(tracks, str(output))
+    return output.read_bytes()
+
+
+def test_setup_poster_returns_instance_of_poster_with_default_size(
+    mocker: MockerFixture,
+    mock_track_instance_berlin_paris: MagicMock,
+    mock_track_instance_amsterdam_paris: MagicMock,
+    default_values: argparse.Namespace,
+) -> None:
+    """Test setup of poster with default values from argparser"""
+    mocker.patch("gpxtrackposter.poster.Poster.draw", return_value=None)
+    poster = setup_poster([mock_track_instance_berlin_paris, mock_track_instance_amsterdam_paris], default_values)
+    assert poster
+    assert isinstance(poster, Poster)
+    # default height and width of poster
+    assert poster.height == 300
+    assert poster.width == 200
+
+
+def test_setup_poster_type_github_returns_instance_of_poster_with_modified_height(
+    mocker: MockerFixture,
+    mock_track_instance_berlin_paris: MagicMock,
+    mock_track_instance_amsterdam_paris: MagicMock,
+    default_values: argparse.Namespace,
+) -> None:
+    """Test setup of poster with type GitHub"""
+    mocker.patch("gpxtrackposter.poster.Poster.draw", return_value=None)
+    default_values.type = "github"
+    year_count = 3
+    mock_track_instance_berlin_paris.length.return_value = 1 * Units().km
+    mock_track_instance_berlin_paris.start_time.return_value = dt.datetime(
+        year=2016, month=1, day=1, hour=1, minute=1, second=1
+    )
+    mock_track_instance_berlin_paris.end_time.return_value = dt.datetime(
+        year=2016, month=1, day=1, hour=2, minute=2, second=2
+    )
+    mock_track_instance_berlin_paris.year = 2016
+    mock_track_instance_amsterdam_paris.length.return_value = 2 * Units().km
+    mock_track_instance_amsterdam_paris.start_time.return_value = dt.datetime(
+        year=2018, month=1, day=1, hour=1, minute=1, second=1
+    )
+    mock_track_instance_amsterdam_paris.end_time.return_value = dt.datetime(
+        year=2018, month=1, day=1, hour=2, minute=2, second=2
+    )
+    mock_track_instance_amsterdam_paris.year = 2018
+    poster = setup_poster([mock_track_instance_berlin_paris, mock_track_instance_amsterdam_paris], default_values)
+
+    assert poster
+    assert isinstance(poster, Poster)
+    # assert years
+    assert poster.years.from_year == 2016
+    assert poster.years.to_year == 2018
+    assert year_count == poster.years.count()
+    # modified height of poster
+    assert poster.height == 55 + year_count * 43
+    assert poster.width == 200
+
+
+def test_from_options_with_invalid_drawer_option_raises_parameter_error() -> None:
+    """Test the drawer options are checked when the job is created"""
+    with pytest.raises(ParameterError):
+        PosterJob.from_options({"type": "heatmap", "heatmap-tile-quality": 0})
+
+
+def test_select_tracks_applies_filters_of_job(gpx_dir_with_tracks: Path) -> None:
+    """Test a job selects its tracks from tracks loaded without filters"""
+    loader = TrackLoader(workers=1)
+    loader.set_min_length(0 * Units().meter)
+    tracks = loader.load_tracks(str(gpx_dir_with_tracks))
+    job = PosterJob.from_options({"activity-type": "Hike", "min-distance": 0})
+    assert [t.activity_type for t in job.select_tracks(tracks)] == ["hike"]
+
+
+def test_jobs_rendered_in_threads_match_sequential_rendering(gpx_dir_with_tracks: Path, tmp_path: Path) -> None:
+    """Test jobs rendered concurrently give the same posters and leave the process locale unchanged"""
+    process_locale = locale.setlocale(locale.LC_ALL)
+    loader = TrackLoader(workers=1)
+    loader.set_min_length(0 * Units().meter)
+    tracks = loader.load_tracks(str(gpx_dir_with_tracks))
+    expected = [render(options, tracks, tmp_path / f"sequential{i}.svg") for i, options in enumerate(JOBS)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(JOBS)) as executor:
+        futures = [
+            executor.submit(render, options, tracks, tmp_path / f"thread{i}.svg") for i, options in enumerate(JOBS)
+        ]
+    assert [future.result() for future in futures] == expected
+    assert locale.setlocale(locale.LC_ALL) == process_locale
+
+
+def test_jobs_with_different_special_tracks_rendered_in_threads(gpx_dir_with_tracks: Path, tmp_path: Path) -> None:
+    """Test jobs selecting other special tracks from the same tracks concurrently do not affect each other"""
+    loader = TrackLoader(workers=1)
+    loader.set_min_length(0 * Units().meter)
+    tracks = loader.load_tracks(str(gpx_dir_with_tracks))
+    special = ["gpx_file_track_hike.gpx", "gpx_file_track_walk.gpx"]
+    jobs = [{"type": "grid", "min-distance": 0, "special": special if i % 2 else []} for i in range(8)]
+
+    def select_and_render(options: dict[str, Any], output: Path) -> bytes:
+        job = PosterJob.from_options(options)
+        job.drawer.set_workers(1)
+        job.render(job.select_tracks(tracks), str(output))
+        return output.read_bytes()
+
+    expected = [select_and_render(options, tmp_path / f"sequential{i}.svg") for i, options in enumerate(jobs)]
+    assert expected[0] != expected[1]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = [
+            executor.submit(select_and_render, options, tmp_path / f"thread{i}.svg") for i, options in enumerate(jobs)
+        ]
+    assert [future.result() for future in futures] == expected
+    assert not any(t.special for t in tracks)
+
+
+def test_jobs_with_and_without_language_rendered_in_threads(gpx_dir_with_tracks: Path, tmp_path: Path) -> None:
+    """Test jobs in the process locale get its names and decimal point while other jobs read another locale"""
+    try:
+        locale_data("de_DE")
+    except locale.Error:
+        pytest.skip("de_DE locale not available")
+    locale_data.cache_clear()
+    loader = TrackLoader(workers=1)
+    loader.set_min_length(0 * Units().meter)
+    tracks = loader.load_tracks(str(gpx_dir_with_tracks))
+    jobs: list[dict[str, Any]] = [
+        {"type": "calendar", "title": "Calendar", **({"language": "de_DE"} if i % 2 else {})} for i in range(8)
+    ]
+    expected = [render(options, tracks, tmp_path / f"sequential{i}.svg") for i, options in enumerate(jobs)]
+    assert expected[0] != expected[1]
+    for _ in range(3):
+        locale_data.cache_clear()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = [
+                executor.submit(render, options, tracks, tmp_path / f"thread{i}.svg") for i, options in enumerate(jobs)
+            ]
+        assert [future.result() for future in futures] == expected
+
+
+def test_render_bytes_matches_output_file(
+    gpx_dir_with_tracks: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test rendering in memory gives the poster file and writes no files"""
+    loader = TrackLoader(workers=1)
+    loader.set_min_length(0 * Units().meter)
+    tracks = loader.load_tracks(str(gpx_dir_with_tracks))
+    expected = render({"type": "grid"}, tracks, tmp_path / "poster.svg")
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+    monkeypatch.chdir(work_dir)
+    job = PosterJob.from_options({"type": "grid"})
+    assert job.render_bytes(tracks) == expected
+    assert job.render_bytes(tracks, "png").startswith(b"\x89PNG")
+    assert not list(work_dir.iterdir())
+    with pytest.raises(ParameterError):
+        job.render_bytes(tracks, "gif")
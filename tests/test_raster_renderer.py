@@ -0,0 +1,153 @@
+"""Several tests for RasterRenderer"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+import io
+import math
+
+import pytest
+import svgwrite  # type: ignore[import-untyped]
+from PIL import Image  # type: ignore[import-untyped]
+
+from gpxtrackposter.raster_renderer import RasterRenderer, parse_length, parse_path, parse_style, parse_transform
+
+
+def pixel(image: Image.Image, xy: tuple[int, int]) -> tuple[int, ...]:
+    """Return the channels of a pixel of an RGBA image"""
+    px = image.getpixel(xy)
+    assert isinstance(px, tuple)
+    return px
+
+
+def make_drawing() -> svgwrite.Drawing:
+    """Return a 100mm x 50mm drawing"""
+    d = svgwrite.Drawing(None, ("100mm", "50mm"))
+    d.viewbox(width=100, height=50)
+    return d
+
+
+@pytest.mark.parametrize(
+    "style, expected_result",
+    [
+        ("", {}),
+        ("font-size:4px; font-family:Arial", {"font-size": "4px", "font-family": "Arial"}),
+        ("fill:none;", {"fill": "none"}),
+    ],
+)
+def test_parse_style(style: str, expected_result: dict) -> None:
+    """Test parse style"""
+    assert expected_result == parse_style(style)
+
+
+@pytest.mark.parametrize(
+    "value, expected_result",
+    [
+        (None, 0.0),
+        ("200mm", 200.0),
+        ("2.5px", 2.5),
+        ("-1e1", -10.0),
+    ],
+)
+def test_parse_length(value: str | None, expected_result: float) -> None:
+    """Test parse length"""
+    assert expected_result == parse_length(value)
+
+
+def test_parse_path_with_relative_lines() -> None:
+    """Test parse path with relative moves and lines"""
+    assert parse_path("m1,2l3,0 0,4") == [([(1.0, 2.0), (4.0, 2.0), (4.0, 6.0)], False)]
+
+
+def test_parse_path_with_absolute_commands_and_close() -> None:
+    """Test parse path with absolute commands"""
+    assert parse_path("M 0 0 L 10 0 V 5 H 0 Z M 1 1 L 2 2") == [
+        ([(0.0, 0.0), (10.0, 0.0), (10.0, 5.0), (0.0, 5.0)], True),
+        ([(1.0, 1.0), (2.0, 2.0)], False),
+    ]
+
+
+def test_parse_path_flattens_arc() -> None:
+    """Test arc points lie on the circle"""
+    points, closed = parse_path("M 10 0 a10,10 0 0,1 -10,10")[0]
+    assert not closed
+    assert points[-1] == pytest.approx((0.0, 10.0))
+    for x, y in points:
+        assert math.isclose(math.hypot(x, y), 10.0, rel_tol=1e-6)
+
+
+def test_render_has_size_of_drawing_at_dpi() -> None:
+    """Test image size depends on the drawing size and dpi"""
+    image = RasterRenderer(dpi=254).render(make_drawing())
+    assert image.size == (1000, 500)
+
+
+def test_render_rect_with_css_class() -> None:
+    """Test rectangles are filled with class and attribute colors"""
+    d = make_drawing()
+    d.defs.add(d.style(".s0{fill:#FF0000}"))
+    d.add(d.rect((0, 0), (50, 50), class_="s0"))
+    d.add(d.rect((50, 0), (50, 50), fill="#0000FF"))
+    image = RasterRenderer(dpi=25).render(d)
+    assert image.getpixel((10, 10)) == (255, 0, 0, 255)
+    assert image.getpixel((80, 10)) == (0, 0, 255, 255)
+
+
+def test_render_semi_transparent_lines_accumulate() -> None:
+    """Test overlapping semi-transparent lines get more opaque"""
+    d = make_drawing()
+    d.add(d.rect((0, 0), (100, 50), fill="#000000"))
+    d.add(d.polyline([(0, 10), (100, 10)], stroke="#FFFFFF", stroke_opacity=0.5, stroke_width=2, fill="none"))
+    d.add(d.polyline([(0, 30), (100, 30)], stroke="#FFFFFF", stroke_opacity=0.5, stroke_width=2, fill="none"))
+    d.add(d.polyline([(0, 30), (100, 30)], stroke="#FFFFFF", stroke_opacity=0.5, stroke_width=2, fill="none"))
+    image = RasterRenderer(dpi=50).render(d)
+    single = pixel(image, (50, 20))[0]
+    double = pixel(image, (50, 59))[0]
+    assert 100 < single < 160
+    assert double > single
+
+
+def test_save_writes_png() -> None:
+    """Test saving to a file object"""
+    d = make_drawing()
+    d.add(d.text("Test", insert=(10, 20), style="font-size:10px; font-family:Arial", fill="#FFFFFF"))
+    buffer = io.BytesIO()
+    RasterRenderer(dpi=72).save(d, buffer)
+    buffer.seek(0)
+    with Image.open(buffer) as image:
+        assert image.format == "PNG"
+        assert image.size == (283, 142)
+        assert image.getbbox() is not None
+
+
+@pytest.mark.parametrize(
+    "transform, point, expected_point",
+    [
+        ("", (1, 2), (1, 2)),
+        ("translate(10,20)", (1, 2), (11, 22)),
+        ("translate(10) scale(2)", (1, 2), (12, 4)),
+        ("scale(2,3)", (1, 2), (2, 6)),
+        ("rotate(90)", (1, 0), (0, 1)),
+        ("matrix(1,0,0,1,5,6)", (1, 2), (6, 8)),
+    ],
+)
+def test_parse_transform(transform: str, point: tuple[float, float], expected_point: tuple[float, float]) -> None:
+    """Test transform lists are applied right to left"""
+    a, b, c, d, e, f = parse_transform(transform)
+    x, y = point
+    assert (a * x + c * y + e, b * x + d * y + f) == pytest.approx(expected_point)
+
+
+def test_render_group_with_transform_scales_lines() -> None:
+    """Test lines in a scaled group are drawn at the transformed position with scaled width"""
+    d = make_drawing()
+    g = d.g(transform="translate(50,0) scale(10)")
+    g.add(d.polyline([(0, 2), (4, 2)], stroke="#FFFFFF", stroke_width=0.4, fill="none"))
+    d.add(g)
+    image = RasterRenderer(dpi=254).render(d)
+    assert pixel(image, (700, 200))[3] == 255
+    assert pixel(image, (700, 185))[3] == 255
+    assert pixel(image, (700, 250))[3] == 0
+    assert pixel(image, (300, 200))[3] == 0
@@ -0,0 +1,148 @@
+"""Several tests for the poster server"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import http.client
+import json
+import shutil
+import threading
+from typing import TYPE_CHECKING
+
+import pytest
+
+from gpxtrackposter import server
+from gpxtrackposter.cli import add_drawer_args, add_server_args, clear_track_filters, create_parser
+from gpxtrackposter.exceptions import ParameterError, PosterError
+from gpxtrackposter.track_loader import TrackLoader
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from pytest_mock import MockerFixture
+
+
+@pytest.fixture(name="gpx_dir")
+def fixture_gpx_dir(gpx_dir_with_tracks: Path, tmp_path: Path) -> Path:
+    """Return a copy of the GPX directory, which the test may change"""
+    gpx_dir = tmp_path / "gpx"
+    shutil.copytree(gpx_dir_with_tracks, gpx_dir)
+    return gpx_dir
+
+
+@pytest.fixture(name="poster_server")
+def fixture_poster_server(gpx_dir: Path) -> Iterator[server.PosterServer]:
+    """Return a server for the GPX directory rendering two posters at once"""
+    parser = create_parser()
+    add_drawer_args(parser)
+    add_server_args(parser)
+    args = parser.parse_args(["--gpx-dir", str(gpx_dir), "--workers", "2", "--min-distance", "0"])
+    loader = TrackLoader(workers=1)
+    clear_track_filters(loader)
+    poster_server = server.PosterServer(server.TrackStore(loader, str(gpx_dir)), parser, args)
+    yield poster_server
+    poster_server.close()
+
+
+def test_track_store_reloads_changed_gpx_files(gpx_dir: Path) -> None:
+    """Test the tracks are loaded once and again after a GPX file was removed"""
+    loader = TrackLoader(workers=1)
+    clear_track_filters(loader)
+    store = server.TrackStore(loader, str(gpx_dir))
+    tracks, tracks_hash = store.tracks()
+    assert len(tracks) == 3
+    assert store.tracks() == (tracks, tracks_hash)
+    (gpx_dir / "gpx_file_track_walk.gpx").unlink()
+    tracks2, tracks_hash2 = store.tracks()
+    assert len(tracks2) == 2
+    assert tracks_hash2 != tracks_hash
+
+
+def test_render_answers_equal_requests_from_memory(poster_server: server.PosterServer, mocker: MockerFixture) -> None:
+    """Test a poster is rendered once for equal requests and the format follows the output name"""
+    render_bytes = mocker.spy(server.PosterJob, "render_bytes")
+    data, image_format = poster_server.render({"type": "grid", "title": "Server"})
+    assert image_format == "svg"
+    assert b"Server" in data
+    assert poster_server.render({"type": "grid", "title": "Server"}) == (data, "svg")
+    assert render_bytes.call_count == 1
+    data, image_format = poster_server.render({"type": "grid", "output": "poster.png"})
+    assert image_format == "png"
+    assert data.startswith(b"\x89PNG")
+
+
+@pytest.mark.parametrize(
+    "options, exception",
+    [
+        ({"colour": "red"}, ParameterError),
+        ({"port": 80}, ParameterError),
+        ({"type": "bogus"}, ParameterError),
+        ({"dpi": "x"}, ParameterError),
+        ({"type": "heatmap", "heatmap-tile-quality": 0}, ParameterError),
+        ({"year": "2000"}, PosterError),
+    ],
+)
+def test_render_with_invalid_request_raises_exception(
+    poster_server: server.PosterServer, options: dict, exception: type[Exception]
+) -> None:
+    """Test unknown options, options of the server, invalid options and missing tracks"""
+    with pytest.raises(exception):
+        poster_server.render(options)
+
+
+def test_server_answers_http_requests(poster_server: server.PosterServer) -> None:
+    """Test posters and errors are returned over HTTP"""
+    with server.create_server(poster_server, "127.0.0.1", 0) as http_server:
+        thread = threading.Thread(target=http_server.serve_forever)
+        thread.start()
+        try:
+            address = http_server.server_address
+            assert isinstance(address, tuple)
+            connection = http.client.HTTPConnection("127.0.0.1", int(address[1]))
+            for options, status, content_type in [
+                ({"type": "calendar"}, 200, "image/svg+xml"),
+                ({"colour": "red"}, 400, "application/json"),
+                ({"dpi": "x"}, 400, "application/json"),
+                ({"year": "2000"}, 422, "application/json"),
+            ]:
+                connection.request("POST", "/render", json.dumps(options))
+                response = connection.getresponse()
+                body = response.read()
+                assert response.status == status
+                assert response.getheader("Content-Type") == content_type
+            assert json.loads(body)["error"]
+            connection.request("POST", "/other", "{}")
+            response = connection.getresponse()
+            response.read()
+            assert response.status == 404
+            connection.close()
+        finally:
+            http_server.shutdown()
+            thread.join()
+
+
+def test_server_answers_unexpected_errors(poster_server: server.PosterServer, mocker: MockerFixture) -> None:
+    """Test the server answers with an error and keeps serving if rendering fails unexpectedly"""
+    mocker.patch.object(server.PosterJob, "render_bytes", side_effect=[OSError("disk full"), b"<svg/>"])
+    with server.create_server(poster_server, "127.0.0.1", 0) as http_server:
+        thread = threading.Thread(target=http_server.serve_forever)
+        thread.start()
+        try:
+            address = http_server.server_address
+            assert isinstance(address, tuple)
+            connection = http.client.HTTPConnection("127.0.0.1", int(address[1]))
+            for status in [500, 200]:
+                connection.request("POST", "/render", json.dumps({"type": "calendar"}))
+                response = connection.getresponse()
+                body = response.read()
+                assert response.status == status
+            assert body == b"<svg/>"
+            connection.close()
+        finally:
+            http_server.shutdown()
+            thread.join()
@@ -0,0 +1,69 @@
+"""Several tests for StyleSheet"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from gpxtrackposter.style_sheet import StyleSheet
+
+
+def test_new_style_sheet_is_empty() -> None:
+    """Test new style sheet is empty"""
+    styles = StyleSheet()
+    assert styles.is_empty()
+    assert styles.css() == ""
+
+
+def test_class_name_is_reused_for_same_properties() -> None:
+    """Test same property combination returns the same class"""
+    styles = StyleSheet()
+    name1 = styles.class_name(fill="none", stroke_width=0.5)
+    name2 = styles.class_name(stroke_width=0.5, fill="none")
+    name3 = styles.class_name(fill="none", stroke_width=1.0)
+    assert name1 == name2
+    assert name1 != name3
+    assert not styles.is_empty()
+
+
+def test_class_name_merges_style_string_and_properties() -> None:
+    """Test inline style string and properties are merged into one class"""
+    styles = StyleSheet()
+    name1 = styles.class_name(style="font-size:4px; font-family:Arial", fill="#FFFFFF")
+    name2 = styles.class_name(font_size="4px", font_family="Arial", fill="#FFFFFF")
+    assert name1 == name2
+    assert styles.css() == f".{name1}{{fill:#FFFFFF;font-family:Arial;font-size:4px}}"
+
+
+def test_css_contains_all_classes() -> None:
+    """Test CSS output"""
+    styles = StyleSheet(prefix="c")
+    styles.class_name(fill="none", stroke_linecap="round")
+    styles.class_name(fill="#444444")
+    assert styles.css() == ".c0{fill:none;stroke-linecap:round}.c1{fill:#444444}"
+
+
+def test_clear_removes_all_classes() -> None:
+    """Test clear"""
+    styles = StyleSheet()
+    styles.class_name(fill="none")
+    styles.clear()
+    assert styles.is_empty()
+    assert styles.class_name(fill="#444444") == "s0"
+
+
+def test_restore_recorded_classes() -> None:
+    """Test recorded classes get the same names when requested again in the same order"""
+    styles = StyleSheet()
+    styles.class_name(fill="none")
+    with styles.record() as record:
+        styles.class_name(fill="none")
+        styles.class_name(fill="#444444")
+    assert [name for _, name in record] == ["s0", "s1"]
+    styles.clear()
+    styles.class_name(fill="none")
+    assert styles.restore(record)
+    assert styles.css() == ".s0{fill:none}.s1{fill:#444444}"
+    styles.clear()
+    styles.class_name(fill="#FFFFFF")
+    assert not styles.restore(record)
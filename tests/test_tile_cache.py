@@ -0,0 +1,93 @@
+"""Several tests for TileCache and CachingTileDownloader"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import s2sphere  # type: ignore[import-untyped]
+import staticmaps  # type: ignore[import-untyped]
+
+from gpxtrackposter.tile_cache import CachingTileDownloader, TileCache, TileDirectoryProvider
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest_mock import MockerFixture
+
+
+def test_tile_cache_stores_identical_tiles_once(tmp_path: Path) -> None:
+    """Test tiles are content-addressed"""
+    cache = TileCache(str(tmp_path))
+    cache.put("osm/1/0/0", b"sea")
+    cache.put("osm/1/0/1", b"sea")
+    cache.put("osm/1/1/0", b"land")
+    assert cache.get("osm/1/0/1") == b"sea"
+    assert cache.get("osm/1/1/1") is None
+    assert cache.size() == 7
+
+
+def test_tile_cache_evicts_least_recently_used_tiles(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test the size limit removes the tiles that were not used for the longest time"""
+    clock = mocker.patch("gpxtrackposter.tile_cache.time.time")
+    cache = TileCache(str(tmp_path), max_bytes=8)
+    clock.return_value = 1.0
+    cache.put("a", b"1111")
+    clock.return_value = 2.0
+    cache.put("b", b"2222")
+    clock.return_value = 3.0
+    assert cache.get("a") == b"1111"
+    clock.return_value = 4.0
+    cache.put("c", b"3333")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1111"
+    assert cache.get("c") == b"3333"
+    assert cache.size() == 8
+
+
+def test_tile_cache_index_persists(tmp_path: Path) -> None:
+    """Test a flushed cache can be opened again"""
+    cache = TileCache(str(tmp_path))
+    cache.put("osm/2/1/1", b"tile")
+    cache.flush()
+    assert TileCache(str(tmp_path)).get("osm/2/1/1") == b"tile"
+
+
+def test_tile_directory_provider_loads_xyz_tiles(tmp_path: Path) -> None:
+    """Test loading from a local tile directory"""
+    (tmp_path / "3" / "4").mkdir(parents=True)
+    (tmp_path / "3" / "4" / "5.png").write_bytes(b"png")
+    provider = TileDirectoryProvider(str(tmp_path))
+    assert provider.load(3, 4, 5) == b"png"
+    assert provider.load(3, 4, 6) is None
+    assert provider.url(3, 4, 5) is None
+
+
+def test_downloader_caches_downloaded_tiles(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test a tile is downloaded only once"""
+    download = mocker.patch.object(staticmaps.TileDownloader, "get", return_value=b"tile")
+    downloader = CachingTileDownloader(TileCache(str(tmp_path)))
+    provider = staticmaps.default_tile_providers["osm"]
+    assert downloader.get(provider, "", 1, 0, 0) == b"tile"
+    assert downloader.get(provider, "", 1, 0, 0) == b"tile"
+    download.assert_called_once()
+
+
+def test_downloader_prefetches_all_tiles_of_transformer(tmp_path: Path) -> None:
+    """Test prefetch loads every tile needed for rendering"""
+    for x in range(2):
+        for y in range(2):
+            (tmp_path / "1" / str(x)).mkdir(parents=True, exist_ok=True)
+            (tmp_path / "1" / str(x) / f"{y}.png").write_bytes(f"{x}{y}".encode())
+    provider = TileDirectoryProvider(str(tmp_path))
+    transformer = staticmaps.Transformer(512, 512, 1, s2sphere.LatLng.from_degrees(0, 0), provider.tile_size())
+    downloader = CachingTileDownloader(workers=2)
+    downloader.prefetch(provider, transformer)
+    for x in range(2):
+        for y in range(2):
+            (tmp_path / "1" / str(x) / f"{y}.png").unlink()
+            assert downloader.get(provider, "", 1, x, y) == f"{x}{y}".encode()
@@ -0,0 +1,82 @@
+"""Several tests for the timings of phases"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+from gpxtrackposter import timings
+from gpxtrackposter.timings import Timings
+from gpxtrackposter.track_loader import TrackLoader
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_nested_phases_follow_the_enclosing_phase() -> None:
+    """Test nested phases are named by the enclosing phases and reported below them"""
+    t = Timings()
+    with t.phase("load"):
+        with t.phase("parse"):
+            pass
+        with t.phase("merge"):
+            pass
+    with t.phase("draw"):
+        pass
+    report = t.report()
+    assert [p["name"] for p in report["phases"]] == ["load", "load/parse", "load/merge", "draw"]
+    assert all(p["calls"] == 1 for p in report["phases"])
+    assert report["total_seconds"] >= sum(p["seconds"] for p in report["phases"] if "/" not in p["name"])
+
+
+def test_phases_of_several_calls_and_threads_are_summed_up() -> None:
+    """Test calls of a phase in several threads are counted separately from their nesting"""
+    t = Timings()
+
+    def work() -> None:
+        for _ in range(10):
+            with t.phase("draw"):
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [(p["name"], p["calls"]) for p in t.report()["phases"]] == [("draw", 40)]
+
+
+def test_reset_removes_phases() -> None:
+    """Test reset"""
+    t = Timings()
+    with t.phase("draw"):
+        pass
+    t.reset()
+    assert t.report()["phases"] == []
+
+
+def test_table_indents_nested_phases() -> None:
+    """Test the table contains a line per phase and the total"""
+    t = Timings()
+    with t.phase("load"), t.phase("parse"):
+        pass
+    lines = t.table().splitlines()
+    assert lines[0].split() == ["Phase", "Calls", "Seconds", "%"]
+    assert lines[1].startswith("load ")
+    assert lines[2].startswith("  parse ")
+    assert lines[3].startswith("total ")
+
+
+def test_load_tracks_records_phases(gpx_dir_with_tracks: Path) -> None:
+    """Test loading tracks records the loading phases of the run"""
+    timings.timings().reset()
+    TrackLoader(workers=1).load_tracks(str(gpx_dir_with_tracks))
+    names = [p["name"] for p in timings.timings().report()["phases"]]
+    assert "load tracks" in names
+    assert "load tracks/parse GPX" in names
+    assert "load tracks/merge tracks" in names
@@ -0,0 +1,134 @@
+"""Several tests for the trace recorder"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+import svgwrite  # type: ignore[import-untyped]
+
+from gpxtrackposter import batch, trace
+from gpxtrackposter.calendar_drawer import CalendarDrawer
+from gpxtrackposter.cli import create_parser
+from gpxtrackposter.trace import TraceRecorder
+from gpxtrackposter.track_loader import TrackLoader
+from gpxtrackposter.xy import XY
+
+if TYPE_CHECKING:
+    import argparse
+    from collections.abc import Iterator
+    from pathlib import Path
+    from unittest.mock import MagicMock
+
+    from gpxtrackposter.poster import Poster
+    from gpxtrackposter.track import Track
+
+
+@pytest.fixture(name="enabled_recorder")
+def fixture_enabled_recorder() -> Iterator[TraceRecorder]:
+    """Record spans of the current process during a test"""
+    recorder = trace.recorder()
+    recorder.collect()
+    recorder.enable()
+    yield recorder
+    recorder.enable(False)
+    recorder.collect()
+
+
+def test_disabled_recorder_records_nothing() -> None:
+    """Test spans are only recorded while the recorder is enabled"""
+    recorder = TraceRecorder()
+    with recorder.span("parse"):
+        pass
+    assert recorder.collect() == []
+
+
+def test_span_records_complete_event() -> None:
+    """Test a span is recorded as complete event of the current process"""
+    recorder = TraceRecorder()
+    recorder.enable()
+    with recorder.span("parse", "file", file="track.gpx"):
+        pass
+    events = recorder.collect()
+    assert len(events) == 1
+    assert events[0]["name"] == "parse"
+    assert events[0]["ph"] == "X"
+    assert events[0]["pid"] == os.getpid()
+    assert events[0]["dur"] >= 0
+    assert events[0]["args"] == {"file": "track.gpx"}
+    assert recorder.collect() == []
+
+
+def test_write_names_processes(tmp_path: Path) -> None:
+    """Test the trace file names the main process and the worker processes"""
+    recorder = TraceRecorder()
+    recorder.enable()
+    with recorder.span("load tracks"):
+        pass
+    recorder.extend([{"name": "parse", "ph": "X", "ts": 0, "dur": 1, "pid": 1, "tid": 1}])
+    recorder.write(str(tmp_path / "trace.json"))
+    with open(tmp_path / "trace.json", encoding="utf8") as f:
+        events = json.load(f)["traceEvents"]
+    names = {e["pid"]: e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert names == {os.getpid(): "create_poster", 1: "worker 1"}
+    assert [e["name"] for e in events if e["ph"] == "X"] == ["load tracks", "parse"]
+
+
+def test_load_tracks_records_spans_of_worker_processes(
+    gpx_dir_with_tracks: Path, tmp_path: Path, enabled_recorder: TraceRecorder
+) -> None:
+    """Test the work on every file is recorded in the worker processes, loading from GPX files and from cache"""
+    for _ in range(2):
+        loader = TrackLoader(workers=2)
+        loader.set_cache_dir(str(tmp_path / "cache"))
+        loader.load_tracks(str(gpx_dir_with_tracks))
+    events = enabled_recorder.collect()
+    worker_spans = [(e["name"], e["args"]["file"]) for e in events if e["pid"] != os.getpid() and "args" in e]
+    for name in ("load GPX", "load cache"):
+        assert sorted(file for span, file in worker_spans if span == name) == [
+            "gpx_file_track_hike.gpx",
+            "gpx_file_track_no_type.gpx",
+            "gpx_file_track_walk.gpx",
+        ]
+    names = {e["name"] for e in events}
+    assert {"parse", "simplify", "hash", "store cache", "load tracks"} <= names
+
+
+def render_job(tracks: list[Track], args: argparse.Namespace) -> None:  # noqa: ARG001
+    """Render function recording a span in the process rendering the job"""
+    with trace.span("draw"):
+        pass
+
+
+def test_run_jobs_records_spans_of_worker_processes(enabled_recorder: TraceRecorder) -> None:
+    """Test the spans of jobs rendered in worker processes are added to the main process"""
+    parser = create_parser()
+    jobs = [parser.parse_args(["--output", output]) for output in ["a.svg", "b.svg"]]
+    batch.run_jobs(render_job, [], jobs, 2)
+    events = enabled_recorder.collect()
+    assert all(e["pid"] != os.getpid() for e in events)
+    assert sorted(e["args"]["output"] for e in events if e["name"] == "render job") == ["a.svg", "b.svg"]
+    assert [e["name"] for e in events].count("draw") == 2
+
+
+def test_years_drawn_in_worker_processes_record_spans(
+    poster: Poster, mock_track_instance_berlin_paris: MagicMock, enabled_recorder: TraceRecorder
+) -> None:
+    """Test the spans of years drawn in worker processes are added to the main process"""
+    poster.set_tracks([mock_track_instance_berlin_paris])
+    poster.years.add(dt.datetime(dt.datetime.now().year - 2, 1, 1))
+    drawer = CalendarDrawer(poster)
+    drawer.set_workers(2)
+    dr = svgwrite.Drawing()
+    drawer.draw(dr, dr.g(), XY(200, 300), XY(10, 10))
+    spans = [e for e in enabled_recorder.collect() if e["name"] == "draw year"]
+    assert len(spans) == 3
+    assert all(e["pid"] != os.getpid() for e in spans)
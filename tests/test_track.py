@@ -12,7 +12,9 @@ import re
 import pytest
 import s2sphere  # type: ignore[import-untyped]
 from pint import Quantity  # type: ignore[import-untyped]
+from pytest_mock import MockerFixture
 
+from gpxtrackposter import utils
 from gpxtrackposter.exceptions import TrackLoadError
 from gpxtrackposter.track import Track
 from gpxtrackposter.units import Units
@@ -144,3 +146,39 @@ def test_bbox(gpx_file_track_walk: str) -> None:
         s2sphere.LatLng.from_degrees(52.516495, 13.377094),
         s2sphere.LatLng.from_degrees(52.517959, 13.380634),
     )
+
+
+def test_copy_can_be_appended_to_without_changing_the_track(
+    gpx_file_track_walk: str, gpx_file_track_no_type: str
+) -> None:
+    """Test appending to a copy does not change the original track"""
+    track = Track()
+    track.load_gpx(gpx_file_track_walk, None)
+    other = Track()
+    other.load_gpx(gpx_file_track_no_type, None)
+    merged = track.copy()
+    merged.append(other)
+    assert merged.file_names == [os.path.basename(gpx_file_track_walk), os.path.basename(gpx_file_track_no_type)]
+    assert track.file_names == [os.path.basename(gpx_file_track_walk)]
+    assert len(track.polylines) == len(merged.polylines) - len(other.polylines)
+    assert track.end_time() != merged.end_time()
+
+
+def test_polylines_hash_is_computed_once_per_lines(
+    gpx_file_track_walk: str, gpx_file_track_no_type: str, mocker: MockerFixture
+) -> None:
+    """Test the hash of the lines is reused until the lines are replaced or appended to"""
+    track = Track()
+    track.load_gpx(gpx_file_track_walk, None)
+    other = Track()
+    other.load_gpx(gpx_file_track_no_type, None)
+    polylines_hash = mocker.spy(utils, "polylines_hash")
+    first_hash = track.polylines_hash()
+    assert track.polylines_hash() == first_hash
+    assert polylines_hash.call_count == 1
+    merged = track.copy()
+    merged.append(other)
+    assert merged.polylines_hash() != first_hash
+    assert track.polylines_hash() == first_hash
+    track.polylines = other.polylines
+    assert track.polylines_hash() == other.polylines_hash() == utils.polylines_hash(other.polylines)
@@ -9,10 +9,12 @@ from __future__ import annotations
 
 import json
 import os
+import shutil
 from typing import TYPE_CHECKING
 
 import pytest
 
+from gpxtrackposter import track_loader
 from gpxtrackposter.exceptions import ParameterError
 from gpxtrackposter.track_loader import TrackLoader
 from gpxtrackposter.units import Units
@@ -87,7 +89,7 @@ def fixture_loader(
     mocker: MockerFixture, mock_run_activity: MagicMock, mock_walk_activity: MagicMock, mock_hike_activity: MagicMock
 ) -> TrackLoader:
     """Return a :class:`gpxtrackposter.track_loader.TrackLoader` object."""
-    mock_client_class = mocker.patch("gpxtrackposter.track_loader.Client")
+    mock_client_class = mocker.patch("stravalib.Client")
     instance = mock_client_class.return_value
     instance.get_activities.return_value = [mock_run_activity, mock_walk_activity, mock_hike_activity]
     return TrackLoader(workers=None)
@@ -218,6 +220,28 @@ def test_gpx_dir_with_files_filter_activity(gpx_dir_with_tracks: Path) -> None:
     assert len(loader.load_tracks(str(gpx_dir_with_tracks))) == 0
 
 
+def test_select_tracks_matches_loading_with_filters(gpx_dir_with_tracks: Path) -> None:
+    """Test selecting from tracks loaded without filters gives the tracks loaded with the filters"""
+    loader = TrackLoader(workers=1)
+    loader.set_min_length(0 * Units().meter)
+    all_tracks = loader.load_tracks(str(gpx_dir_with_tracks))
+    for year, min_length, activity in [
+        ("all", 500, "all"),
+        ("2022", 500, "all"),
+        ("all", 1000, "all"),
+        ("all", 0, "Hike"),
+    ]:
+        selector = TrackLoader(workers=1)
+        selector.year_range.parse(year)
+        selector.set_min_length(min_length * Units().meter)
+        selector.set_activity(activity)
+        selector.special_file_names = [all_tracks[0].file_names[0]]
+        expected = [t.file_names for t in selector.load_tracks(str(gpx_dir_with_tracks))]
+        selected = selector.select_tracks(all_tracks)
+        assert [t.file_names for t in selected] == expected
+        assert [t.special for t in selected] == [t.file_names == all_tracks[0].file_names for t in selected]
+
+
 def test_gpx_dir_with_files_two_workers(gpx_dir_with_tracks: Path) -> None:
     """Temporary gpx directory - with files, two workers"""
     loader = TrackLoader(workers=2)
@@ -237,3 +261,76 @@ def test_gpx_dir_with_files_with_cache_dir(gpx_dir_with_tracks: Path, tmp_path_f
     # third run with clear cache
     loader.clear_cache()
     assert len(loader.load_tracks(str(gpx_dir_with_tracks))) == 3
+
+
+def test_fingerprint_depends_on_file_contents(gpx_dir_with_tracks: Path, tmp_path: Path) -> None:
+    """Test the fingerprint changes with the GPX files only"""
+    loader = TrackLoader(workers=1)
+    fingerprint = loader.fingerprint(str(gpx_dir_with_tracks))
+    assert TrackLoader(workers=1).fingerprint(str(gpx_dir_with_tracks)) == fingerprint
+    for file in gpx_dir_with_tracks.iterdir():
+        (tmp_path / file.name).write_bytes(file.read_bytes())
+    assert loader.fingerprint(str(tmp_path)) == fingerprint
+    (tmp_path / "gpx_file_track_walk.gpx").write_text("<gpx></gpx>")
+    assert loader.fingerprint(str(tmp_path)) != fingerprint
+
+
+def test_load_tracks_order_does_not_depend_on_workers(
+    gpx_dir_with_tracks: Path, tmp_path_factory: pytest.TempPathFactory
+) -> None:
+    """Test tracks are returned in the same order when loaded with several workers or from cache"""
+    orders = []
+    cache_dir = tmp_path_factory.mktemp("cache")
+    for workers in (1, 2, 2):
+        loader = TrackLoader(workers=workers)
+        loader.set_min_length(500 * Units().meter)
+        loader.set_cache_dir(str(cache_dir))
+        orders.append([t.file_names for t in loader.load_tracks(str(gpx_dir_with_tracks))])
+    assert orders[0] == orders[1] == orders[2]
+
+
+def copy_gpx_dir(gpx_dir_with_tracks: Path, tmp_path: Path) -> Path:
+    """Copy the GPX files to a directory that may be changed"""
+    gpx_dir = tmp_path / "gpx"
+    shutil.copytree(gpx_dir_with_tracks, gpx_dir)
+    return gpx_dir
+
+
+def test_update_tracks_loads_only_changed_files(
+    gpx_dir_with_tracks: Path, gpx_file_track_no_type_content: str, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    """Test update_tracks parses only added files and merges them with their neighbours"""
+    gpx_dir = copy_gpx_dir(gpx_dir_with_tracks, tmp_path)
+    loader = TrackLoader(workers=1)
+    expected = [t.file_names for t in loader.load_tracks(str(gpx_dir))]
+    assert [t.file_names for t in loader.update_tracks(str(gpx_dir))] == expected
+
+    spy = mocker.spy(track_loader, "load_gpx_file")
+    assert [t.file_names for t in loader.update_tracks(str(gpx_dir))] == expected
+    assert spy.call_count == 0
+    # starts less than an hour after gpx_file_track_no_type
+    later_file = gpx_dir / "gpx_file_track_later.gpx"
+    later_file.write_text(gpx_file_track_no_type_content.replace("2022-01-02T12:0", "2022-01-02T12:3"))
+    tracks = loader.update_tracks(str(gpx_dir))
+    assert spy.call_count == 1
+    assert ["gpx_file_track_no_type.gpx", "gpx_file_track_later.gpx"] in [t.file_names for t in tracks]
+    later_file.unlink()
+    assert [t.file_names for t in loader.update_tracks(str(gpx_dir))] == expected
+    assert spy.call_count == 1
+
+
+def test_update_tracks_merges_cached_and_parsed_tracks(
+    gpx_dir_with_tracks: Path, gpx_file_track_no_type_content: str, tmp_path: Path
+) -> None:
+    """Test tracks loaded from cache are merged with newly parsed tracks"""
+    gpx_dir = copy_gpx_dir(gpx_dir_with_tracks, tmp_path)
+    loader = TrackLoader(workers=1)
+    loader.set_cache_dir(str(tmp_path / "cache"))
+    loader.load_tracks(str(gpx_dir))
+    (gpx_dir / "gpx_file_track_later.gpx").write_text(
+        gpx_file_track_no_type_content.replace("2022-01-02T12:0", "2022-01-02T12:3")
+    )
+    loader = TrackLoader(workers=1)
+    loader.set_cache_dir(str(tmp_path / "cache"))
+    tracks = loader.update_tracks(str(gpx_dir))
+    assert ["gpx_file_track_no_type.gpx", "gpx_file_track_later.gpx"] in [t.file_names for t in tracks]
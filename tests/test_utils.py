@@ -6,19 +6,30 @@
 # license that can be found in the LICENSE file.
 
 import math
+import os
+import stat
+from pathlib import Path
 
 import pytest
 import s2sphere  # type: ignore[import-untyped]
 
 from gpxtrackposter.utils import (
+    COLOR_GRADIENT_STEPS,
+    color_gradient,
     compute_bounds_xy,
     compute_grid,
+    default_precision,
     format_float,
+    format_number,
+    gradient_color,
     interpolate_color,
     lat2y,
     latlng2xy,
+    line_to_path_data,
     lng2x,
     make_key_times,
+    quantize_line,
+    write_file_atomic,
 )
 from gpxtrackposter.value_range import ValueRange
 from gpxtrackposter.xy import XY
@@ -95,6 +106,55 @@ def test_compute_bounds_xy(test_value: list, expected_result: tuple) -> None:
     assert expected_result[1].upper() == bounds_xy[1].upper()
 
 
+@pytest.mark.parametrize(
+    "dpi, expected_precision",
+    [
+        (72, 1),
+        (254, 1),
+        (300, 2),
+        (1200, 2),
+        (3000, 3),
+    ],
+)
+def test_default_precision(dpi: int, expected_precision: int) -> None:
+    """Test default precision"""
+    assert expected_precision == default_precision(dpi)
+
+
+def test_quantize_line_rounds_and_removes_duplicates() -> None:
+    """Test quantize line"""
+    line = [(12.345678901234567, 1.0), (12.3449, 1.004), (13.0, -0.001), (13.0, 0.0)]
+    assert quantize_line(line, 2) == [(12.35, 1.0), (12.34, 1.0), (13.0, 0.0)]
+
+
+@pytest.mark.parametrize(
+    "line, precision, expected_data",
+    [
+        ([], 2, ""),
+        ([(1.0, 2.0)], 2, "m1,2"),
+        ([(1.004, 2.0), (1.001, 2.003)], 2, "m1,2"),
+        ([(12.345678, 1.0), (13.0, 0.5), (12.0, 0.75)], 2, "m12.35,1l0.65,-0.5 -1,0.25"),
+        ([(0.4, 0.6), (2.6, 1.4)], 0, "m0,1l3,0"),
+    ],
+)
+def test_line_to_path_data(line: list, precision: int, expected_data: str) -> None:
+    """Test line to relative path data"""
+    assert expected_data == line_to_path_data(line, precision)
+
+
+def test_line_to_path_data_does_not_accumulate_rounding_errors() -> None:
+    """Test that the sum of relative moves ends at the rounded last point"""
+    line = [(i * 0.333333, i * 0.777777) for i in range(1000)]
+    data = line_to_path_data(line, 2)
+    start, moves = data[1:].split("l")
+    x, y = (float(v) for v in start.split(","))
+    for move in moves.split(" "):
+        dx, dy = (float(v) for v in move.split(","))
+        x, y = x + dx, y + dy
+    assert math.isclose(x, round(999 * 0.333333, 2), abs_tol=1e-6)
+    assert math.isclose(y, round(999 * 0.777777, 2), abs_tol=1e-6)
+
+
 @pytest.mark.parametrize(
     "count, dimensions, expected_best_size, expected_best_counts",
     [
@@ -111,6 +171,37 @@ def test_compute_grid(count: int, dimensions: XY, expected_best_size: float, exp
     assert (expected_best_size, expected_best_counts) == compute_grid(count, dimensions)
 
 
+def compute_grid_quadratic(count: int, dimensions: XY) -> tuple[float | None, tuple[int, int] | None]:
+    """Former O(count^2) implementation of compute_grid used as reference"""
+    min_waste = -1.0
+    best_size = None
+    best_counts = None
+    for count_x in range(1, count + 1):
+        size_x = dimensions.x / count_x
+        for count_y in range(1, count + 1):
+            if count_x * count_y >= count:
+                size_y = dimensions.y / count_y
+                size = min(size_x, size_y)
+                waste = dimensions.x * dimensions.y - count * size * size
+                if waste < 0:
+                    continue
+                if best_size is None or waste < min_waste:
+                    best_size = size
+                    best_counts = count_x, count_y
+                    min_waste = waste
+    return best_size, best_counts
+
+
+@pytest.mark.parametrize(
+    "dimensions",
+    [XY(1, 1), XY(200, 300), XY(300, 200), XY(180, 270), XY(1, 10), XY(10, 1), XY(173.3, 211.7), XY(3, 0.1)],
+)
+def test_compute_grid_equals_quadratic_implementation(dimensions: XY) -> None:
+    """Test compute grid returns the same layouts as the former implementation"""
+    for count in [*range(64), 97, 100, 127, 128, 199, 200]:
+        assert compute_grid(count, dimensions) == compute_grid_quadratic(count, dimensions), count
+
+
 @pytest.mark.parametrize(
     "color1, color2, ratio, expected_color",
     [
@@ -126,6 +217,30 @@ def test_interpolate_color(color1: str, color2: str, ratio: float, expected_colo
     assert expected_color == interpolate_color(color1, color2, ratio)
 
 
+def test_color_gradient_matches_interpolate_color() -> None:
+    """Test color gradient entries equal interpolated colors"""
+    gradient = color_gradient("#4DD2FF", "#FF0000")
+    assert len(gradient) == COLOR_GRADIENT_STEPS
+    for i in (0, 1, 100, COLOR_GRADIENT_STEPS - 1):
+        assert gradient[i] == interpolate_color("#4DD2FF", "#FF0000", i / (COLOR_GRADIENT_STEPS - 1))
+    assert color_gradient("#4DD2FF", "#FF0000") is gradient
+
+
+@pytest.mark.parametrize(
+    "ratio, expected_color",
+    [
+        (0, "#000000"),
+        (1, "#ffffff"),
+        (0.5, "#808080"),
+        (-100, "#000000"),
+        (12345, "#ffffff"),
+    ],
+)
+def test_gradient_color(ratio: float, expected_color: str) -> None:
+    """Test gradient color lookup"""
+    assert expected_color == gradient_color(color_gradient("#000000", "#ffffff"), ratio)
+
+
 @pytest.mark.parametrize(
     "test_value, expected_result",
     [
@@ -151,3 +266,33 @@ def test_format_float(test_value: float, expected_result: str) -> None:
 def test_make_key_times(test_value: int, expected_result: list) -> None:
     """Test make key times"""
     assert expected_result == make_key_times(test_value)
+
+
+@pytest.mark.parametrize(
+    "value, digits, expected_result",
+    [(27.0, 6, "27"), (0.5 / 27, 6, "0.0185185"), (-0.0, 6, "0"), (123.456789, 4, "123.5")],
+)
+def test_format_number(value: float, digits: int, expected_result: str) -> None:
+    """Test format number"""
+    assert expected_result == format_number(value, digits)
+
+
+def test_write_file_atomic_uses_permissions_of_umask(tmp_path: Path) -> None:
+    """Test files written atomically are readable by others like files created with open"""
+    write_file_atomic(str(tmp_path / "metrics.prom"), b"data")
+    with open(tmp_path / "other.txt", "wb") as f:
+        f.write(b"data")
+    mode = stat.S_IMODE((tmp_path / "metrics.prom").stat().st_mode)
+    assert mode == stat.S_IMODE((tmp_path / "other.txt").stat().st_mode)
+    assert (tmp_path / "metrics.prom").read_bytes() == b"data"
+
+
+def test_write_file_atomic_applies_current_umask(tmp_path: Path) -> None:
+    """Test the umask set when the file is written applies, not the umask of the process at import"""
+    previous_umask = os.umask(0o077)
+    try:
+        write_file_atomic(str(tmp_path / "metrics.prom"), b"data")
+    finally:
+        os.umask(previous_umask)
+    assert stat.S_IMODE((tmp_path / "metrics.prom").stat().st_mode) == 0o600
+    assert [p.name for p in tmp_path.iterdir()] == ["metrics.prom"]
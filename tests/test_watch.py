@@ -0,0 +1,106 @@
+"""Several tests for watching GPX directories"""
+
+# Copyright 2026 Florian Pigorsch & Contributors. All rights reserved.
+#
+# Use of this source code is governed by a MIT-style
+# license that can be found in the LICENSE file.
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from gpxtrackposter.exceptions import ParameterError, PosterError
+from gpxtrackposter.watch import DirectoryWatcher, watch
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_watcher_detects_added_changed_and_removed_files(tmp_path: Path, use_inotify: bool) -> None:
+    """Test the watcher reports changes of GPX files with and without inotify"""
+    gpx_file = tmp_path / "track.gpx"
+    watcher = DirectoryWatcher(str(tmp_path), poll_interval=0.01, use_inotify=use_inotify)
+    assert not watcher.wait(0.05)
+    gpx_file.write_text("<gpx></gpx>")
+    assert watcher.wait(1)
+    assert not watcher.wait(0.05)
+    gpx_file.write_text("<gpx>\n</gpx>")
+    assert watcher.wait(1)
+    gpx_file.unlink()
+    assert watcher.wait(1)
+    watcher.close()
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_watcher_ignores_other_files(tmp_path: Path, use_inotify: bool) -> None:
+    """Test the watcher ignores files which are not GPX files"""
+    watcher = DirectoryWatcher(str(tmp_path), poll_interval=0.01, use_inotify=use_inotify)
+    (tmp_path / "notes.txt").write_text("Something ...")
+    assert not watcher.wait(0.1)
+    watcher.close()
+
+
+def test_watcher_without_directory_raises_parameter_error(tmp_path: Path) -> None:
+    """Test watching a directory which does not exist"""
+    with pytest.raises(ParameterError):
+        DirectoryWatcher(str(tmp_path / "missing"))
+
+
+def test_watch_calls_on_change_once_for_several_files(tmp_path: Path) -> None:
+    """Test files added one after another cause a single call after the debounce time"""
+    calls = []
+
+    def add_files() -> None:
+        for i in range(3):
+            time.sleep(0.05)
+            (tmp_path / f"track{i}.gpx").write_text("<gpx></gpx>")
+
+    def on_change() -> None:
+        calls.append(sorted(p.name for p in tmp_path.iterdir()))
+        raise KeyboardInterrupt
+
+    thread = threading.Thread(target=add_files)
+    thread.start()
+    watch(str(tmp_path), on_change, debounce=0.3, poll_interval=0.01)
+    thread.join()
+    assert calls == [["track0.gpx", "track1.gpx", "track2.gpx"]]
+
+
+def test_watch_continues_after_poster_errors(tmp_path: Path) -> None:
+    """Test an error of on_change does not stop watching"""
+    calls = []
+
+    def on_change() -> None:
+        calls.append(1)
+        if len(calls) == 1:
+            (tmp_path / "track1.gpx").write_text("<gpx></gpx>")
+            msg = "No tracks found."
+            raise PosterError(msg)
+        raise KeyboardInterrupt
+
+    timer = threading.Timer(0.05, lambda: (tmp_path / "track0.gpx").write_text("<gpx></gpx>"))
+    timer.start()
+    watch(str(tmp_path), on_change, debounce=0.05, poll_interval=0.01)
+    assert len(calls) == 2
+
+
+def test_watch_with_watcher_calls_on_change_for_files_added_before(tmp_path: Path) -> None:
+    """Test files added after the watcher was created but before watching, e.g. during the first rendering"""
+    calls = []
+
+    def on_change() -> None:
+        calls.append(sorted(p.name for p in tmp_path.iterdir()))
+        raise KeyboardInterrupt
+
+    watcher = DirectoryWatcher(str(tmp_path), poll_interval=0.01)
+    try:
+        (tmp_path / "track0.gpx").write_text("<gpx></gpx>")
+        watch(str(tmp_path), on_change, debounce=0.05, poll_interval=0.01, watcher=watcher)
+    finally:
+        watcher.close()
+    assert calls == [["track0.gpx"]]